@@ -7,6 +7,7 @@ from api.routers import (
     interpretability,
     maintenance,
     meta,
+    metrics,
     ocr,
     retrieval,
 )
@@ -60,6 +61,7 @@ def create_app() -> FastAPI:
 
     # Routers
     app.include_router(meta.router)
+    app.include_router(metrics.router)
     app.include_router(retrieval.router)
     app.include_router(indexing.router)
     app.include_router(maintenance.router)
@@ -1,6 +1,6 @@
-from typing import Any, Dict, Optional
+from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class SearchItem(BaseModel):
@@ -8,3 +8,22 @@ class SearchItem(BaseModel):
     label: Optional[str]
     payload: Dict[str, Any]
     score: Optional[float] = None
+
+
+class SearchBatchRequest(BaseModel):
+    queries: List[str] = Field(..., min_length=1, max_length=64)
+    k: int = Field(default=10, ge=1, le=50, description="Results per query")
+    include_ocr: bool = Field(False, description="Include OCR results if available")
+    plan: Optional[str] = Field(
+        None, description="Retrieval plan name (server default when omitted)"
+    )
+
+
+class SearchBatchResult(BaseModel):
+    query: str
+    results: List[SearchItem]
+    cached: bool = False
+    plan: str
+    embedding_ms: float
+    search_ms: float
+    duration_ms: float
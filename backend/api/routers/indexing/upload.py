@@ -52,14 +52,17 @@ async def index(background_tasks: BackgroundTasks, files: List[UploadFile] = Fil
 
     temp_paths: List[str] = []
     original_filenames: Dict[str, str] = {}
+    content_hashes: Dict[str, str] = {}
 
     try:
         with PerformanceTimer(
             "validate and persist uploads", log_on_exit=False
         ) as timer:
-            temp_paths, original_filenames = await validate_and_persist_uploads(
-                files, constraints
-            )
+            (
+                temp_paths,
+                original_filenames,
+                content_hashes,
+            ) = await validate_and_persist_uploads(files, constraints)
 
         logger.info(
             f"Upload started: {len(files)} file(s) - {', '.join(filenames)}",
@@ -106,7 +109,11 @@ async def index(background_tasks: BackgroundTasks, files: List[UploadFile] = Fil
         progress_manager.start(job_id)
 
         background_tasks.add_task(
-            run_indexing_job, job_id, list(temp_paths), dict(original_filenames)
+            run_indexing_job,
+            job_id,
+            list(temp_paths),
+            dict(original_filenames),
+            dict(content_hashes),
         )
 
         logger.debug(
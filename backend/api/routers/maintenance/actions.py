@@ -13,6 +13,7 @@ from domain.maintenance import (
     clear_all_sync,
     delete_sync,
     initialize_sync,
+    reset_ingestion_journal,
     summarize_status,
 )
 from fastapi import APIRouter, HTTPException
@@ -40,6 +41,7 @@ async def clear_qdrant():
 
         with PerformanceTimer("clear Qdrant collection", log_on_exit=False) as timer:
             msg = await asyncio.to_thread(svc.clear_collection)
+            await asyncio.to_thread(reset_ingestion_journal)
 
         logger.warning(
             "Qdrant collection cleared",
@@ -79,6 +81,7 @@ async def clear_storage():
 
         with PerformanceTimer("clear local storage", log_on_exit=False) as timer:
             res = await asyncio.to_thread(msvc.clear_images)
+            await asyncio.to_thread(reset_ingestion_journal)
 
         logger.warning(
             "Local storage cleared",
@@ -1,4 +1,5 @@
 import asyncio
+from typing import Optional
 
 from __version__ import __version__
 from api.dependencies import (
@@ -22,7 +23,10 @@ async def root():
         "name": "Vision RAG API",
         "endpoints": [
             "/health",
+            "/metrics",
             "/search",
+            "/search/batch",
+            "/search/plans",
             "/chat",
             "/chat/stream",
             "/index",
@@ -50,6 +54,11 @@ async def health():
         "ocr": ocr_ok,
     }
 
+    # Per-replica routing state when load balancing across several
+    colpali_replicas = _colpali_replicas()
+    if colpali_replicas:
+        response["colpali_replicas"] = colpali_replicas
+
     # Add error messages if present
     colpali_err = colpali_init_error.get()
     if colpali_err:
@@ -84,6 +93,15 @@ def _check_colpali() -> bool:
         return False
 
 
+def _colpali_replicas() -> Optional[list]:
+    try:
+        client = get_colpali_client()
+        stats = client.endpoint_stats() if client else []
+        return stats if len(stats) > 1 else None
+    except Exception:
+        return None
+
+
 def _check_storage() -> bool:
     try:
         svc = get_storage_service()
@@ -0,0 +1,10 @@
+from fastapi import APIRouter, Response
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, generate_latest
+
+router = APIRouter(tags=["meta"])
+
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus scrape endpoint (pipeline stage latencies, queues, errors)."""
+    return Response(content=generate_latest(REGISTRY), media_type=CONTENT_TYPE_LATEST)
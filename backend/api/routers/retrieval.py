@@ -1,22 +1,38 @@
 import logging
-from typing import List
+from typing import Any, Dict, List, Optional
 
 import config  # Import module for dynamic config access
-from api.models import SearchItem
-from domain.errors import SearchError, ServiceUnavailableError
-from domain.retrieval import search_documents
-from fastapi import APIRouter, HTTPException, Query
+from api.models import SearchBatchRequest, SearchBatchResult, SearchItem
+from domain.errors import (
+    InvalidSearchRequestError,
+    SearchError,
+    ServiceUnavailableError,
+)
+from domain.retrieval import (
+    get_retrieval_plan,
+    get_retrieval_plans,
+    search_documents,
+    search_documents_batch,
+)
+from fastapi import APIRouter, HTTPException, Query, Response
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="", tags=["retrieval"])
 
+# Name of the retrieval plan that produced a response
+PLAN_HEADER = "X-Retrieval-Plan"
+
 
 @router.get("/search", response_model=List[SearchItem])
 async def search(
+    response: Response,
     q: str = Query(..., description="User query"),
     k: int = Query(default=10, ge=1, le=50, description="Number of results to return"),
     include_ocr: bool = Query(False, description="Include OCR results if available"),
+    plan: Optional[str] = Query(
+        None, description="Retrieval plan name (server default when omitted)"
+    ),
 ):
     top_k: int = k if k else int(getattr(config, "DEFAULT_TOP_K", 10))
 
@@ -27,12 +43,53 @@ async def search(
             "query": q,
             "top_k": top_k,
             "include_ocr": include_ocr,
+            "retrieval_plan": plan,
         },
     )
 
     try:
-        return await search_documents(q, top_k, include_ocr)
+        retrieval_plan = get_retrieval_plan(plan)
+        results = await search_documents(q, top_k, include_ocr, retrieval_plan)
+        response.headers[PLAN_HEADER] = retrieval_plan.name
+        return results
+    except InvalidSearchRequestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except ServiceUnavailableError as e:
         raise HTTPException(status_code=503, detail=str(e))
     except SearchError as e:
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post("/search/batch", response_model=List[SearchBatchResult])
+async def search_batch(request: SearchBatchRequest, response: Response):
+    """Run several searches with one ColPali call and one Qdrant batch query."""
+    logger.info(
+        "Batch search request received",
+        extra={
+            "operation": "search_batch",
+            "query_count": len(request.queries),
+            "top_k": request.k,
+            "include_ocr": request.include_ocr,
+            "retrieval_plan": request.plan,
+        },
+    )
+
+    try:
+        retrieval_plan = get_retrieval_plan(request.plan)
+        results = await search_documents_batch(
+            request.queries, request.k, request.include_ocr, retrieval_plan
+        )
+        response.headers[PLAN_HEADER] = retrieval_plan.name
+        return results
+    except InvalidSearchRequestError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except ServiceUnavailableError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except SearchError as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.get("/search/plans", response_model=List[Dict[str, Any]])
+async def search_plans():
+    """Retrieval plans usable with the current collection, with their stages."""
+    return get_retrieval_plans()
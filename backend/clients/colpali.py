@@ -1,9 +1,14 @@
 import io
 import logging
-from typing import Any, List, Optional, Union
+import threading
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple, Union
 
+import config
 import numpy as np
 import requests
+from clients import colpali_wire
+from clients.colpali_endpoints import EndpointPool
 from config import COLPALI_API_TIMEOUT, COLPALI_URL
 from PIL import Image
 from requests.adapters import HTTPAdapter
@@ -11,55 +16,158 @@ from urllib3.util.retry import Retry
 from utils.timing import log_execution_time
 
 
+def parse_endpoint_urls(value: Optional[str]) -> List[str]:
+    """Split a comma-separated list of ColPali base URLs."""
+    return [url.strip().rstrip("/") for url in (value or "").split(",") if url.strip()]
+
+
 class ColPaliClient:
-    """Client for ColPali Embedding API"""
+    """Client for ColPali Embedding API.
+
+    ``base_url`` (or ``COLPALI_URL``) may list several replicas separated by
+    commas; requests are then balanced across them by ``EndpointPool`` and
+    fail over to another replica on connection errors and 5xx responses.
+    """
+
+    # Connections kept per replica; covers parallel embedding workers plus
+    # concurrent searches without reconnecting
+    POOL_MAXSIZE = 32
+
+    # Patch grids depend only on the model and (width, height); bound the
+    # memo so unusual page sizes cannot grow it without limit
+    PATCH_CACHE_MAX_ENTRIES = 4096
+
+    # How long the model id from /info is trusted before it is re-read, so
+    # a service redeployed with another model is noticed
+    MODEL_ID_TTL_S = 60.0
 
     def __init__(self, base_url: Optional[str] = None, timeout: Optional[int] = None):
-        default_base = COLPALI_URL or "http://localhost:7000"
-        self.base_url = base_url or default_base
+        urls = parse_endpoint_urls(base_url or COLPALI_URL) or ["http://localhost:7000"]
+        self.endpoints = EndpointPool(urls)
+        # First replica; kept for callers that log or display the service URL
+        self.base_url = urls[0]
         self.timeout = timeout or COLPALI_API_TIMEOUT
 
-        # Remove trailing slash
-        self.base_url = self.base_url.rstrip("/")
-
         # Logger
         self._logger = logging.getLogger(__name__)
 
-        # Session with retries/backoff
-        retry = Retry(
-            total=3,
-            connect=3,
-            read=3,
-            status=3,
-            backoff_factor=0.5,
-            status_forcelist=[429, 500, 502, 503, 504],
-            allowed_methods={"GET", "POST"},
-            raise_on_status=False,
+        # (width, height) -> validated /patches result
+        self._patch_cache: Dict[Tuple[int, int], dict[str, Union[int, str]]] = {}
+        self._patch_cache_lock = threading.Lock()
+
+        self._model_id: Optional[str] = None
+        self._model_id_checked_at = float("-inf")
+
+        # Session with retries/backoff. With several replicas, failing over
+        # to another one beats retrying the same one, so only a single
+        # endpoint gets in-place retries.
+        if len(urls) == 1:
+            retry = Retry(
+                total=3,
+                connect=3,
+                read=3,
+                status=3,
+                backoff_factor=0.5,
+                status_forcelist=[429, 500, 502, 503, 504],
+                allowed_methods={"GET", "POST"},
+                raise_on_status=False,
+            )
+        else:
+            retry = Retry(total=0, raise_on_status=False)
+        adapter = HTTPAdapter(
+            max_retries=retry,
+            pool_connections=len(urls),
+            pool_maxsize=self.POOL_MAXSIZE,
         )
-        adapter = HTTPAdapter(max_retries=retry)
         self.session = requests.Session()
         self.session.mount("http://", adapter)
         self.session.mount("https://", adapter)
 
+    def _request(self, method: str, path: str, **kwargs: Any) -> requests.Response:
+        """Send a request to the least-loaded healthy replica.
+
+        Connection errors, timeouts and 5xx responses count against the
+        replica and the request is retried on the next one; the last
+        response (or error) is returned once every replica was tried.
+        """
+        kwargs.setdefault("timeout", self.timeout)
+        tried: list = []
+        last_error: Optional[Exception] = None
+        while True:
+            endpoint = self.endpoints.acquire(exclude=tried)
+            if endpoint is None:
+                break
+            tried.append(endpoint)
+            # Multipart buffers are consumed by a failed attempt
+            files = kwargs.get("files") or []
+            parts = files.values() if isinstance(files, dict) else [f for _, f in files]
+            for _, buffer, _ in parts:
+                buffer.seek(0)
+
+            start = time.monotonic()
+            try:
+                response = self.session.request(
+                    method, f"{endpoint.url}{path}", **kwargs
+                )
+            except requests.RequestException as exc:
+                self.endpoints.release(endpoint, time.monotonic() - start, False)
+                self._logger.warning(f"ColPali replica {endpoint.url} failed: {exc}")
+                last_error = exc
+                continue
+
+            server_error = response.status_code >= 500
+            self.endpoints.release(endpoint, time.monotonic() - start, not server_error)
+            if server_error and len(tried) < len(self.endpoints.endpoints):
+                self._logger.warning(
+                    f"ColPali replica {endpoint.url} returned "
+                    f"{response.status_code}; trying another replica"
+                )
+                continue
+            return response
+
+        raise last_error or requests.ConnectionError("No ColPali replica available")
+
+    def endpoint_stats(self) -> List[dict[str, object]]:
+        """Per-replica routing state (outstanding requests, latency, ejection)."""
+        return self.endpoints.stats()
+
     def health_check(self) -> bool:
-        """Check if the API is healthy"""
-        try:
-            response = self.session.get(f"{self.base_url}/health", timeout=self.timeout)
-            return response.status_code == 200
-        except Exception as e:
-            self._logger.warning(f"ColPali health check failed: {e}")
-            return False
+        """Check if the API is healthy (any replica is)"""
+        healthy = False
+        for endpoint in self.endpoints.endpoints:
+            try:
+                response = self.session.get(
+                    f"{endpoint.url}/health", timeout=self.timeout
+                )
+                ok = response.status_code == 200
+            except Exception as e:
+                self._logger.warning(
+                    f"ColPali health check failed for {endpoint.url}: {e}"
+                )
+                ok = False
+            self.endpoints.mark_health(endpoint, ok)
+            healthy = healthy or ok
+        return healthy
 
     def get_info(self) -> dict:
         """Get API version information"""
         try:
-            response = self.session.get(f"{self.base_url}/info", timeout=self.timeout)
+            response = self._request("GET", "/info")
             response.raise_for_status()
             return response.json()
         except Exception as e:
             self._logger.error(f"Failed to get API info: {e}")
             return {}
 
+    def model_id(self) -> Optional[str]:
+        """Model id reported by ``/info`` (memoized; None if unavailable)."""
+        now = time.monotonic()
+        if now - self._model_id_checked_at > self.MODEL_ID_TTL_S:
+            model_id = self.get_info().get("model_id")
+            self._model_id = str(model_id) if model_id else None
+            self._model_id_checked_at = now
+        return self._model_id
+
     def cancel_job(self, job_id: str) -> bool:
         """Request cancellation of a job.
 
@@ -72,9 +180,18 @@ class ColPaliClient:
         Returns:
             True if cancellation request was accepted, False otherwise
         """
+        # The job's batches may be spread over every replica
+        return any(
+            [
+                self._cancel_on(endpoint.url, job_id)
+                for endpoint in self.endpoints.endpoints
+            ]
+        )
+
+    def _cancel_on(self, base_url: str, job_id: str) -> bool:
         try:
             response = self.session.post(
-                f"{self.base_url}/cancel",
+                f"{base_url}/cancel",
                 json={"job_id": job_id},
                 timeout=5,  # Short timeout for cancellation
             )
@@ -101,8 +218,17 @@ class ColPaliClient:
         will exit and automatically restart if configured with a restart policy.
 
         Returns:
-            True if restart request was accepted, False otherwise
+            True if every replica accepted the restart request, False otherwise
         """
+        # The service may come back with a different model
+        with self._patch_cache_lock:
+            self._patch_cache.clear()
+        self._model_id_checked_at = float("-inf")
+        return all(
+            [self._restart_on(endpoint.url) for endpoint in self.endpoints.endpoints]
+        )
+
+    def _restart_on(self, base_url: str) -> bool:
         try:
             # Create a new session WITHOUT retry logic for restart
             # We expect connection errors/timeouts when service restarts
@@ -111,7 +237,7 @@ class ColPaliClient:
             restart_session = requests.Session()
 
             response = restart_session.post(
-                f"{self.base_url}/restart",
+                f"{base_url}/restart",
                 timeout=2,  # Very short timeout - service will exit immediately
             )
             restart_session.close()
@@ -137,6 +263,11 @@ class ColPaliClient:
             self._logger.warning(f"ColPali restart request failed: {e}")
             return False
 
+    def _embedding_headers(self) -> dict[str, str]:
+        """Accept header negotiating the binary embedding format, if enabled."""
+        accept = colpali_wire.accept_header(str(config.COLPALI_WIRE_FORMAT))
+        return {"Accept": accept} if accept else {}
+
     def _validate_patch_results(
         self, results: list, expected_count: int
     ) -> List[dict[str, Union[int, str]]]:
@@ -177,8 +308,11 @@ class ColPaliClient:
 
     def _validate_embeddings(
         self, embeddings: list, expected_count: int, context: str = "embeddings"
-    ) -> List[List[List[float]]]:
-        """Validate embeddings from ColPali API.
+    ) -> List[np.ndarray]:
+        """Validate JSON embeddings from ColPali API.
+
+        Each embedding is checked as a whole with numpy (2-D, non-empty,
+        finite) instead of walking every float in Python.
 
         Args:
             embeddings: Raw embeddings from API
@@ -186,7 +320,7 @@ class ColPaliClient:
             context: Context for error messages
 
         Returns:
-            Validated embeddings
+            Validated embeddings as float32 [tokens, dim] arrays
 
         Raises:
             ValueError: If embeddings are malformed
@@ -199,6 +333,7 @@ class ColPaliClient:
                 f"{context}: Expected {expected_count} embeddings, got {len(embeddings)}"
             )
 
+        matrices = []
         for i, embedding in enumerate(embeddings):
             if not isinstance(embedding, list):
                 raise ValueError(
@@ -208,19 +343,21 @@ class ColPaliClient:
             if not embedding:
                 raise ValueError(f"{context}: Embedding {i} is empty")
 
-            # Validate each vector in the embedding
-            for j, vector in enumerate(embedding):
-                if not isinstance(vector, list):
-                    raise ValueError(
-                        f"{context}: Embedding {i} vector {j} is not a list"
-                    )
-                # Validate each element is numeric
-                if not all(isinstance(v, (int, float)) for v in vector):
-                    raise ValueError(
-                        f"{context}: Embedding {i} vector {j} contains non-numeric values"
-                    )
+            try:
+                matrix = np.asarray(embedding, dtype=np.float32)
+            except (TypeError, ValueError):
+                raise ValueError(
+                    f"{context}: Embedding {i} contains ragged or non-numeric vectors"
+                )
+            if matrix.ndim != 2 or matrix.shape[1] == 0:
+                raise ValueError(
+                    f"{context}: Embedding {i} has invalid shape {matrix.shape}"
+                )
+            if not np.isfinite(matrix).all():
+                raise ValueError(f"{context}: Embedding {i} contains non-finite values")
+            matrices.append(matrix)
 
-        return embeddings
+        return matrices
 
     def get_patches(
         self, dimensions: List[dict[str, int]]
@@ -232,24 +369,46 @@ class ColPaliClient:
 
         Returns:
             List of dictionaries containing patch information for each dimension
+
+        Results are memoized per (width, height); only unseen sizes are sent
+        to the service.
         """
         try:
-            payload = {"dimensions": dimensions}
-            response = self.session.post(
-                f"{self.base_url}/patches", json=payload, timeout=self.timeout
-            )
-            response.raise_for_status()
-            result = response.json()
-            if "results" not in result:
-                raise KeyError("Missing 'results' in ColPali /patches response")
-
-            # Validate response structure
-            return self._validate_patch_results(result["results"], len(dimensions))
+            keys = [(int(dim["width"]), int(dim["height"])) for dim in dimensions]
+            with self._patch_cache_lock:
+                known = {
+                    key: self._patch_cache[key]
+                    for key in keys
+                    if key in self._patch_cache
+                }
+            missing = list(dict.fromkeys(key for key in keys if key not in known))
+
+            if missing:
+                payload = {
+                    "dimensions": [{"width": w, "height": h} for w, h in missing]
+                }
+                response = self._request("POST", "/patches", json=payload)
+                response.raise_for_status()
+                result = response.json()
+                if "results" not in result:
+                    raise KeyError("Missing 'results' in ColPali /patches response")
+
+                # Validate response structure
+                fetched = self._validate_patch_results(result["results"], len(missing))
+                known.update(zip(missing, fetched))
+                with self._patch_cache_lock:
+                    if len(self._patch_cache) + len(missing) > (
+                        self.PATCH_CACHE_MAX_ENTRIES
+                    ):
+                        self._patch_cache.clear()
+                    self._patch_cache.update(zip(missing, fetched))
+
+            return [dict(known[key]) for key in keys]
         except Exception as e:
             raise Exception(f"Failed to get patches: {e}")
 
     @log_execution_time("embed queries", log_level=logging.INFO, warn_threshold_ms=1000)
-    def embed_queries(self, queries: Union[str, List[str]]) -> List[List[List[float]]]:
+    def embed_queries(self, queries: Union[str, List[str]]) -> List[np.ndarray]:
         """
         Generate embeddings for text queries
 
@@ -257,17 +416,26 @@ class ColPaliClient:
             queries: Single query string or list of query strings
 
         Returns:
-            List of embeddings (each embedding is a list of vectors)
+            List of embeddings, one float32 [tokens, dim] array per query
         """
         try:
             query_count = 1 if isinstance(queries, str) else len(queries)
             self._logger.debug(f"Embedding {query_count} queries via ColPali API")
 
             payload = {"queries": queries}
-            response = self.session.post(
-                f"{self.base_url}/embed/queries", json=payload, timeout=self.timeout
+            response = self._request(
+                "POST",
+                "/embed/queries",
+                json=payload,
+                headers=self._embedding_headers(),
             )
             response.raise_for_status()
+            if colpali_wire.is_binary_response(response.headers.get("Content-Type")):
+                items = colpali_wire.decode_embeddings(
+                    response.content, query_count, "query embeddings"
+                )
+                return [item["embedding"] for item in items]
+
             result = response.json()
             if "embeddings" not in result:
                 raise KeyError(
@@ -297,44 +465,83 @@ class ColPaliClient:
         finally:
             img_byte_arr.close()
 
+    @staticmethod
+    def _encoded_to_file(encoded: Any, idx: int) -> tuple:
+        """Wrap an already encoded image (``data``/``content_type``) as a form file."""
+        content_type = encoded.content_type or "image/png"
+        extension = content_type.split("/")[-1].replace("jpeg", "jpg")
+        return (
+            "files",
+            (f"image_{idx}.{extension}", io.BytesIO(encoded.data), content_type),
+        )
+
     @log_execution_time("embed images", log_level=logging.DEBUG, warn_threshold_ms=5000)
-    def embed_images(self, images: List[Image.Image]) -> List[dict[str, Any]]:
+    def embed_images(
+        self,
+        images: Sequence[Image.Image],
+        encoded_images: Optional[Sequence[Any]] = None,
+        pooling: str = "none",
+    ) -> List[dict[str, Any]]:
         """
         Generate embeddings for images with proper resource cleanup
 
         Args:
             images: List of PIL Image objects
+            encoded_images: Optional pre-encoded images (objects exposing ``data``
+                and ``content_type``); skips local PNG encoding when provided
+            pooling: ``include`` asks the service for row/column mean-pooled
+                variants as well, ``only`` for the pooled variants alone
 
         Returns:
             List of ImageEmbeddingItem dicts containing:
-            - embedding: List[List[float]] - The actual embedding vectors
+            - embedding: The embedding vectors ([tokens, dim] float32 array
+              with the binary wire format, List[List[float]] with JSON)
             - image_patch_start: int - Index where image tokens begin
             - image_patch_len: int - Number of image tokens
             - image_patch_indices: List[int] - Explicit positions of image tokens
+            - n_patches_x / n_patches_y: Patch grid (services that report it)
+            - pooled_by_rows / pooled_by_columns: Pooled variants (when
+              requested and supported by the service)
         """
         files = []
         buffers = []  # Track all BytesIO objects for cleanup
         try:
             self._logger.debug(f"Embedding {len(images)} images via ColPali API")
 
-            # Parallelize image encoding to maximize CPU utilization
-            from concurrent.futures import ThreadPoolExecutor
-
-            with ThreadPoolExecutor(max_workers=min(8, len(images))) as executor:
-                files = list(
-                    executor.map(
-                        lambda args: self._encode_image_to_bytes(args[1], args[0]),
-                        enumerate(images),
+            if encoded_images:
+                # Pipeline already encoded the upload variant once
+                files = [
+                    self._encoded_to_file(encoded, idx)
+                    for idx, encoded in enumerate(encoded_images)
+                ]
+            else:
+                # Parallelize image encoding to maximize CPU utilization
+                from concurrent.futures import ThreadPoolExecutor
+
+                with ThreadPoolExecutor(max_workers=min(8, len(images))) as executor:
+                    files = list(
+                        executor.map(
+                            lambda args: self._encode_image_to_bytes(args[1], args[0]),
+                            enumerate(images),
+                        )
                     )
-                )
 
             # Extract all BytesIO buffers for explicit tracking
             buffers = [buf for _, (_, buf, _) in files]
 
-            response = self.session.post(
-                f"{self.base_url}/embed/images", files=files, timeout=self.timeout
+            response = self._request(
+                "POST",
+                "/embed/images",
+                files=files,
+                params={"pooling": pooling} if pooling != "none" else None,
+                headers=self._embedding_headers(),
             )
             response.raise_for_status()
+            if colpali_wire.is_binary_response(response.headers.get("Content-Type")):
+                return colpali_wire.decode_embeddings(
+                    response.content, len(files), "image embeddings"
+                )
+
             result = response.json()
 
             # Log response structure for debugging
@@ -470,12 +677,7 @@ class ColPaliClient:
             files = {"file": ("image.png", img_byte_arr, "image/png")}
             data = {"query": query}
 
-            response = self.session.post(
-                f"{self.base_url}/interpret",
-                data=data,
-                files=files,
-                timeout=self.timeout,
-            )
+            response = self._request("POST", "/interpret", data=data, files=files)
             response.raise_for_status()
 
             return response.json()
@@ -0,0 +1,149 @@
+"""Replica selection for the ColPali client.
+
+Requests are routed to the replica with the fewest outstanding requests,
+breaking ties by an exponentially weighted moving average of latency. A
+replica that fails several requests in a row (connection errors, timeouts,
+5xx) is ejected for a cool-down that doubles on each repeated ejection;
+after the cool-down it is offered a single trial request and rejoins the
+rotation once that succeeds.
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+
+class ColPaliEndpoint:
+    """Routing state of one ColPali replica."""
+
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self.outstanding = 0
+        self.latency_ewma_s: Optional[float] = None
+        self.consecutive_failures = 0
+        self.ejections = 0
+        self.ejected_until = 0.0
+        self.trial_in_flight = False
+
+    def is_available(self, now: float) -> bool:
+        if now >= self.ejected_until:
+            # Cool-down over: allow one trial at a time until it succeeds
+            return not (self.ejections and self.trial_in_flight)
+        return False
+
+
+class EndpointPool:
+    """Least-outstanding-requests balancer with failure-based ejection."""
+
+    def __init__(
+        self,
+        urls: Sequence[str],
+        failure_threshold: int = 3,
+        base_ejection_s: float = 5.0,
+        max_ejection_s: float = 120.0,
+        ewma_alpha: float = 0.3,
+    ):
+        """Initialize pool.
+
+        Args:
+            urls: Base URLs of the replicas
+            failure_threshold: Consecutive failures before a replica is ejected
+            base_ejection_s: First ejection cool-down (doubles per ejection)
+            max_ejection_s: Upper bound for the cool-down
+            ewma_alpha: Weight of the newest latency sample
+        """
+        if not urls:
+            raise ValueError("At least one ColPali endpoint is required")
+        self.endpoints: List[ColPaliEndpoint] = [ColPaliEndpoint(url) for url in urls]
+        self.failure_threshold = max(1, failure_threshold)
+        self.base_ejection_s = base_ejection_s
+        self.max_ejection_s = max_ejection_s
+        self.ewma_alpha = ewma_alpha
+        self._lock = threading.Lock()
+
+    def _pick(self, exclude: Sequence[ColPaliEndpoint]) -> Optional[ColPaliEndpoint]:
+        now = time.monotonic()
+        candidates = [ep for ep in self.endpoints if ep not in exclude]
+        available = [ep for ep in candidates if ep.is_available(now)]
+        if not available:
+            if not candidates:
+                return None
+            # Everything is ejected: try the replica that recovers soonest
+            # rather than failing outright
+            return min(candidates, key=lambda ep: ep.ejected_until)
+        return min(
+            available,
+            key=lambda ep: (ep.outstanding, ep.latency_ewma_s or 0.0),
+        )
+
+    def acquire(
+        self, exclude: Sequence[ColPaliEndpoint] = ()
+    ) -> Optional[ColPaliEndpoint]:
+        """Reserve the best replica not in ``exclude`` (None if none is left)."""
+        with self._lock:
+            endpoint = self._pick(exclude)
+            if endpoint is not None:
+                endpoint.outstanding += 1
+                if endpoint.ejections:
+                    endpoint.trial_in_flight = True
+            return endpoint
+
+    def release(
+        self, endpoint: ColPaliEndpoint, elapsed_s: float, success: bool
+    ) -> None:
+        """Return a replica and record the outcome of its request."""
+        with self._lock:
+            endpoint.outstanding = max(0, endpoint.outstanding - 1)
+            endpoint.trial_in_flight = False
+            if success:
+                endpoint.consecutive_failures = 0
+                endpoint.ejections = 0
+                endpoint.ejected_until = 0.0
+                if endpoint.latency_ewma_s is None:
+                    endpoint.latency_ewma_s = elapsed_s
+                else:
+                    endpoint.latency_ewma_s += self.ewma_alpha * (
+                        elapsed_s - endpoint.latency_ewma_s
+                    )
+                return
+
+            endpoint.consecutive_failures += 1
+            if endpoint.ejections or (
+                endpoint.consecutive_failures >= self.failure_threshold
+            ):
+                self._eject(endpoint)
+
+    def mark_health(self, endpoint: ColPaliEndpoint, healthy: bool) -> None:
+        """Apply the result of an explicit health probe."""
+        with self._lock:
+            if healthy:
+                endpoint.consecutive_failures = 0
+                endpoint.ejections = 0
+                endpoint.ejected_until = 0.0
+            elif not endpoint.ejected_until > time.monotonic():
+                self._eject(endpoint)
+
+    def _eject(self, endpoint: ColPaliEndpoint) -> None:
+        cooldown = min(
+            self.max_ejection_s, self.base_ejection_s * (2**endpoint.ejections)
+        )
+        endpoint.ejections += 1
+        endpoint.ejected_until = time.monotonic() + cooldown
+
+    def stats(self) -> List[Dict[str, object]]:
+        """Snapshot of per-replica routing state."""
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "url": ep.url,
+                    "outstanding": ep.outstanding,
+                    "latency_ewma_ms": (
+                        round(ep.latency_ewma_s * 1000, 1)
+                        if ep.latency_ewma_s is not None
+                        else None
+                    ),
+                    "ejected": ep.ejected_until > now,
+                }
+                for ep in self.endpoints
+            ]
@@ -0,0 +1,107 @@
+"""Decoder for the ColPali service's binary embedding wire format.
+
+Mirrors ``colpali/app/utils/wire_format.py``:
+
+    b"CPE1" | uint32 LE header length | UTF-8 JSON header | payload
+
+The header lists each item's ``rows`` and byte ``offset`` within the payload
+(plus per-item metadata such as image-token boundaries); every item is a
+little-endian ``[rows, dim]`` matrix of the header's ``dtype``. Additional
+matrices of an item (e.g. server-side pooled variants) are described under
+``tensors`` as ``{name: {"rows", "offset"}}``.
+"""
+
+import json
+import struct
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+MEDIA_TYPE = "application/x-colpali-embeddings"
+MAGIC = b"CPE1"
+SUPPORTED_DTYPES = {"float16": "<f2", "float32": "<f4"}
+
+
+def accept_header(wire_format: str) -> Optional[str]:
+    """Accept header for the configured wire format (None requests JSON)."""
+    wire_format = (wire_format or "").strip().lower()
+    if wire_format not in SUPPORTED_DTYPES:
+        return None
+    return f"{MEDIA_TYPE}; dtype={wire_format}, application/json;q=0.5"
+
+
+def is_binary_response(content_type: Optional[str]) -> bool:
+    return (content_type or "").split(";")[0].strip().lower() == MEDIA_TYPE
+
+
+def decode_embeddings(
+    content: bytes, expected_count: int, context: str = "embeddings"
+) -> List[Dict[str, Any]]:
+    """Decode a binary embedding response.
+
+    Args:
+        content: Raw response body
+        expected_count: Number of items the request asked for
+        context: Context for error messages
+
+    Returns:
+        One dict per item with ``embedding`` (and any named ``tensors``, e.g.
+        ``pooled_by_rows``) as float32 ``[rows, dim]`` arrays plus the item's
+        metadata fields. ``embedding`` is absent if the service omitted it.
+
+    Raises:
+        ValueError: If the payload is malformed or contains non-finite values
+    """
+    view = memoryview(content)
+    prefix = len(MAGIC) + 4
+    if len(view) < prefix or bytes(view[: len(MAGIC)]) != MAGIC:
+        raise ValueError(f"{context}: not a ColPali binary embedding payload")
+
+    (header_len,) = struct.unpack_from("<I", view, len(MAGIC))
+    if prefix + header_len > len(view):
+        raise ValueError(f"{context}: truncated header")
+    try:
+        header = json.loads(bytes(view[prefix : prefix + header_len]))
+        dtype = np.dtype(SUPPORTED_DTYPES[header["dtype"]])
+        dim = int(header["dim"])
+        items = header["items"]
+    except (KeyError, TypeError, ValueError) as exc:
+        raise ValueError(f"{context}: invalid header ({exc})") from exc
+
+    if len(items) != expected_count:
+        raise ValueError(
+            f"{context}: Expected {expected_count} embeddings, got {len(items)}"
+        )
+    if dim <= 0:
+        raise ValueError(f"{context}: invalid embedding dimension {dim}")
+
+    payload = view[prefix + header_len :]
+    row_bytes = dim * dtype.itemsize
+
+    def read_matrix(location: Dict[str, Any], label: str) -> np.ndarray:
+        rows = int(location.get("rows", 0))
+        offset = int(location.get("offset", -1))
+        if rows <= 0:
+            raise ValueError(f"{context}: {label} is empty")
+        if offset < 0 or offset + rows * row_bytes > len(payload):
+            raise ValueError(f"{context}: {label} exceeds the payload")
+        matrix = np.frombuffer(payload, dtype=dtype, count=rows * dim, offset=offset)
+        # astype copies, so the result owns its memory (and is native float32)
+        return matrix.reshape(rows, dim).astype(np.float32)
+
+    decoded: List[Dict[str, Any]] = []
+    arrays: List[np.ndarray] = []
+    for i, item in enumerate(items):
+        tensors = item.pop("tensors", None) or {}
+        if "rows" in item or not tensors:
+            location = {"rows": item.pop("rows", 0), "offset": item.pop("offset", -1)}
+            item["embedding"] = read_matrix(location, f"Embedding {i}")
+            arrays.append(item["embedding"])
+        for name, location in tensors.items():
+            item[name] = read_matrix(location, f"{name} {i}")
+            arrays.append(item[name])
+        decoded.append(item)
+
+    if not all(np.isfinite(array).all() for array in arrays):
+        raise ValueError(f"{context}: embeddings contain non-finite values")
+    return decoded
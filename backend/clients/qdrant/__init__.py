@@ -3,11 +3,16 @@
 from .client import QdrantClient
 from .collection import CollectionManager
 from .embedding import EmbeddingProcessor
+from .retrieval_plan import RetrievalPlan, RetrievalStage, list_plans, resolve_plan
 from .search import SearchManager
 
 __all__ = [
     "QdrantClient",
     "CollectionManager",
     "EmbeddingProcessor",
+    "RetrievalPlan",
+    "RetrievalStage",
     "SearchManager",
+    "list_plans",
+    "resolve_plan",
 ]
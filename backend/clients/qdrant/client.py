@@ -1,7 +1,7 @@
 """Main Qdrant service that orchestrates all operations."""
 
 import logging
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Union
 
 from PIL import Image
 
@@ -13,6 +13,8 @@ if TYPE_CHECKING:
     from clients.colpali import ColPaliClient
     from clients.local_storage import LocalStorageClient
 
+    from .retrieval_plan import RetrievalPlan
+
 logger = logging.getLogger(__name__)
 
 
@@ -78,7 +80,11 @@ class QdrantClient:
 
     # Search methods
     def search_with_metadata(
-        self, query: str, k: int = 5, payload_filter: Optional[dict] = None
+        self,
+        query: str,
+        k: int = 5,
+        payload_filter: Optional[dict] = None,
+        plan: Optional["RetrievalPlan"] = None,
     ):
         """Search and return metadata with image URLs.
 
@@ -89,7 +95,23 @@ class QdrantClient:
         payload_filter: optional dict of equality filters, e.g.
           {"filename": "doc.pdf", "pdf_page_index": 3}
         """
-        return self.search_manager.search_with_metadata(query, k, payload_filter)
+        return self.search_manager.search_with_metadata(query, k, payload_filter, plan)
+
+    def search_batch_with_metadata(
+        self,
+        queries: List[str],
+        k: Union[int, Sequence[int]] = 5,
+        payload_filter: Optional[dict] = None,
+        plan: Optional["RetrievalPlan"] = None,
+    ) -> List[Dict[str, Any]]:
+        """Search several queries with one embedding call and one Qdrant request.
+
+        Returns one dict per query with ``items``, ``cached`` and timings;
+        see SearchManager.search_batch_with_metadata().
+        """
+        return self.search_manager.search_batch_with_metadata(
+            queries, k, payload_filter, plan
+        )
 
     def search(self, query: str, k: int = 5):
         """Search for relevant documents and return metadata with URLs.
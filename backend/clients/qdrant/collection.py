@@ -4,6 +4,7 @@ import logging
 from typing import TYPE_CHECKING, Optional
 
 from qdrant_client import QdrantClient, models
+from utils.search_cache import bump_collection_version
 
 if TYPE_CHECKING:
     from clients.colpali import ColPaliClient
@@ -143,6 +144,7 @@ class CollectionManager:
             # If not exists, ignore and proceed to (re)create
             if "not found" not in str(e).lower():
                 raise Exception(f"Failed to delete collection: {e}")
+        bump_collection_version(self.collection_name)
 
         # Recreate with correct vectors config
         self.create_collection_if_not_exists()
@@ -202,6 +204,7 @@ class CollectionManager:
             self.service.delete(
                 collection_name=collection, points_selector=points_filter
             )
+            bump_collection_version(collection)
 
             logger.info(
                 f"Deleted {points_count} points for filename '{filename}' from collection '{collection}'"
@@ -1,8 +1,10 @@
 """Embedding and pooling operations for image processing."""
 
 import logging
+import threading
+from collections import OrderedDict
 from concurrent.futures import ThreadPoolExecutor
-from typing import TYPE_CHECKING, Any, List, Optional, Tuple
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
 
 import numpy as np
 from PIL import Image
@@ -28,11 +30,21 @@ class EmbeddingProcessor:
         """
         self.api_client = api_client
 
+        # (model id, query) -> float16 [tokens, dim] embedding, LRU order
+        self._query_cache: "OrderedDict[Tuple[str, str], np.ndarray]" = OrderedDict()
+        self._query_cache_lock = threading.Lock()
+
     def _require_client(self) -> "ColPaliClient":
         if self.api_client is None:
             raise ValueError("ColPali API client is not initialized")
         return self.api_client
 
+    def model_id(self) -> Optional[str]:
+        """ColPali model id from ``/info`` (None without a client or if unknown)."""
+        if self.api_client is None:
+            return None
+        return self.api_client.model_id()
+
     def get_patches(self, image_size: Tuple[int, int]) -> Tuple[int, int]:
         """Get number of patches for image using API."""
         api_client = self._require_client()
@@ -50,8 +62,12 @@ class EmbeddingProcessor:
         x_patches: int,
         y_patches: int,
         patch_indices: Optional[List[int]] = None,
-    ) -> Tuple[List[List[float]], List[List[float]]]:
-        """Mean-pool image tokens by rows and columns, preserving prefix/postfix tokens."""
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Mean-pool image tokens by rows and columns, preserving prefix/postfix tokens.
+
+        Returns:
+            (pooled_by_rows, pooled_by_columns) as contiguous float32 arrays
+        """
         total_tokens = image_embedding_np.shape[0]
 
         if patch_len <= 0:
@@ -59,14 +75,24 @@ class EmbeddingProcessor:
                 f"Invalid image token boundaries: start={start}, patch_len={patch_len}"
             )
 
-        indices: Optional[np.ndarray]
         if patch_indices:
-            indices_array = np.array(sorted(set(int(idx) for idx in patch_indices)))
-            if indices_array.size != patch_len:
+            indices = np.unique(np.asarray(patch_indices, dtype=np.int64))
+            if indices.size != patch_len:
                 raise ValueError(
                     "image_patch_len does not match the number of image_patch_indices"
                 )
-            indices = indices_array
+            if indices[0] < 0 or indices[-1] >= total_tokens:
+                raise ValueError(
+                    f"Image token indices out of bounds: total_tokens={total_tokens}"
+                )
+            image_patch_tokens = image_embedding_np[indices]
+            # Non-image tokens keep their order; the pooled block takes the
+            # place of the first image token
+            keep = np.ones(total_tokens, dtype=bool)
+            keep[indices] = False
+            positions = np.arange(total_tokens)
+            prefix_tokens = image_embedding_np[keep & (positions < indices[0])]
+            postfix_tokens = image_embedding_np[keep & (positions > indices[0])]
         else:
             if start < 0:
                 raise ValueError("image_patch_start was not provided")
@@ -75,18 +101,9 @@ class EmbeddingProcessor:
                 raise ValueError(
                     f"Image token slice out of bounds: end={end}, total_tokens={total_tokens}"
                 )
-            indices = None
-
-        if indices is None:
-            # Contiguous slice path (when patch_indices not provided)
             prefix_tokens = image_embedding_np[:start]
-            image_patch_tokens = image_embedding_np[start : start + patch_len]
-            postfix_tokens = image_embedding_np[start + patch_len :]
-        else:
-            # Non-contiguous indices path (when patch_indices provided)
-            image_patch_tokens = image_embedding_np[indices]
-            prefix_tokens = np.array([])
-            postfix_tokens = np.array([])
+            image_patch_tokens = image_embedding_np[start:end]
+            postfix_tokens = image_embedding_np[end:]
 
         # Reshape to [x_patches, y_patches, dim]
         if patch_len != x_patches * y_patches:
@@ -101,38 +118,13 @@ class EmbeddingProcessor:
         pooled_by_rows = np.mean(image_tokens, axis=0)  # [y_patches, dim]
         pooled_by_columns = np.mean(image_tokens, axis=1)  # [x_patches, dim]
 
-        pooled_rows_replacement = pooled_by_rows.reshape(-1, dim)
-        pooled_cols_replacement = pooled_by_columns.reshape(-1, dim)
-
-        if indices is None:
-            # Add back prefix/postfix using contiguous slice boundaries
-            postfix_tokens = image_embedding_np[start + patch_len :]
-            pooled_by_rows = np.concatenate(
-                [prefix_tokens, pooled_rows_replacement, postfix_tokens], axis=0
-            ).tolist()
-            pooled_by_columns = np.concatenate(
-                [prefix_tokens, pooled_cols_replacement, postfix_tokens], axis=0
-            ).tolist()
-        else:
-            indices_set = set(indices.tolist())
-
-            def replace_tokens(
-                replacement: np.ndarray,
-            ) -> List[List[float]]:
-                emitted_replacement = False
-                output: List[np.ndarray] = []
-                for idx in range(total_tokens):
-                    if idx in indices_set:
-                        if not emitted_replacement:
-                            for token in replacement:
-                                output.append(token)
-                            emitted_replacement = True
-                        continue
-                    output.append(image_embedding_np[idx])
-                return [token.tolist() for token in output]
-
-            pooled_by_rows = replace_tokens(pooled_rows_replacement)
-            pooled_by_columns = replace_tokens(pooled_cols_replacement)
+        # concatenate always returns a fresh contiguous array
+        pooled_by_rows = np.concatenate(
+            [prefix_tokens, pooled_by_rows, postfix_tokens], axis=0
+        ).astype(np.float32, copy=False)
+        pooled_by_columns = np.concatenate(
+            [prefix_tokens, pooled_by_columns, postfix_tokens], axis=0
+        ).astype(np.float32, copy=False)
 
         return pooled_by_rows, pooled_by_columns
 
@@ -162,7 +154,19 @@ class EmbeddingProcessor:
         if embedding_list is None:
             raise ValueError("Embedding list missing from API response")
 
+        # Already a float32 array when called from embed_and_mean_pool_batch
         image_embedding_np = np.asarray(embedding_list, dtype=np.float32)
+
+        server_rows = item.get("pooled_by_rows")
+        server_cols = item.get("pooled_by_columns")
+        if server_rows is not None and server_cols is not None:
+            # Pooled by the ColPali service on the model device
+            return (
+                image_embedding_np,
+                np.ascontiguousarray(server_rows, dtype=np.float32),
+                np.ascontiguousarray(server_cols, dtype=np.float32),
+            )
+
         x_patches = patch_result.get("n_patches_x")
         y_patches = patch_result.get("n_patches_y")
 
@@ -172,7 +176,7 @@ class EmbeddingProcessor:
                 f"Skipping mean pooling: patch calculation failed with error: "
                 f"{patch_result.get('error', 'missing patch dimensions')}"
             )
-            return image_embedding_np.tolist(), [], []
+            return image_embedding_np, [], []
 
         expected_local_patches = x_patches * y_patches
 
@@ -213,42 +217,88 @@ class EmbeddingProcessor:
             patch_indices=local_patch_indices,
         )
 
-        return image_embedding_np.tolist(), pooled_by_rows, pooled_by_columns
+        return image_embedding_np, pooled_by_rows, pooled_by_columns
+
+    def embed_and_mean_pool_batch(
+        self,
+        image_batch: Sequence[Image.Image],
+        encoded_images: Optional[Sequence[Any]] = None,
+    ):
+        """Embed images via API and optionally perform mean pooling.
 
-    def embed_and_mean_pool_batch(self, image_batch: List[Image.Image]):
-        """Embed images via API and optionally perform mean pooling."""
+        Embeddings stay contiguous float32 arrays (``[tokens, dim]`` per page)
+        all the way to ``PointFactory``; only the Qdrant request is built
+        from lists.
+
+        Args:
+            image_batch: Page images
+            encoded_images: Optional pre-encoded upload variants (objects with
+                ``data``, ``content_type``, ``width`` and ``height``). When given,
+                they are uploaded as-is and their dimensions drive the patch grid.
+        """
         api_client = self._require_client()
+        mean_pooling = bool(config.QDRANT_MEAN_POOLING_ENABLED)
+        # Services without server-side pooling ignore the parameter; their
+        # items are pooled locally below
+        pooling = (
+            "include"
+            if mean_pooling and bool(config.COLPALI_SERVER_SIDE_POOLING)
+            else "none"
+        )
         # API returns per-image dicts: {embedding, image_patch_start, image_patch_len, image_patch_indices}
-        api_items_raw = api_client.embed_images(image_batch)
+        api_items_raw = api_client.embed_images(
+            image_batch, encoded_images=encoded_images, pooling=pooling
+        )
         api_items: List[dict[str, Any]] = []
         for raw_item in api_items_raw:
             if not isinstance(raw_item, dict):
                 raise ValueError("embed_images() returned non-dict response")
             api_items.append(raw_item)
 
-        # Extract original embeddings
-        original_batch = []
+        # Extract original embeddings (JSON responses are converted once here;
+        # binary responses are already float32 arrays)
+        original_batch: List[np.ndarray] = []
         for item in api_items:
             if isinstance(item, dict) and "embedding" in item:
-                original_batch.append(item["embedding"])
+                embedding = np.ascontiguousarray(item["embedding"], dtype=np.float32)
+                item["embedding"] = embedding
+                original_batch.append(embedding)
             else:
                 raise ValueError(
                     "embed_images() returned data without embedding entries"
                 )
 
         # Skip pooling entirely if disabled
-        if not bool(config.QDRANT_MEAN_POOLING_ENABLED):
+        if not mean_pooling:
             return original_batch, [], []
 
-        dimensions = [
-            {"width": image.width, "height": image.height} for image in image_batch
-        ]
-        patch_results_raw = api_client.get_patches(dimensions)
         patch_results: List[dict[str, Any]] = []
-        for patch in patch_results_raw:
-            if not isinstance(patch, dict):
-                raise ValueError("get_patches() returned non-dict response")
-            patch_results.append(patch)
+        if all(
+            item.get("pooled_by_rows") is not None
+            and item.get("pooled_by_columns") is not None
+            for item in api_items
+        ):
+            # Pooled server-side; no patch grid needed
+            patch_results = [{} for _ in api_items]
+        elif all(
+            item.get("n_patches_x") is not None and item.get("n_patches_y") is not None
+            for item in api_items
+        ):
+            # Service computed the grid of each image it embedded
+            patch_results = [
+                {"n_patches_x": item["n_patches_x"], "n_patches_y": item["n_patches_y"]}
+                for item in api_items
+            ]
+        else:
+            # Older service: patch grid must match the image the model actually saw
+            sized_images = encoded_images if encoded_images else image_batch
+            dimensions = [
+                {"width": image.width, "height": image.height} for image in sized_images
+            ]
+            for patch in api_client.get_patches(dimensions):
+                if not isinstance(patch, dict):
+                    raise ValueError("get_patches() returned non-dict response")
+                patch_results.append(patch)
 
         pooled_by_rows_batch = []
         pooled_by_columns_batch = []
@@ -275,8 +325,54 @@ class EmbeddingProcessor:
 
         return original_batch, pooled_by_rows_batch, pooled_by_columns_batch
 
-    def batch_embed_query(self, query_batch: List[str]) -> np.ndarray:
-        """Embed a batch of queries using the API."""
+    def embed_queries(self, queries: List[str]) -> List[np.ndarray]:
+        """Embed queries, reusing cached embeddings.
+
+        Embeddings are kept as float16 in a bounded LRU keyed by the ColPali
+        model id and the exact query text (QUERY_EMBEDDING_CACHE_SIZE); only
+        uncached queries are sent to ColPali, in a single request. While
+        caching, every query gets the float16-rounded embedding, so results
+        do not depend on whether the cache was hit.
+
+        Returns:
+            One float32 [tokens, dim] array per query
+        """
+        if not queries:
+            return []
         api_client = self._require_client()
-        query_embeddings = api_client.embed_queries(query_batch)
-        return np.array(query_embeddings[0]) if query_embeddings else np.array([])
+        max_entries = int(getattr(config, "QUERY_EMBEDDING_CACHE_SIZE", 2048))
+        model_id = self.model_id() if max_entries > 0 else None
+        if not model_id:
+            return [
+                np.asarray(embedding, dtype=np.float32)
+                for embedding in api_client.embed_queries(queries)
+            ]
+
+        found: Dict[str, np.ndarray] = {}
+        with self._query_cache_lock:
+            for query in queries:
+                key = (model_id, query)
+                if key in self._query_cache:
+                    self._query_cache.move_to_end(key)
+                    found[query] = self._query_cache[key]
+
+        missing = [query for query in dict.fromkeys(queries) if query not in found]
+        if missing:
+            fetched = api_client.embed_queries(missing)
+            with self._query_cache_lock:
+                for query, embedding in zip(missing, fetched):
+                    compact = np.asarray(embedding, dtype=np.float16)
+                    found[query] = compact
+                    self._query_cache[(model_id, query)] = compact
+                    self._query_cache.move_to_end((model_id, query))
+                while len(self._query_cache) > max_entries:
+                    self._query_cache.popitem(last=False)
+
+        return [found[query].astype(np.float32) for query in queries]
+
+    def batch_embed_query(self, query_batch: List[str]) -> np.ndarray:
+        """Embed a batch of queries using the API (first query's embedding)."""
+        query_embeddings = self.embed_queries(query_batch)
+        if not query_embeddings:
+            return np.array([], dtype=np.float32)
+        return query_embeddings[0]
@@ -5,11 +5,24 @@ from datetime import datetime
 from typing import Dict, List
 
 import config
+import numpy as np
 from qdrant_client import models
 
 logger = logging.getLogger(__name__)
 
 
+def _to_vector(embedding):
+    """Multi-vector in the form accepted by ``models.PointStruct``.
+
+    Embeddings travel through the pipeline as float32 arrays; the Qdrant
+    request model only takes nested lists, so this is the single place
+    they are converted.
+    """
+    if isinstance(embedding, np.ndarray):
+        return embedding.tolist()
+    return embedding
+
+
 class PointFactory:
     """Builds Qdrant point payloads and vector data."""
 
@@ -90,10 +103,10 @@ class PointFactory:
             if page_height_px is not None:
                 payload["page_height_px"] = page_height_px
 
-            vectors = {"original": orig}
+            vectors = {"original": _to_vector(orig)}
             if use_mean_pooling and rows is not None and cols is not None:
-                vectors["mean_pooling_columns"] = cols
-                vectors["mean_pooling_rows"] = rows
+                vectors["mean_pooling_columns"] = _to_vector(cols)
+                vectors["mean_pooling_rows"] = _to_vector(rows)
 
             points.append(
                 models.PointStruct(
@@ -0,0 +1,312 @@
+"""Declarative multi-stage retrieval plans.
+
+A plan is a list of stages from the widest candidate search to the final
+scorer. Each stage names the vector(s) it searches, how many candidates it
+keeps and how Qdrant should treat quantized vectors; every stage only scores
+the candidates of the stage before it. Stages with several vectors run one
+prefetch per vector and the next stage scores the union.
+
+Example (binary-quantized pooled prefetch, float pooled rerank, MaxSim)::
+
+    [
+        {"using": ["mean_pooling_columns", "mean_pooling_rows"],
+         "limit": 1000, "rescore": false},
+        {"using": ["mean_pooling_columns", "mean_pooling_rows"],
+         "limit": 200, "ignore_quantization": true},
+        {"using": "original"}
+    ]
+
+Besides the built-in plans, RETRIEVAL_CUSTOM_PLANS may define plans as a
+JSON object of ``{name: [stage, ...]}``; RETRIEVAL_PLAN selects the default.
+"""
+
+import json
+import logging
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import config
+from qdrant_client import models
+
+logger = logging.getLogger(__name__)
+
+ORIGINAL_VECTOR = "original"
+POOLED_VECTORS = ["mean_pooling_columns", "mean_pooling_rows"]
+
+
+@dataclass(frozen=True)
+class RetrievalStage:
+    """One stage of a retrieval plan.
+
+    Attributes:
+        using: Vector name(s) searched by this stage
+        limit: Candidates kept (the final stage returns ``k``; earlier
+            stages keep at least ``k``)
+        rescore: Rescore quantized candidates with full vectors (None keeps
+            Qdrant's default)
+        oversampling: Quantized candidates fetched per kept candidate
+        ignore_quantization: Search full-precision vectors only
+    """
+
+    using: Tuple[str, ...]
+    limit: Optional[int] = None
+    rescore: Optional[bool] = None
+    oversampling: Optional[float] = None
+    ignore_quantization: Optional[bool] = None
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "RetrievalStage":
+        if not isinstance(data, dict):
+            raise ValueError(f"Stage must be an object: {data!r}")
+        using = data.get("using")
+        if isinstance(using, str):
+            using = [using]
+        if not using or not all(isinstance(name, str) for name in using):
+            raise ValueError(f"Stage needs a vector name in 'using': {data}")
+        unknown = set(data) - {
+            "using",
+            "limit",
+            "rescore",
+            "oversampling",
+            "ignore_quantization",
+        }
+        if unknown:
+            raise ValueError(f"Unknown stage fields: {sorted(unknown)}")
+        for flag in ("rescore", "ignore_quantization"):
+            if data.get(flag) is not None and not isinstance(data[flag], bool):
+                raise ValueError(f"Stage '{flag}' must be true or false: {data}")
+        limit = data.get("limit")
+        if limit is not None and int(limit) < 1:
+            raise ValueError(f"Stage limit must be positive: {data}")
+        return cls(
+            using=tuple(using),
+            limit=int(limit) if limit is not None else None,
+            rescore=data.get("rescore"),
+            oversampling=(
+                float(data["oversampling"])
+                if data.get("oversampling") is not None
+                else None
+            ),
+            ignore_quantization=data.get("ignore_quantization"),
+        )
+
+    def search_params(self) -> Optional[models.SearchParams]:
+        if (
+            self.rescore is None
+            and self.oversampling is None
+            and self.ignore_quantization is None
+        ):
+            return None
+        return models.SearchParams(
+            quantization=models.QuantizationSearchParams(
+                ignore=self.ignore_quantization,
+                rescore=self.rescore,
+                oversampling=self.oversampling,
+            )
+        )
+
+
+@dataclass(frozen=True)
+class RetrievalPlan:
+    """Named list of stages, widest first."""
+
+    name: str
+    stages: Tuple[RetrievalStage, ...] = field(default_factory=tuple)
+
+    def vector_names(self) -> Set[str]:
+        return {name for stage in self.stages for name in stage.using}
+
+    def describe(self) -> Dict[str, Any]:
+        """JSON-friendly description (reported to clients)."""
+        return {
+            "name": self.name,
+            "stages": [
+                {
+                    key: list(value) if key == "using" else value
+                    for key, value in asdict(stage).items()
+                    if value is not None
+                }
+                for stage in self.stages
+            ],
+        }
+
+    def fingerprint(self) -> Tuple[Any, ...]:
+        """Hashable identity of the plan's behavior (for cache keys)."""
+        return (self.name, self.stages)
+
+    def build_request(
+        self,
+        query: List[List[float]],
+        k: int,
+        qdrant_filter: Optional[models.Filter] = None,
+    ) -> models.QueryRequest:
+        """Qdrant query for one query embedding, stages nested as prefetches.
+
+        Qdrant propagates the top-level filter into the prefetches.
+        """
+        prefetch: Optional[List[models.Prefetch]] = None
+        for stage in self.stages[:-1]:
+            limit = max(stage.limit or k, k)
+            prefetch = [
+                models.Prefetch(
+                    query=query,
+                    using=name,
+                    limit=limit,
+                    params=stage.search_params(),
+                    prefetch=prefetch,
+                )
+                for name in stage.using
+            ]
+
+        final = self.stages[-1]
+        if len(final.using) != 1:
+            raise ValueError(
+                f"Final stage of plan '{self.name}' must search a single vector"
+            )
+        return models.QueryRequest(
+            query=query,
+            prefetch=prefetch,
+            limit=k,
+            with_payload=True,
+            with_vector=False,
+            using=final.using[0],
+            filter=qdrant_filter,
+            params=final.search_params(),
+        )
+
+
+def _config_quantization() -> Dict[str, Any]:
+    """Quantization search settings from config (empty without quantization)."""
+    if not config.QDRANT_USE_BINARY_QUANTIZATION:
+        return {}
+    return {
+        "ignore_quantization": bool(config.QDRANT_SEARCH_IGNORE_QUANTIZATION),
+        "rescore": bool(config.QDRANT_SEARCH_RESCORE),
+        "oversampling": float(config.QDRANT_SEARCH_OVERSAMPLING),
+    }
+
+
+def default_plan(prefetch_limit: Optional[int] = None) -> RetrievalPlan:
+    """The plan configured by QDRANT_MEAN_POOLING_ENABLED/QDRANT_PREFETCH_LIMIT.
+
+    Pooled prefetch plus MaxSim rerank on ``original`` with mean pooling,
+    MaxSim on ``original`` alone without it; configured quantization
+    settings apply to the final stage.
+    """
+    limit = int(
+        config.QDRANT_PREFETCH_LIMIT if prefetch_limit is None else prefetch_limit
+    )
+    final = RetrievalStage(using=(ORIGINAL_VECTOR,), **_config_quantization())
+    if not config.QDRANT_MEAN_POOLING_ENABLED:
+        return RetrievalPlan("default", (final,))
+    prefetch = RetrievalStage(using=tuple(POOLED_VECTORS), limit=limit)
+    return RetrievalPlan("default", (prefetch, final))
+
+
+def _builtin_plans() -> Dict[str, RetrievalPlan]:
+    pooled = tuple(POOLED_VECTORS)
+    return {
+        "default": default_plan(),
+        # Full-precision MaxSim over every point (recall baseline)
+        "exact": RetrievalPlan(
+            "exact",
+            (RetrievalStage(using=(ORIGINAL_VECTOR,), ignore_quantization=True),),
+        ),
+        # Binary pooled prefetch -> float pooled rerank -> MaxSim
+        "three_stage": RetrievalPlan(
+            "three_stage",
+            (
+                RetrievalStage(using=pooled, limit=1000, rescore=False),
+                RetrievalStage(using=pooled, limit=200, ignore_quantization=True),
+                RetrievalStage(using=(ORIGINAL_VECTOR,)),
+            ),
+        ),
+    }
+
+
+# Parsed RETRIEVAL_CUSTOM_PLANS, keyed by the raw setting
+_custom_plans_cache: Tuple[Optional[str], Dict[str, RetrievalPlan]] = (None, {})
+
+
+def _custom_plans() -> Dict[str, RetrievalPlan]:
+    """Plans from RETRIEVAL_CUSTOM_PLANS, parsed again only when it changes."""
+    global _custom_plans_cache
+    raw = str(getattr(config, "RETRIEVAL_CUSTOM_PLANS", "") or "").strip()
+    cached_raw, plans = _custom_plans_cache
+    if raw != cached_raw:
+        plans = _parse_custom_plans(raw)
+        _custom_plans_cache = (raw, plans)
+    return plans
+
+
+def _parse_custom_plans(raw: str) -> Dict[str, RetrievalPlan]:
+    if not raw:
+        return {}
+    try:
+        definitions = json.loads(raw)
+        if not isinstance(definitions, dict):
+            raise ValueError("expected an object of {name: [stage, ...]}")
+        if not all(isinstance(stages, list) for stages in definitions.values()):
+            raise ValueError("every plan must be a list of stages")
+        plans = {
+            str(name): RetrievalPlan(
+                str(name),
+                tuple(RetrievalStage.from_dict(stage) for stage in stages),
+            )
+            for name, stages in definitions.items()
+            if stages
+        }
+        for plan in plans.values():
+            if len(plan.stages[-1].using) != 1:
+                raise ValueError(
+                    f"final stage of plan '{plan.name}' must search a single vector"
+                )
+        return plans
+    except (TypeError, ValueError) as exc:
+        logger.warning(f"Ignoring invalid RETRIEVAL_CUSTOM_PLANS: {exc}")
+        return {}
+
+
+def available_vectors() -> Set[str]:
+    """Named vectors the configured collection layout provides."""
+    if config.QDRANT_MEAN_POOLING_ENABLED:
+        return {ORIGINAL_VECTOR, *POOLED_VECTORS}
+    return {ORIGINAL_VECTOR}
+
+
+def list_plans() -> List[RetrievalPlan]:
+    """Built-in and custom plans usable with the current collection layout."""
+    plans = {**_builtin_plans(), **_custom_plans()}
+    vectors = available_vectors()
+    return [plan for plan in plans.values() if plan.vector_names() <= vectors]
+
+
+def resolve_plan(name: Optional[str] = None) -> RetrievalPlan:
+    """Look up a plan by name (RETRIEVAL_PLAN when None).
+
+    Raises:
+        ValueError: If the plan does not exist or needs vectors the
+            collection does not have
+    """
+    if not name:
+        configured = str(getattr(config, "RETRIEVAL_PLAN", "default") or "default")
+        try:
+            return resolve_plan(configured.strip())
+        except ValueError as exc:
+            # A bad default must not take search down
+            logger.warning(f"RETRIEVAL_PLAN unusable, using 'default': {exc}")
+            return default_plan()
+    name = name.strip()
+    plans = {**_builtin_plans(), **_custom_plans()}
+    plan = plans.get(name)
+    if plan is None:
+        raise ValueError(
+            f"Unknown retrieval plan '{name}'; available: {', '.join(sorted(plans))}"
+        )
+    missing = plan.vector_names() - available_vectors()
+    if missing:
+        raise ValueError(
+            f"Retrieval plan '{name}' needs vectors {sorted(missing)}, which the "
+            "collection does not have (enable QDRANT_MEAN_POOLING_ENABLED)"
+        )
+    return plan
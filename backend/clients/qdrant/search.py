@@ -1,12 +1,16 @@
 """Search operations for Qdrant."""
 
 import logging
-from typing import List, Optional
+import time
+from typing import Any, Dict, List, Optional, Sequence, Union, cast
 
 import config  # Import module for dynamic config access
 import numpy as np
 from api.utils import compute_page_label
 from qdrant_client import models
+from utils.search_cache import collection_version, search_cache
+
+from .retrieval_plan import RetrievalPlan, default_plan, resolve_plan
 
 logger = logging.getLogger(__name__)
 
@@ -31,74 +35,53 @@ class SearchManager:
         self.collection_name = collection_name
         self.embedding_processor = embedding_processor
 
+    def search_settings(self, plan: RetrievalPlan) -> Optional[tuple]:
+        """Settings that change search results (part of the cache key).
+
+        Keyed on the ColPali model id rather than its URL, since a URL says
+        nothing about the model behind it. None (no caching) while the model
+        id is unknown.
+        """
+        model_id = self.embedding_processor.model_id()
+        if not model_id:
+            return None
+        return (plan.fingerprint(), model_id)
+
     def reranking_search_batch(
         self,
         query_embeddings_batch: List[np.ndarray],
         search_limit: Optional[int] = None,
         prefetch_limit: Optional[int] = None,
         qdrant_filter: Optional[models.Filter] = None,
+        plan: Optional[RetrievalPlan] = None,
     ):
-        """Perform two-stage retrieval with prefetch and multivector rerank.
+        """Run a multi-stage retrieval plan for a batch of query embeddings.
 
-        If QDRANT_MEAN_POOLING_ENABLED is False, performs simple single-vector search.
+        Without a plan, RETRIEVAL_PLAN is used; passing ``prefetch_limit``
+        selects the default plan (pooled prefetch with that limit and
+        multivector rerank, or single-vector search without mean pooling).
         """
         # Use config defaults if not specified
-        if search_limit is None:
-            search_limit = config.QDRANT_SEARCH_LIMIT
-        if prefetch_limit is None:
-            prefetch_limit = config.QDRANT_PREFETCH_LIMIT
-
-        # Optional quantization-aware search params
-        params = None
-        if config.QDRANT_USE_BINARY_QUANTIZATION:
-            params = models.SearchParams(
-                quantization=models.QuantizationSearchParams(
-                    ignore=config.QDRANT_SEARCH_IGNORE_QUANTIZATION,
-                    rescore=config.QDRANT_SEARCH_RESCORE,
-                    oversampling=config.QDRANT_SEARCH_OVERSAMPLING,
-                )
+        limit = int(
+            config.QDRANT_SEARCH_LIMIT if search_limit is None else search_limit
+        )
+        if plan is None:
+            plan = (
+                default_plan(prefetch_limit)
+                if prefetch_limit is not None
+                else resolve_plan()
             )
-        search_queries = []
-        for query_embedding in query_embeddings_batch:
-            if not config.QDRANT_MEAN_POOLING_ENABLED:
-                # Simple single-vector search without reranking
-                logger.info("Search using simple single-vector (mean pooling disabled)")
-                req = models.QueryRequest(
-                    query=query_embedding.tolist(),
-                    limit=search_limit,
-                    with_payload=True,
-                    with_vector=False,
-                    using="original",
-                    filter=qdrant_filter,
-                    params=params,
-                )
-            else:
-                # Two-stage search with prefetch and rerank
-                logger.info(
-                    "Search using multivector pipeline with prefetch and rerank"
-                )
-                req = models.QueryRequest(
-                    query=query_embedding.tolist(),
-                    prefetch=[
-                        models.Prefetch(
-                            query=query_embedding.tolist(),
-                            limit=prefetch_limit,
-                            using="mean_pooling_columns",
-                        ),
-                        models.Prefetch(
-                            query=query_embedding.tolist(),
-                            limit=prefetch_limit,
-                            using="mean_pooling_rows",
-                        ),
-                    ],
-                    limit=search_limit,
-                    with_payload=True,
-                    with_vector=False,
-                    using="original",
-                    filter=qdrant_filter,
-                    params=params,
-                )
-            search_queries.append(req)
+
+        logger.info(
+            "Search using retrieval plan '%s' (%d stages) for %d queries",
+            plan.name,
+            len(plan.stages),
+            len(query_embeddings_batch),
+        )
+        search_queries = [
+            plan.build_request(query_embedding.tolist(), limit, qdrant_filter)
+            for query_embedding in query_embeddings_batch
+        ]
         try:
             return self.service.query_batch_points(
                 collection_name=self.collection_name, requests=search_queries
@@ -113,7 +96,11 @@ class SearchManager:
             raise
 
     def search_with_metadata(
-        self, query: str, k: int = 5, payload_filter: Optional[dict] = None
+        self,
+        query: str,
+        k: int = 5,
+        payload_filter: Optional[dict] = None,
+        plan: Optional[RetrievalPlan] = None,
     ):
         """Search and return metadata with image URLs.
 
@@ -123,43 +110,137 @@ class SearchManager:
 
         payload_filter: optional dict of equality filters, e.g.
           {"filename": "doc.pdf", "pdf_page_index": 3}
+
+        plan: retrieval plan (RETRIEVAL_PLAN when None)
+
+        Results are served from the search cache when the same search ran
+        since the collection was last written.
         """
-        query_embedding = self.embedding_processor.batch_embed_query([query])
-        q_filter = None
-        if payload_filter:
-            try:
-                conditions = []
-                for kf, vf in payload_filter.items():
-                    conditions.append(
-                        models.FieldCondition(
-                            key=str(kf), match=models.MatchValue(value=vf)
-                        )
+        results = self.search_batch_with_metadata([query], k, payload_filter, plan)
+        return results[0]["items"]
+
+    def search_batch_with_metadata(
+        self,
+        queries: List[str],
+        k: Union[int, Sequence[int]] = 5,
+        payload_filter: Optional[dict] = None,
+        plan: Optional[RetrievalPlan] = None,
+    ) -> List[Dict[str, Any]]:
+        """Search several queries with one embedding call and one Qdrant request.
+
+        Cached queries are answered from the search cache; the rest are
+        embedded together and sent as a single ``query_batch_points`` call.
+        ``k`` may be given per query; Qdrant is then asked for the largest
+        and each query's results are cut to its own ``k``. All queries use
+        the same retrieval ``plan`` (RETRIEVAL_PLAN when None).
+
+        Returns:
+            One dict per query (in order) with ``items`` (as returned by
+            search_with_metadata), ``cached`` and timings in ms:
+            ``embedding_ms`` and ``search_ms`` of the shared calls the query
+            took part in, and ``duration_ms`` until its results were ready.
+        """
+        start = time.perf_counter()
+        ks = [int(k)] * len(queries) if isinstance(k, int) else [int(v) for v in k]
+        if plan is None:
+            plan = resolve_plan()
+        settings = self.search_settings(plan)
+        keys = [
+            (
+                search_cache.make_key(
+                    self.collection_name, query, query_k, payload_filter, settings
+                )
+                if settings is not None
+                else None
+            )
+            for query, query_k in zip(queries, ks)
+        ]
+        results: List[Optional[Dict[str, Any]]] = []
+        for key in keys:
+            cached = search_cache.get(key) if key is not None else None
+            results.append(
+                None
+                if cached is None
+                else {
+                    "items": cached,
+                    "cached": True,
+                    "embedding_ms": 0.0,
+                    "search_ms": 0.0,
+                    "duration_ms": (time.perf_counter() - start) * 1000,
+                }
+            )
+
+        pending = [i for i, result in enumerate(results) if result is None]
+        if pending:
+            version = collection_version(self.collection_name)
+
+            embed_start = time.perf_counter()
+            query_embeddings = self.embedding_processor.embed_queries(
+                [queries[i] for i in pending]
+            )
+            search_start = time.perf_counter()
+            # Ensure we request at least k results from Qdrant; otherwise
+            # k>QDRANT_SEARCH_LIMIT would be silently capped by the default.
+            search_results = self.reranking_search_batch(
+                query_embeddings,
+                search_limit=max(max(ks[i] for i in pending), 1),
+                qdrant_filter=self._build_filter(payload_filter),
+                plan=plan,
+            )
+            finished = time.perf_counter()
+
+            for position, i in enumerate(pending):
+                points = (
+                    search_results[position].points
+                    if position < len(search_results)
+                    else []
+                )
+                items = self._points_to_items(points, ks[i])
+                key = keys[i]
+                if key is not None:
+                    search_cache.put(key, items, version)
+                results[i] = {
+                    "items": items,
+                    "cached": False,
+                    "embedding_ms": (search_start - embed_start) * 1000,
+                    "search_ms": (finished - search_start) * 1000,
+                    "duration_ms": (finished - start) * 1000,
+                }
+        return cast(List[Dict[str, Any]], results)
+
+    @staticmethod
+    def _build_filter(payload_filter: Optional[dict]) -> Optional[models.Filter]:
+        """Equality filter on payload fields (None if there is nothing to filter)."""
+        if not payload_filter:
+            return None
+        try:
+            conditions = []
+            for kf, vf in payload_filter.items():
+                conditions.append(
+                    models.FieldCondition(
+                        key=str(kf), match=models.MatchValue(value=vf)
                     )
-                q_filter = models.Filter(must=conditions) if conditions else None
-            except Exception:
-                q_filter = None
-        # Ensure we request at least k results from Qdrant; otherwise k>QDRANT_SEARCH_LIMIT
-        # would be silently capped by the default.
-        effective_limit = max(int(k), 1)
-        search_results = self.reranking_search_batch(
-            [query_embedding], search_limit=effective_limit, qdrant_filter=q_filter
-        )
+                )
+            return models.Filter(must=conditions) if conditions else None
+        except Exception:
+            return None
 
+    @staticmethod
+    def _points_to_items(points: Optional[list], k: int) -> List[Dict[str, Any]]:
         items = []
-        if search_results and search_results[0].points:
-            for i, point in enumerate(search_results[0].points[:k]):
-                image_url = point.payload.get("image_url") if point.payload else None
-                if not image_url:
-                    logger.warning(f"Point {i} missing image_url in payload")
-                    continue
-
-                items.append(
-                    {
-                        "payload": point.payload,
-                        "label": compute_page_label(point.payload),
-                        "score": getattr(point, "score", None),
-                    }
-                )
+        for i, point in enumerate((points or [])[:k]):
+            image_url = point.payload.get("image_url") if point.payload else None
+            if not image_url:
+                logger.warning(f"Point {i} missing image_url in payload")
+                continue
+
+            items.append(
+                {
+                    "payload": point.payload,
+                    "label": compute_page_label(point.payload),
+                    "score": getattr(point, "score", None),
+                }
+            )
         return items
 
     def search(self, query: str, k: int = 5):
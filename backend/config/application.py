@@ -177,6 +177,7 @@ QDRANT_ON_DISK_PAYLOAD = True  # Store payload on disk
 STORAGE_FAIL_FAST = False  # Resilient by default
 IMAGE_FORMAT = "JPEG"  # Best compression/quality balance
 IMAGE_QUALITY = 75  # Good quality/size balance
+RASTER_DPI = 200  # Page render resolution (matches pdf2image default)
 
 # Hard-coded DeepSeek OCR settings (auto-sized or optimized defaults)
 DEEPSEEK_OCR_API_TIMEOUT = 600  # 10 minutes - long operations
@@ -19,7 +19,10 @@ SCHEMA: Dict[str, Any] = {
                 "description": "URL for ColPali service",
                 "help_text": "Endpoint for the embedding service. Format: "
                 "http://hostname:port. Must be accessible from the backend "
-                "application.",
+                "application. Separate several replicas with commas "
+                "(http://colpali-1:7000,http://colpali-2:7000) to balance "
+                "requests across them by outstanding requests, with failover "
+                "and temporary ejection of failing replicas.",
                 "key": "COLPALI_URL",
                 "label": "ColPali Service URL",
                 "type": "str",
@@ -40,6 +43,35 @@ SCHEMA: Dict[str, Any] = {
                 "type": "int",
                 "ui_type": "number",
             },
+            {
+                "default": "float32",
+                "description": "Wire format for embeddings returned by ColPali",
+                "help_text": "float32 and float16 request compact little-endian "
+                "binary buffers instead of nested JSON float lists, cutting "
+                "response size and decode CPU by an order of magnitude; "
+                "float16 halves the transfer again at negligible retrieval "
+                "cost. json forces the legacy format. Services that do not "
+                "support the binary format fall back to JSON automatically.",
+                "key": "COLPALI_WIRE_FORMAT",
+                "label": "Embedding Wire Format",
+                "options": ["float32", "float16", "json"],
+                "type": "str",
+                "ui_type": "select",
+            },
+            {
+                "default": True,
+                "description": "Let the ColPali service compute mean-pooled vectors",
+                "help_text": "When mean pooling is enabled, the row/column pooled "
+                "vectors are computed with torch on the model device while the "
+                "embeddings are still resident, instead of in the backend after "
+                "the full token matrix has been transferred. Pages the service "
+                "could not pool (or services without support) are pooled "
+                "locally as before.",
+                "key": "COLPALI_SERVER_SIDE_POOLING",
+                "label": "Server-Side Mean Pooling",
+                "type": "bool",
+                "ui_type": "boolean",
+            },
         ],
         "ui_hidden": True,
     }
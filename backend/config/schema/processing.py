@@ -36,14 +36,168 @@ SCHEMA: Dict[str, Any] = {
                 "Higher values allow more batches to be queued, improving throughput but consuming more memory "
                 "and making cancellation slower. Lower values keep memory usage bounded and allow fast cancellation. "
                 "Set to 1 for lowest memory usage and immediate cancellation response. "
-                "Set to 2-4 for better throughput if memory allows.",
+                "Set to 2-4 for better throughput if memory allows. This is a hard cap: concurrent "
+                "documents and embedding workers are limited to it.",
                 "key": "PIPELINE_MAX_IN_FLIGHT_BATCHES",
                 "label": "Max In-Flight Batches",
+                "max": 16,
+                "min": 1,
+                "type": "int",
+                "ui_type": "number",
+            },
+            {
+                "default": 1,
+                "description": "Parallel embedding workers (outstanding ColPali requests)",
+                "help_text": "Each worker sends its own /embed/images request, so several batches "
+                "can be embedded at once. Raise this when ColPali runs as multiple replicas "
+                "behind a load balancer or has spare GPU capacity. Capped at the in-flight batch "
+                "budget, since a worker without a batch to embed would sit idle.",
+                "key": "PIPELINE_EMBEDDING_WORKERS",
+                "label": "Embedding Workers",
                 "max": 8,
                 "min": 1,
                 "type": "int",
                 "ui_type": "number",
             },
+            {
+                "default": 1,
+                "description": "Parallel Qdrant upsert workers",
+                "help_text": "Number of threads upserting embedded batches to Qdrant concurrently. "
+                "Batch completion is tracked per batch, so progress stays correct with any "
+                "worker count.",
+                "key": "PIPELINE_UPSERT_WORKERS",
+                "label": "Upsert Workers",
+                "max": 8,
+                "min": 1,
+                "type": "int",
+                "ui_type": "number",
+            },
+            {
+                "default": 16,
+                "description": "Points merged into one Qdrant upsert request",
+                "help_text": "Embedded batches are coalesced until this many points are pending "
+                "(or the delay below expires) and written in one request. A group is also written "
+                "as soon as it holds every batch the in-flight budget allows, so small in-flight "
+                "settings never wait for the delay. Writes run on a flush pool and overlap with "
+                "collecting the next group; a batch only counts as complete (and OCR only adds "
+                "its text) once Qdrant has applied its write. With coalescing, one collector serves all upsert workers, "
+                "which set how many writes run at once. Set to 0 to upsert every batch on its own.",
+                "key": "PIPELINE_UPSERT_COALESCE_POINTS",
+                "label": "Upsert Coalesce Points",
+                "max": 256,
+                "min": 0,
+                "type": "int",
+                "ui_type": "number",
+            },
+            {
+                "default": 250,
+                "description": "Longest a batch waits to be merged into a larger upsert (ms)",
+                "help_text": "Upper bound on the extra latency coalescing adds before points become "
+                "searchable. Pending points are flushed when the oldest batch has waited this long.",
+                "key": "PIPELINE_UPSERT_COALESCE_DELAY_MS",
+                "label": "Upsert Coalesce Delay (ms)",
+                "max": 5000,
+                "min": 0,
+                "type": "int",
+                "ui_type": "number",
+            },
+            {
+                "default": False,
+                "description": "Upsert batches in page order when embedding in parallel",
+                "help_text": "With several embedding workers, batches can finish out of order. "
+                "When enabled, finished batches are held back until all earlier batches of the "
+                "same document are embedded, so points are handed to Qdrant in page order. "
+                "Leave disabled for maximum throughput.",
+                "key": "PIPELINE_PRESERVE_BATCH_ORDER",
+                "label": "Preserve Batch Order",
+                "type": "bool",
+                "ui_type": "boolean",
+            },
+            {
+                "default": True,
+                "description": "Journal per-page progress so interrupted uploads can resume",
+                "help_text": "Records which pages were embedded, stored, OCR'd and upserted in a "
+                "small SQLite database under the storage path. Re-uploading the same file after "
+                "a crash or restart resumes the original document and skips finished pages and "
+                "stages. The journal is reset when the collection or storage is cleared.",
+                "key": "PIPELINE_JOURNAL_ENABLED",
+                "label": "Resumable Ingestion",
+                "type": "bool",
+                "ui_type": "boolean",
+            },
+            {
+                "default": 600,
+                "depends_on": {"key": "PIPELINE_JOURNAL_ENABLED", "value": True},
+                "description": "Seconds without progress before an unfinished upload may be resumed",
+                "help_text": "Each unfinished document is leased to the job ingesting it and the "
+                "lease is renewed with every journaled page. Uploading the same file again only "
+                "resumes the document once its job has stopped or, for jobs in another backend "
+                "process, once the lease is this old; until then the upload is skipped so two "
+                "jobs never write the same pages.",
+                "key": "PIPELINE_JOURNAL_LEASE_SECONDS",
+                "label": "Resume Lease (seconds)",
+                "max": 86400,
+                "min": 10,
+                "type": "int",
+                "ui_indent_level": 1,
+                "ui_type": "number",
+            },
+            {
+                "default": False,
+                "description": "Tune batch size and in-flight batches while a job runs",
+                "help_text": "Watches per-stage service times and queue depths during ingestion. "
+                "Batch size is hill-climbed on page throughput and the in-flight budget grows when "
+                "the slowest stage is starved (and shrinks when it is backlogged). Configured "
+                "values are the starting point; the tuner searches up to twice them.",
+                "key": "PIPELINE_AUTOTUNE_ENABLED",
+                "label": "Auto-Tune Pipeline",
+                "type": "bool",
+                "ui_type": "boolean",
+            },
+            {
+                "default": 1,
+                "description": "Maximum documents rasterized concurrently within one upload",
+                "help_text": "Multi-file uploads rasterize several documents at once into the shared "
+                "pipeline so embedding does not sit idle while the next document is opened. "
+                "All documents draw from the same in-flight batch budget, so this is capped at "
+                "that budget (every active document needs at least one batch moving); raise "
+                "Max In-Flight Batches along with it. The default of 1 processes documents "
+                "strictly one after another.",
+                "key": "PIPELINE_MAX_CONCURRENT_DOCUMENTS",
+                "label": "Concurrent Documents",
+                "max": 8,
+                "min": 1,
+                "type": "int",
+                "ui_type": "number",
+            },
+            {
+                "default": "pdf2image",
+                "description": "Backend used to render PDF pages",
+                "help_text": "'pdf2image' starts a poppler process for every batch. 'pymupdf' "
+                "keeps each document open in a pool of worker processes and renders pages in "
+                "parallel across cores; PyMuPDF is AGPL-licensed and not installed by default "
+                "(pip install -r requirements-pymupdf.txt). 'auto' uses PyMuPDF when it is "
+                "installed and falls back to pdf2image otherwise.",
+                "key": "PDF_RASTERIZER_BACKEND",
+                "label": "PDF Rasterizer",
+                "options": ["auto", "pymupdf", "pdf2image"],
+                "type": "str",
+                "ui_type": "select",
+            },
+            {
+                "default": 0,
+                "description": "Longest edge of page images sent to the embedding model (0 = full resolution)",
+                "help_text": "Pages are encoded once per batch. Storage and OCR share the stored JPEG, "
+                "while ColPali receives a lossless PNG. Setting this to the model's working "
+                "resolution (for example 2048) downscales that PNG before upload, which cuts "
+                "encoding time and request size. Leave at 0 to upload pages at full resolution.",
+                "key": "EMBEDDING_IMAGE_MAX_EDGE",
+                "label": "Embedding Image Max Edge",
+                "max": 8192,
+                "min": 0,
+                "type": "int",
+                "ui_type": "number",
+            },
         ],
     }
 }
@@ -26,6 +26,129 @@ SCHEMA: Dict[str, Any] = {
                 "type": "int",
                 "ui_type": "number",
             },
+            {
+                "default": True,
+                "description": "Cache search results in memory",
+                "help_text": "Repeated searches (same query, k and filters) are answered "
+                "from memory without embedding the query or querying Qdrant. Entries "
+                "are invalidated whenever the collection changes (uploads, OCR "
+                "updates, deletes) or search settings change. Hit rate and memory "
+                "use are exposed at /metrics.",
+                "key": "SEARCH_CACHE_ENABLED",
+                "label": "Enable Search Cache",
+                "type": "bool",
+                "ui_type": "boolean",
+            },
+            {
+                "default": 1024,
+                "description": "Maximum number of cached searches",
+                "help_text": "Least recently used searches are evicted beyond this "
+                "many entries. Set to 0 to stop caching.",
+                "key": "SEARCH_CACHE_MAX_ENTRIES",
+                "label": "Max Cached Searches",
+                "max": 100000,
+                "min": 0,
+                "type": "int",
+                "ui_type": "number",
+                "depends_on": {"key": "SEARCH_CACHE_ENABLED", "value": True},
+                "ui_indent_level": 1,
+            },
+            {
+                "default": 64,
+                "description": "Memory budget of the search cache (MB)",
+                "help_text": "Estimated size of cached results, including OCR "
+                "payloads. Least recently used searches are evicted beyond it.",
+                "key": "SEARCH_CACHE_MAX_MB",
+                "label": "Search Cache Size (MB)",
+                "max": 4096,
+                "min": 1,
+                "type": "int",
+                "ui_type": "number",
+                "depends_on": {"key": "SEARCH_CACHE_ENABLED", "value": True},
+                "ui_indent_level": 1,
+            },
+            {
+                "default": 300,
+                "description": "How long a cached search stays valid (seconds)",
+                "help_text": "Bounds staleness from writes this backend does not see, "
+                "e.g. another backend replica indexing into the same collection. "
+                "Writes made through this backend invalidate entries immediately.",
+                "key": "SEARCH_CACHE_TTL_SECONDS",
+                "label": "Search Cache TTL (seconds)",
+                "max": 86400,
+                "min": 1,
+                "type": "int",
+                "ui_type": "number",
+                "depends_on": {"key": "SEARCH_CACHE_ENABLED", "value": True},
+                "ui_indent_level": 1,
+            },
+            {
+                "default": 2048,
+                "description": "Query embeddings kept in memory (0 = disabled)",
+                "help_text": "Embeddings of recent query texts are cached (as float16, "
+                "keyed by the exact text and the ColPali model id), so repeating a "
+                "query skips the ColPali round trip and forward pass. Each entry "
+                "takes a few KB.",
+                "key": "QUERY_EMBEDDING_CACHE_SIZE",
+                "label": "Query Embedding Cache Size",
+                "max": 100000,
+                "min": 0,
+                "type": "int",
+                "ui_type": "number",
+            },
+            {
+                "default": 5,
+                "description": "Window for merging concurrent searches (ms, 0 = off)",
+                "help_text": "Searches arriving within this window are embedded with one "
+                "ColPali request and retrieved with one Qdrant batch query, which "
+                "raises sustained throughput under load. Each search waits at most "
+                "this long for others to join. Set to 0 to run every search on its own.",
+                "key": "SEARCH_COALESCE_WINDOW_MS",
+                "label": "Search Coalescing Window (ms)",
+                "max": 100,
+                "min": 0,
+                "type": "int",
+                "ui_type": "number",
+            },
+            {
+                "default": 32,
+                "description": "Most searches merged into one batch",
+                "help_text": "A batch is dispatched as soon as this many searches are "
+                "waiting, without waiting for the window to close.",
+                "key": "SEARCH_COALESCE_MAX_BATCH",
+                "label": "Search Coalescing Batch Size",
+                "max": 256,
+                "min": 1,
+                "type": "int",
+                "ui_type": "number",
+            },
+            {
+                "default": "default",
+                "description": "Retrieval plan used when a search does not name one",
+                "help_text": "A retrieval plan lists the stages of a search, from the "
+                "widest candidate prefetch to the final MaxSim rerank. Built-in plans: "
+                "default (pooled prefetch + MaxSim, as configured above), exact "
+                "(full-precision MaxSim only) and three_stage (binary pooled prefetch, "
+                "float pooled rerank, MaxSim). Searches can override this with the "
+                "plan parameter; GET /search/plans lists the usable plans.",
+                "key": "RETRIEVAL_PLAN",
+                "label": "Default Retrieval Plan",
+                "type": "str",
+                "ui_type": "text",
+            },
+            {
+                "default": "",
+                "description": "Extra retrieval plans as JSON",
+                "help_text": "JSON object mapping plan names to stage lists, e.g. "
+                '{"fast": [{"using": ["mean_pooling_columns", "mean_pooling_rows"], '
+                '"limit": 50}, {"using": "original"}]}. Stage fields: using, limit, '
+                "rescore, oversampling, ignore_quantization. Invalid JSON is ignored "
+                "with a warning.",
+                "key": "RETRIEVAL_CUSTOM_PLANS",
+                "label": "Custom Retrieval Plans",
+                "type": "str",
+                "ui_type": "text",
+            },
             {
                 "default": False,
                 "description": "Enable region-level retrieval using interpretability maps",
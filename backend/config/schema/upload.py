@@ -54,6 +54,19 @@ SCHEMA: Dict[str, Any] = {
                 "type": "int",
                 "ui_type": "number",
             },
+            {
+                "default": True,
+                "description": "Skip uploads whose exact content is already indexed",
+                "help_text": "A SHA-256 of every upload is computed while it streams to disk and "
+                "checked against the registry of completed documents (stored with the ingestion "
+                "journal). Exact duplicates whose points are still in the collection are skipped "
+                "instead of being rasterized, embedded and OCR'd again. Disable to always "
+                "index re-uploads as new documents.",
+                "key": "UPLOAD_DEDUPLICATION_ENABLED",
+                "label": "Deduplicate Uploads",
+                "type": "bool",
+                "ui_type": "boolean",
+            },
         ],
     }
 }
@@ -25,6 +25,10 @@ class SearchError(DomainError):
     """Raised when a search operation fails."""
 
 
+class InvalidSearchRequestError(DomainError):
+    """Raised when a search request asks for something unavailable (e.g. plan)."""
+
+
 class StatisticsError(DomainError):
     """Raised when retrieving statistics fails."""
 
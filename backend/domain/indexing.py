@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import asyncio
+import hashlib
 import logging
 import os
 import tempfile
@@ -24,6 +25,11 @@ from domain.file_constraints import (
     is_allowed_file,
 )
 from domain.pipeline.errors import CancellationError
+from domain.pipeline.journal import (
+    DocumentInProgressError,
+    get_ingestion_journal,
+    hash_file,
+)
 from domain.pipeline.streaming_pipeline import StreamingPipeline
 from pdf2image import pdfinfo_from_path
 
@@ -55,9 +61,12 @@ async def _persist_upload_to_disk(
     max_file_size_bytes: int,
     max_file_size_mb: int,
     timeout_seconds: int = 300,
-) -> str:
+) -> tuple[str, str]:
     """Persist upload chunks to a temporary file with proper cleanup and timeout.
 
+    The SHA-256 of the content is computed while the chunks stream to disk,
+    so deduplication never has to read the file a second time.
+
     Args:
         upload: File upload to persist
         chunk_size: Size of chunks to read
@@ -66,7 +75,7 @@ async def _persist_upload_to_disk(
         timeout_seconds: Upload timeout in seconds (default: 5 minutes)
 
     Returns:
-        Path to temporary file
+        Tuple of (path to temporary file, SHA-256 hex digest)
 
     Raises:
         UploadTimeoutError: On timeout
@@ -78,6 +87,7 @@ async def _persist_upload_to_disk(
 
     try:
         tmp_file = tempfile.NamedTemporaryFile(delete=False, suffix=suffix)
+        digest = hashlib.sha256()
         written_bytes = 0
         start_time = time.time()
 
@@ -100,9 +110,10 @@ async def _persist_upload_to_disk(
                 )
 
             tmp_file.write(chunk)
+            digest.update(chunk)
 
         tmp_file.close()
-        return tmp_file.name
+        return tmp_file.name, digest.hexdigest()
 
     except (UploadTimeoutError, FileSizeExceededError):
         if tmp_file:
@@ -125,10 +136,16 @@ async def _persist_upload_to_disk(
 async def validate_and_persist_uploads(
     files: List[UploadFileProtocol],
     constraints: UploadConstraints,
-) -> tuple[list[str], dict[str, str]]:
+) -> tuple[list[str], dict[str, str], dict[str, str]]:
+    """Validate and persist uploads.
+
+    Returns:
+        Tuple of (temp paths, path -> original filename, path -> SHA-256)
+    """
     chunk_size = get_upload_chunk_size_mbytes()
     temp_paths: list[str] = []
     original_filenames: dict[str, str] = {}
+    content_hashes: dict[str, str] = {}
 
     for upload in files:
         if not is_allowed_file(upload.filename, upload.content_type, constraints):
@@ -139,7 +156,7 @@ async def validate_and_persist_uploads(
             )
 
         try:
-            tmp_path = await _persist_upload_to_disk(
+            tmp_path, content_hash = await _persist_upload_to_disk(
                 upload,
                 chunk_size=chunk_size,
                 max_file_size_bytes=constraints.max_file_size_bytes,
@@ -150,8 +167,9 @@ async def validate_and_persist_uploads(
 
         temp_paths.append(tmp_path)
         original_filenames[tmp_path] = upload.filename or "document.pdf"
+        content_hashes[tmp_path] = content_hash
 
-    return temp_paths, original_filenames
+    return temp_paths, original_filenames, content_hashes
 
 
 def cleanup_temp_files(paths: List[str]) -> None:
@@ -174,18 +192,45 @@ def cleanup_temp_files(paths: List[str]) -> None:
         logger.warning(f"Failed to clean up {failed_count} temporary files")
 
 
+def _document_is_indexed(qdrant_svc, document_id: str) -> bool:
+    """Check that a registered document still has points in the collection."""
+    from qdrant_client import models
+
+    try:
+        result = qdrant_svc.service.count(
+            collection_name=qdrant_svc.collection_name,
+            count_filter=models.Filter(
+                must=[
+                    models.FieldCondition(
+                        key="document_id",
+                        match=models.MatchValue(value=document_id),
+                    )
+                ]
+            ),
+            exact=True,
+        )
+        return result.count > 0
+    except Exception as exc:
+        logger.warning(f"Could not verify indexed document {document_id}: {exc}")
+        return False
+
+
 def run_indexing_job(
     job_id: str,
     paths: List[str],
     filenames: Dict[str, str],
+    content_hashes: Optional[Dict[str, str]] = None,
 ) -> None:
     """
     Background task that performs streaming ingestion.
 
     Processes PDF pages immediately as they're rasterized for 6x faster
-    ingestion with progressive results.
+    ingestion with progressive results. Files whose content is already
+    indexed are skipped when upload deduplication is enabled.
     """
     pipeline = None
+    journal = None
+    leased_documents: List[str] = []
 
     try:
         # Check for early cancellation
@@ -217,6 +262,32 @@ def run_indexing_job(
             image_processor=image_processor,
         )
 
+        # The configured in-flight budget is a hard cap shared by every
+        # document; documents or embedding workers beyond it could never hold
+        # a batch, so clamp them to it instead of growing the budget.
+        max_in_flight_batches = max(1, int(config.PIPELINE_MAX_IN_FLIGHT_BATCHES))
+        max_concurrent_documents = max(1, int(config.PIPELINE_MAX_CONCURRENT_DOCUMENTS))
+        embedding_workers = max(1, int(config.PIPELINE_EMBEDDING_WORKERS))
+        if min(max_concurrent_documents, len(paths)) > max_in_flight_batches:
+            logger.warning(
+                f"PIPELINE_MAX_CONCURRENT_DOCUMENTS={max_concurrent_documents} exceeds "
+                f"the in-flight batch budget ({max_in_flight_batches}); rasterizing "
+                f"at most {max_in_flight_batches} documents at once"
+            )
+        max_concurrent_documents = min(max_concurrent_documents, max_in_flight_batches)
+        if embedding_workers > max_in_flight_batches:
+            logger.warning(
+                f"PIPELINE_EMBEDDING_WORKERS={embedding_workers} exceeds the in-flight "
+                f"batch budget ({max_in_flight_batches}); using "
+                f"{max_in_flight_batches} embedding workers"
+            )
+            embedding_workers = max_in_flight_batches
+
+        # Journal of per-page progress so an interrupted job can be resumed;
+        # its documents table is also the registry for upload deduplication
+        journal = get_ingestion_journal()
+        pipeline_journal = journal if config.PIPELINE_JOURNAL_ENABLED else None
+
         # Initialize streaming pipeline with all dependencies
         pipeline = StreamingPipeline(
             embedding_processor=qdrant_svc.embedding_processor,
@@ -229,7 +300,16 @@ def run_indexing_job(
             storage_base_url=config.LOCAL_STORAGE_PUBLIC_URL,
             storage_bucket=config.LOCAL_STORAGE_BUCKET_NAME,
             batch_size=int(config.BATCH_SIZE),
-            max_in_flight_batches=int(config.PIPELINE_MAX_IN_FLIGHT_BATCHES),
+            max_in_flight_batches=max_in_flight_batches,
+            embedding_image_max_edge=int(config.EMBEDDING_IMAGE_MAX_EDGE),
+            autotune=bool(config.PIPELINE_AUTOTUNE_ENABLED),
+            embedding_workers=embedding_workers,
+            upsert_workers=int(config.PIPELINE_UPSERT_WORKERS),
+            preserve_batch_order=bool(config.PIPELINE_PRESERVE_BATCH_ORDER),
+            upsert_coalesce_points=int(config.PIPELINE_UPSERT_COALESCE_POINTS),
+            upsert_coalesce_delay_s=int(config.PIPELINE_UPSERT_COALESCE_DELAY_MS)
+            / 1000.0,
+            journal=pipeline_journal,
         )
 
         logger.info(f"Job {job_id}: Using streaming pipeline")
@@ -240,25 +320,94 @@ def run_indexing_job(
                 raise CancellationError("Job cancelled during processing")
 
         # Pre-scan all documents to get total pages and sizes for progress display
-        total_pages_all = 0
-        total_size_bytes = 0
-        doc_filenames = []
         doc_info = {}  # path -> (pages, size_bytes)
 
         for pdf_path in paths:
             filename = filenames.get(pdf_path, os.path.basename(pdf_path))
-            doc_filenames.append(filename)
             try:
                 info = pdfinfo_from_path(pdf_path)
                 pages = int(info.get("Pages", 0))
                 size_bytes = os.path.getsize(pdf_path)
                 doc_info[pdf_path] = (pages, size_bytes)
-                total_pages_all += pages
-                total_size_bytes += size_bytes
             except Exception as exc:
                 logger.warning(f"Failed to get PDF info for {filename}: {exc}")
                 doc_info[pdf_path] = (0, 0)
 
+        # Generate a document_id per file (or resume the journaled one) and
+        # drop files whose exact content is already indexed
+        dedup_enabled = journal is not None and bool(
+            config.UPLOAD_DEDUPLICATION_ENABLED
+        )
+        documents = []
+        duplicates = []
+        busy = []
+        seen_hashes = set()
+        for pdf_path in paths:
+            filename = filenames.get(pdf_path, os.path.basename(pdf_path))
+            document_id = str(uuid4())
+            if journal:
+                content_hash = (content_hashes or {}).get(pdf_path) or hash_file(
+                    pdf_path
+                )
+                if content_hash in seen_hashes:
+                    if dedup_enabled:
+                        duplicates.append(filename)
+                        continue
+                else:
+                    seen_hashes.add(content_hash)
+                    existing_id = (
+                        journal.find_completed(content_hash, qdrant_svc.collection_name)
+                        if dedup_enabled
+                        else None
+                    )
+                    if existing_id and _document_is_indexed(qdrant_svc, existing_id):
+                        logger.info(
+                            f"Job {job_id}: {filename} is already indexed "
+                            f"(document_id={existing_id}), skipping"
+                        )
+                        duplicates.append(filename)
+                        continue
+
+                    try:
+                        document_id, resumed = journal.begin_document(
+                            content_hash,
+                            qdrant_svc.collection_name,
+                            filename,
+                            doc_info[pdf_path][0],
+                            document_id,
+                            resume=pipeline_journal is not None,
+                            owner=job_id,
+                        )
+                    except DocumentInProgressError as exc:
+                        # Joining a live run would write every page twice
+                        logger.warning(f"Job {job_id}: skipping {filename}: {exc}")
+                        busy.append(filename)
+                        continue
+                    leased_documents.append(document_id)
+                    if resumed:
+                        logger.info(
+                            f"Job {job_id}: resuming interrupted ingestion of "
+                            f"{filename} (document_id={document_id})"
+                        )
+            documents.append((pdf_path, filename, document_id))
+
+        if not documents:
+            skipped = []
+            if duplicates:
+                skipped.append(f"{len(duplicates)} already indexed")
+            if busy:
+                skipped.append(f"{len(busy)} being indexed by another job")
+            completion_msg = (
+                f"All document(s) skipped ({', '.join(skipped)}); nothing to process"
+            )
+            progress_manager.complete(job_id, message=completion_msg)
+            logger.info(f"Job {job_id} completed: {completion_msg}")
+            return
+
+        total_pages_all = sum(doc_info[path][0] for path, _, _ in documents)
+        total_size_bytes = sum(doc_info[path][1] for path, _, _ in documents)
+        doc_filenames = [filename for _, filename, _ in documents]
+
         # Initialize Rich console with job info
         from domain.pipeline.console import get_pipeline_console
 
@@ -284,47 +433,43 @@ def run_indexing_job(
                 message=f"Processing {pages_processed}/{total_pages_all} pages",
             )
 
-        # Start consumer threads with progress callback
+        # Start consumer threads with progress callback; several documents are
+        # rasterized concurrently so the embedding stage never waits for the
+        # next pdfinfo
         pipeline.start(progress_callback=progress_cb)
 
-        for pdf_path in paths:
-            filename = filenames.get(pdf_path, os.path.basename(pdf_path))
-
-            logger.debug("Starting streaming ingestion for: %s", filename)
+        progress_manager.update(
+            job_id,
+            current=pages_processed,
+            message=(
+                f"Processing {documents[0][1]}..."
+                if len(documents) == 1
+                else f"Processing {len(documents)} documents..."
+            ),
+        )
 
-            progress_manager.update(
-                job_id,
-                current=pages_processed,
-                message=f"Processing {filename}...",
+        try:
+            pages_by_document = pipeline.process_documents(
+                documents,
+                max_concurrent_documents=max_concurrent_documents,
+                cancellation_check=check_cancellation,
             )
 
-            # Generate document_id and use pre-scanned info
-            document_id = str(uuid4())
-            total_pages, file_size_bytes = doc_info.get(pdf_path, (0, 0))
-
-            # Process PDF through streaming pipeline with consistent document_id
-            try:
-                pages_in_doc = pipeline.process_pdf(
-                    pdf_path=pdf_path,
-                    filename=filename,
-                    document_id=document_id,
-                    cancellation_check=check_cancellation,
-                )
-
+            for _, filename, document_id in documents:
                 logger.debug(
                     "Streaming ingestion complete for %s: %d pages",
                     filename,
-                    pages_in_doc,
+                    pages_by_document.get(document_id, 0),
                 )
 
-            except CancellationError:
-                raise
-            except Exception as exc:
-                logger.error(
-                    f"Failed to process {filename}: {exc}",
-                    exc_info=True,
-                )
-                raise
+        except CancellationError:
+            raise
+        except Exception as exc:
+            logger.error(
+                f"Failed to process documents: {exc}",
+                exc_info=True,
+            )
+            raise
 
         # Wait for pipeline to finish processing all batches
         progress_manager.update(
@@ -343,11 +488,27 @@ def run_indexing_job(
         if progress_manager.is_cancelled(job_id):
             raise CancellationError("Job cancelled after processing")
 
+        if journal:
+            # Documents with missing pages, or whose page count is unknown
+            # (pdfinfo failed), stay resumable and are not registered as
+            # indexed
+            tracker = pipeline.completion_tracker
+            assert tracker is not None  # Created when the pipeline started
+            for pdf_path, _, document_id in documents:
+                expected = doc_info[pdf_path][0]
+                done = tracker.get_document_pages(document_id)
+                if expected > 0 and done >= expected:
+                    journal.complete_document(document_id)
+
         # Success!
         completion_msg = (
             f"Successfully processed {total_pages_all} pages "
-            f"from {len(paths)} document(s) using streaming pipeline"
+            f"from {len(documents)} document(s) using streaming pipeline"
         )
+        if duplicates:
+            completion_msg += f" ({len(duplicates)} already indexed, skipped)"
+        if busy:
+            completion_msg += f" ({len(busy)} being indexed by another job, skipped)"
 
         progress_manager.complete(job_id, message=completion_msg)
 
@@ -371,5 +532,13 @@ def run_indexing_job(
             except Exception as exc:
                 logger.warning(f"Error stopping pipeline: {exc}")
 
+        # Unfinished documents become resumable by the next upload
+        if journal:
+            for document_id in leased_documents:
+                try:
+                    journal.release_document(document_id)
+                except Exception as exc:
+                    logger.warning(f"Error releasing journal lease: {exc}")
+
         # Cleanup temporary files
         cleanup_temp_files(paths)
@@ -7,6 +7,8 @@ from __future__ import annotations
 from typing import TYPE_CHECKING, Any, Optional
 
 from api.dependencies import qdrant_init_error, storage_init_error
+from domain.pipeline.journal import get_ingestion_journal
+from utils.search_cache import bump_collection_version
 
 try:  # pragma: no cover - tooling support
     import config  # type: ignore
@@ -29,6 +31,13 @@ def bucket_name() -> str:
     return str(getattr(config, "LOCAL_STORAGE_BUCKET_NAME", "documents"))
 
 
+def reset_ingestion_journal() -> None:
+    """Forget resumable ingestion progress once indexed data is removed."""
+    journal = get_ingestion_journal()
+    if journal:
+        journal.reset()
+
+
 def collect_collection_status(svc: Optional["QdrantClient"]) -> dict:
     embedded = bool(getattr(config, "QDRANT_EMBEDDED", False))
     status = {
@@ -174,6 +183,8 @@ def clear_all_sync(
             qdrant_init_error.get() or "Qdrant service unavailable"
         )
 
+    reset_ingestion_journal()
+
     if storage_svc:
         if bucket_exists(storage_svc):
             try:
@@ -244,9 +255,12 @@ def delete_sync(
         "collection": {"status": "pending", "message": ""},
         "bucket": {"status": "pending", "message": ""},
     }
+    reset_ingestion_journal()
+
     if svc:
         try:
             svc.service.delete_collection(collection_name=collection_name())
+            bump_collection_version(collection_name())
             results["collection"]["status"] = "success"
             results["collection"][
                 "message"
@@ -0,0 +1,72 @@
+"""Hand-off of upsert acknowledgements to stages that update existing points."""
+
+import threading
+from typing import Dict, Optional, Set
+
+
+class UpsertAcknowledgements:
+    """Tracks which batches Qdrant has acknowledged, so OCR can wait for them.
+
+    OCR writes its payload onto points that must already exist. Upserts are
+    coalesced and written on a flush pool, so OCR for a batch can finish
+    before the batch's points are in Qdrant. The upsert stage reports every
+    batch here with :meth:`acknowledge` (or :meth:`fail` when the points will
+    never arrive) and OCR blocks in :meth:`wait` before touching the points.
+    Entries are dropped with :meth:`forget` once the waiter is done; a batch
+    forgotten before it was reported (OCR skipped it) is not stored at all.
+    """
+
+    def __init__(self, stop_event: Optional[threading.Event] = None):
+        """Initialize tracker.
+
+        Args:
+            stop_event: Pipeline stop event; waiters give up once it is set
+        """
+        self.stop_event = stop_event
+        self._status: Dict[str, bool] = {}  # batch_key -> upserted
+        self._forgotten: Set[str] = set()  # forgotten before being reported
+        self._condition = threading.Condition()
+
+    @staticmethod
+    def _key(document_id: str, batch_id: int) -> str:
+        return f"{document_id}:{batch_id}"
+
+    def acknowledge(self, document_id: str, batch_id: int) -> None:
+        """Record that the batch's points are in Qdrant."""
+        self._set(document_id, batch_id, True)
+
+    def fail(self, document_id: str, batch_id: int) -> None:
+        """Record that the batch's points will never be upserted."""
+        self._set(document_id, batch_id, False)
+
+    def _set(self, document_id: str, batch_id: int, upserted: bool) -> None:
+        key = self._key(document_id, batch_id)
+        with self._condition:
+            if key in self._forgotten:
+                self._forgotten.discard(key)
+                return
+            self._status[key] = upserted
+            self._condition.notify_all()
+
+    def wait(self, document_id: str, batch_id: int) -> bool:
+        """Block until the batch is acknowledged or failed.
+
+        Returns:
+            True if the points are in Qdrant, False if the upsert failed or
+            the pipeline is stopping
+        """
+        key = self._key(document_id, batch_id)
+        with self._condition:
+            while key not in self._status:
+                if self.stop_event is not None and self.stop_event.is_set():
+                    return False
+                # Wake up periodically to notice the stop event
+                self._condition.wait(timeout=0.5)
+            return self._status[key]
+
+    def forget(self, document_id: str, batch_id: int) -> None:
+        """Drop the entry of a batch nobody waits for any more."""
+        key = self._key(document_id, batch_id)
+        with self._condition:
+            if self._status.pop(key, None) is None:
+                self._forgotten.add(key)
@@ -0,0 +1,242 @@
+"""
+Runtime auto-tuning for the streaming pipeline.
+
+The best ``BATCH_SIZE`` and in-flight batch budget depend on which stage is
+the bottleneck, which changes with OCR on/off, CPU vs GPU ColPali, document
+mix, etc. The tuner observes per-stage service times, queue depths and how
+long the rasterizer waits for the batch semaphore, then nudges both knobs
+while a job runs:
+
+- Batch size is hill-climbed on measured page throughput (keep moving in the
+  direction that helped, reverse when throughput drops).
+- In-flight batches are raised when the bottleneck stage is starved while the
+  rasterizer waits on the semaphore, and lowered again when the bottleneck
+  already has a full backlog (extra batches only cost memory).
+
+The two knobs are adjusted on alternating ticks so each throughput sample
+reflects a single change.
+"""
+
+import logging
+import queue
+import threading
+import time
+from collections import defaultdict
+from typing import Callable, Dict, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ResizableSemaphore:
+    """Counting semaphore whose limit can change while permits are held.
+
+    Lowering the limit never revokes permits; it only delays new acquisitions
+    until enough holders release. Time spent waiting in ``acquire`` is
+    accumulated so callers can tell when producers are throttled.
+    """
+
+    def __init__(self, limit: int):
+        self._limit = max(1, int(limit))
+        self._in_use = 0
+        self._wait_seconds = 0.0
+        self._cond = threading.Condition()
+
+    @property
+    def limit(self) -> int:
+        return self._limit
+
+    def set_limit(self, limit: int) -> None:
+        with self._cond:
+            self._limit = max(1, int(limit))
+            self._cond.notify_all()
+
+    def acquire(self, blocking: bool = True, timeout: Optional[float] = None) -> bool:
+        start = time.monotonic()
+        with self._cond:
+            try:
+                while self._in_use >= self._limit:
+                    if not blocking:
+                        return False
+                    remaining = None
+                    if timeout is not None:
+                        remaining = timeout - (time.monotonic() - start)
+                        if remaining <= 0:
+                            return False
+                    self._cond.wait(remaining)
+                self._in_use += 1
+                return True
+            finally:
+                self._wait_seconds += time.monotonic() - start
+
+    def release(self) -> None:
+        with self._cond:
+            if self._in_use > 0:
+                self._in_use -= 1
+            self._cond.notify()
+
+    def consume_wait_seconds(self) -> float:
+        """Return and reset the accumulated acquire wait time."""
+        with self._cond:
+            waited = self._wait_seconds
+            self._wait_seconds = 0.0
+            return waited
+
+
+class PipelineAutoTuner:
+    """Background controller for batch size and in-flight batch budget."""
+
+    # Relative throughput change treated as signal rather than noise
+    THROUGHPUT_TOLERANCE = 0.05
+    # Fraction of a tick the rasterizer may wait on the semaphore before the
+    # budget is considered too tight
+    SEMAPHORE_WAIT_THRESHOLD = 0.2
+
+    def __init__(
+        self,
+        set_batch_size: Callable[[int], None],
+        semaphore: ResizableSemaphore,
+        queues: Dict[str, queue.Queue],
+        completed_pages: Callable[[], int],
+        batch_size: int,
+        batch_size_bounds: Tuple[int, int],
+        in_flight_bounds: Tuple[int, int],
+        interval_s: float = 5.0,
+    ):
+        """Initialize tuner.
+
+        Args:
+            set_batch_size: Applies a new batch size (next batch onwards)
+            semaphore: In-flight batch semaphore shared with the rasterizer
+            queues: Stage key -> input queue of that stage
+            completed_pages: Returns total pages completed so far
+            batch_size: Starting batch size
+            batch_size_bounds: Inclusive (min, max) batch size
+            in_flight_bounds: Inclusive (min, max) in-flight batches
+            interval_s: Seconds between adjustments
+        """
+        self._set_batch_size = set_batch_size
+        self.semaphore = semaphore
+        self.queues = queues
+        self._completed_pages = completed_pages
+        self.batch_size = batch_size
+        self.batch_size_bounds = batch_size_bounds
+        self.in_flight_bounds = in_flight_bounds
+        self.interval_s = interval_s
+
+        self._lock = threading.Lock()
+        self._stage_time: Dict[str, float] = defaultdict(float)
+        self._stage_batches: Dict[str, int] = defaultdict(int)
+
+        self._direction = 1
+        self._last_throughput: Optional[float] = None
+        self._last_pages = 0
+        self._tick = 0
+        self._stop_event = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def observe(self, stage: str, elapsed_s: float, num_pages: int) -> None:
+        """Record one batch of work done by ``stage`` (called from stage threads)."""
+        with self._lock:
+            self._stage_time[stage] += elapsed_s
+            self._stage_batches[stage] += 1
+
+    def start(self) -> None:
+        self._last_pages = self._completed_pages()
+        self._thread = threading.Thread(
+            target=self._run, name="pipeline-autotune", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval_s)
+
+    def _run(self) -> None:
+        while not self._stop_event.wait(self.interval_s):
+            try:
+                self._adjust()
+            except Exception as exc:  # Tuning must never break ingestion
+                logger.warning("Pipeline auto-tune step failed: %s", exc)
+
+    def _drain_stage_times(self) -> Dict[str, float]:
+        """Return mean seconds per batch for each stage since the last tick."""
+        with self._lock:
+            means = {
+                stage: self._stage_time[stage] / count
+                for stage, count in self._stage_batches.items()
+                if count
+            }
+            self._stage_time.clear()
+            self._stage_batches.clear()
+        return means
+
+    def _adjust(self) -> None:
+        pages = self._completed_pages()
+        throughput = (pages - self._last_pages) / self.interval_s
+        self._last_pages = pages
+        stage_means = self._drain_stage_times()
+        semaphore_wait = self.semaphore.consume_wait_seconds() / self.interval_s
+
+        if not stage_means or throughput <= 0:
+            # Idle or still warming up; nothing meaningful to compare
+            return
+
+        self._tick += 1
+        if self._tick % 2:
+            self._tune_batch_size(throughput)
+        else:
+            self._tune_in_flight(stage_means, semaphore_wait)
+
+    def _tune_batch_size(self, throughput: float) -> None:
+        previous = self._last_throughput
+        self._last_throughput = throughput
+        if previous is not None and throughput < previous * (
+            1 - self.THROUGHPUT_TOLERANCE
+        ):
+            # Last move hurt - go back the other way
+            self._direction = -self._direction
+
+        low, high = self.batch_size_bounds
+        target = min(high, max(low, self.batch_size + self._direction))
+        if target == self.batch_size:
+            # Hit a bound; explore the other side next time
+            self._direction = -self._direction
+            return
+
+        logger.info(
+            "Auto-tune: batch size %d -> %d (%.2f pages/s)",
+            self.batch_size,
+            target,
+            throughput,
+        )
+        self.batch_size = target
+        self._set_batch_size(target)
+
+    def _tune_in_flight(
+        self, stage_means: Dict[str, float], semaphore_wait: float
+    ) -> None:
+        bottleneck = max(stage_means, key=lambda name: stage_means[name])
+        bottleneck_queue = self.queues.get(bottleneck)
+        depth = bottleneck_queue.qsize() if bottleneck_queue is not None else 0
+        capacity = bottleneck_queue.maxsize if bottleneck_queue is not None else 0
+
+        low, high = self.in_flight_bounds
+        limit = self.semaphore.limit
+        target = limit
+        if depth == 0 and semaphore_wait > self.SEMAPHORE_WAIT_THRESHOLD:
+            # Bottleneck idles while the producer is throttled
+            target = min(high, limit + 1)
+        elif capacity and depth >= min(capacity, limit):
+            # Bottleneck already has a full backlog; extra batches only use memory
+            target = max(low, limit - 1)
+
+        if target != limit:
+            logger.info(
+                "Auto-tune: in-flight batches %d -> %d (bottleneck: %s, depth %d)",
+                limit,
+                target,
+                bottleneck,
+                depth,
+            )
+            self.semaphore.set_limit(target)
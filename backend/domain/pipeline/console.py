@@ -58,6 +58,7 @@ class BatchProgress:
         """Initialize stage tracking."""
         if not self.stages:
             self.stages = {
+                "encoding": StageInfo("Encoding", icon="🗜️", color="blue"),
                 "storage": StageInfo("Storage", icon="🖼️", color="cyan"),
                 "embedding": StageInfo("Embedding", icon="🧠", color="magenta"),
                 "ocr": StageInfo("OCR", icon="📝", color="yellow"),
@@ -67,6 +68,7 @@ class BatchProgress:
 
 # Thresholds for marking stages as slow (seconds)
 SLOW_THRESHOLDS = {
+    "encoding": 2.0,
     "storage": 2.0,
     "embedding": 10.0,
     "ocr": 5.0,
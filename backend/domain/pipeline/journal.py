@@ -0,0 +1,350 @@
+"""
+Persistent ingestion journal for resumable indexing jobs.
+
+The journal is a small SQLite database stored under ``LOCAL_STORAGE_PATH``
+(outside the served bucket). Documents are keyed by the SHA-256 of the
+uploaded file, so re-uploading the same PDF after a crash resumes the
+original ``document_id``. For every page the journal keeps the ``page_id``
+(which is also the Qdrant point ID and storage object name) and a bitmask
+of the stages that finished for it. A resumed job skips pages that are
+complete and, within a batch, any stage that already ran for every page.
+
+Each unfinished document is leased to the job ingesting it: the row records
+the owning job, a per-process token and a heartbeat refreshed with every
+page update. A second upload of the same file only resumes a row whose owner
+is gone (its process finished with it, or its heartbeat is older than
+PIPELINE_JOURNAL_LEASE_SECONDS); while the owner is alive it is refused with
+:class:`DocumentInProgressError`.
+
+Completed documents stay in the ``documents`` table, which doubles as the
+content-hash registry used to skip re-uploads of already indexed files.
+"""
+
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+import uuid
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+import config
+
+logger = logging.getLogger(__name__)
+
+# Per-page stage flags (bitmask)
+EMBEDDED = 1
+STORED = 2
+OCR = 4
+UPSERTED = 8
+
+STATUS_IN_PROGRESS = "in_progress"
+STATUS_COMPLETED = "completed"
+
+JOURNAL_FILENAME = "ingestion_journal.sqlite3"
+
+# Identifies this backend process as the owner of the documents it ingests
+_PROCESS_TOKEN = uuid.uuid4().hex
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    content_hash TEXT NOT NULL,
+    collection TEXT NOT NULL,
+    document_id TEXT NOT NULL UNIQUE,
+    filename TEXT,
+    total_pages INTEGER,
+    status TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    owner TEXT,
+    owner_process TEXT,
+    heartbeat_at REAL,
+    PRIMARY KEY (content_hash, collection)
+);
+CREATE TABLE IF NOT EXISTS pages (
+    document_id TEXT NOT NULL,
+    page_number INTEGER NOT NULL,
+    page_id TEXT NOT NULL,
+    stages INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (document_id, page_number)
+);
+"""
+
+
+class DocumentInProgressError(Exception):
+    """Raised when another live job is still ingesting the same document."""
+
+    def __init__(self, document_id: str, owner: Optional[str]):
+        super().__init__(
+            f"Document {document_id} is being ingested by job {owner or 'unknown'}"
+        )
+        self.document_id = document_id
+        self.owner = owner
+
+
+def hash_file(path: str, chunk_size: int = 1024 * 1024) -> str:
+    """Return the SHA-256 hex digest of a file."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _batch_pages(batch) -> List[Tuple[int, str]]:
+    """(page_number, page_id) pairs of a PageBatch or EmbeddedBatch."""
+    return [
+        (meta["page_number"], page_id)
+        for meta, page_id in zip(batch.metadata, batch.image_ids)
+    ]
+
+
+class IngestionJournal:
+    """Thread-safe SQLite journal of per-page ingestion progress."""
+
+    def __init__(self, path: str):
+        self.path = path
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        # WAL keeps per-batch writes cheap; NORMAL is durable across process
+        # crashes, which is the failure mode this journal is for
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        self._conn.commit()
+        # Documents owned by jobs running in this process
+        self._active: Set[str] = set()
+
+    def _owner_alive(
+        self,
+        document_id: str,
+        owner_process: Optional[str],
+        heartbeat_at: Optional[float],
+    ) -> bool:
+        if document_id in self._active:
+            return True
+        if owner_process is None or owner_process == _PROCESS_TOKEN:
+            # Released lease, or an owner in this process that has already let go
+            return False
+        lease_s = float(getattr(config, "PIPELINE_JOURNAL_LEASE_SECONDS", 600))
+        return heartbeat_at is not None and time.time() - heartbeat_at < lease_s
+
+    def begin_document(
+        self,
+        content_hash: str,
+        collection: str,
+        filename: str,
+        total_pages: int,
+        new_document_id: str,
+        resume: bool = True,
+        owner: Optional[str] = None,
+    ) -> Tuple[str, bool]:
+        """Start (or resume) a document and lease it to ``owner``.
+
+        Args:
+            resume: Reuse the ID of an unfinished run of the same file
+            owner: Job ID recorded as the document's owner
+
+        Returns:
+            (document_id, resumed) - the journaled ID of an unfinished run of
+            the same file, or ``new_document_id`` for a fresh run
+
+        Raises:
+            DocumentInProgressError: If a live job still owns an unfinished
+                run of the same file
+        """
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT document_id, status, owner, owner_process, heartbeat_at "
+                "FROM documents WHERE content_hash = ? AND collection = ?",
+                (content_hash, collection),
+            ).fetchone()
+            if row and row[1] == STATUS_IN_PROGRESS:
+                if self._owner_alive(row[0], row[3], row[4]):
+                    raise DocumentInProgressError(row[0], row[2])
+                if resume:
+                    self._conn.execute(
+                        "UPDATE documents SET filename = ?, total_pages = ?, "
+                        "updated_at = ?, owner = ?, owner_process = ?, "
+                        "heartbeat_at = ? WHERE document_id = ?",
+                        (
+                            filename,
+                            total_pages,
+                            now,
+                            owner,
+                            _PROCESS_TOKEN,
+                            now,
+                            row[0],
+                        ),
+                    )
+                    self._active.add(row[0])
+                    return row[0], True
+
+            if row:
+                # Superseded run of the same file - start a new document
+                self._forget(row[0])
+            self._conn.execute(
+                "INSERT INTO documents (content_hash, collection, document_id, "
+                "filename, total_pages, status, updated_at, owner, owner_process, "
+                "heartbeat_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    content_hash,
+                    collection,
+                    new_document_id,
+                    filename,
+                    total_pages,
+                    STATUS_IN_PROGRESS,
+                    now,
+                    owner,
+                    _PROCESS_TOKEN,
+                    now,
+                ),
+            )
+            self._active.add(new_document_id)
+            return new_document_id, False
+
+    def release_document(self, document_id: str) -> None:
+        """End this process's lease on a document (its job has stopped).
+
+        Unfinished documents stay resumable by the next upload of the file.
+        """
+        with self._lock, self._conn:
+            self._active.discard(document_id)
+            self._conn.execute(
+                "UPDATE documents SET owner = NULL, owner_process = NULL "
+                "WHERE document_id = ?",
+                (document_id,),
+            )
+
+    def find_completed(self, content_hash: str, collection: str) -> Optional[str]:
+        """Return the document_id of a completed ingestion of this content."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT document_id FROM documents "
+                "WHERE content_hash = ? AND collection = ? AND status = ?",
+                (content_hash, collection, STATUS_COMPLETED),
+            ).fetchone()
+        return row[0] if row else None
+
+    def complete_document(self, document_id: str) -> None:
+        """Mark a document fully ingested and drop its page rows."""
+        with self._lock, self._conn:
+            self._active.discard(document_id)
+            self._conn.execute(
+                "UPDATE documents SET status = ?, updated_at = ?, owner = NULL, "
+                "owner_process = NULL WHERE document_id = ?",
+                (STATUS_COMPLETED, time.time(), document_id),
+            )
+            self._conn.execute(
+                "DELETE FROM pages WHERE document_id = ?", (document_id,)
+            )
+
+    def page_states(self, document_id: str) -> Dict[int, Tuple[str, int]]:
+        """page_number -> (page_id, stage flags) for a document."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT page_number, page_id, stages FROM pages WHERE document_id = ?",
+                (document_id,),
+            ).fetchall()
+        return {page: (page_id, stages) for page, page_id, stages in rows}
+
+    def mark_pages(
+        self, document_id: str, pages: Iterable[Tuple[int, str]], stage: int
+    ) -> None:
+        """Record that ``stage`` finished for the given (page_number, page_id) pairs.
+
+        Also renews the document's lease heartbeat.
+        """
+        rows = [(document_id, page, page_id, stage) for page, page_id in pages]
+        if not rows:
+            return
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT INTO pages (document_id, page_number, page_id, stages) "
+                "VALUES (?, ?, ?, ?) "
+                "ON CONFLICT(document_id, page_number) "
+                "DO UPDATE SET stages = stages | excluded.stages",
+                rows,
+            )
+            self._conn.execute(
+                "UPDATE documents SET heartbeat_at = ? WHERE document_id = ?",
+                (time.time(), document_id),
+            )
+
+    def pages_have(
+        self, document_id: str, page_numbers: Iterable[int], stage: int
+    ) -> bool:
+        """True if ``stage`` finished for every listed page."""
+        page_numbers = list(page_numbers)
+        if not page_numbers:
+            return False
+        placeholders = ",".join("?" * len(page_numbers))
+        with self._lock:
+            (count,) = self._conn.execute(
+                f"SELECT COUNT(*) FROM pages WHERE document_id = ? "
+                f"AND page_number IN ({placeholders}) AND stages & ? = ?",
+                (document_id, *page_numbers, stage, stage),
+            ).fetchone()
+        return count == len(page_numbers)
+
+    def batch_has(self, batch, stage: int) -> bool:
+        """True if ``stage`` already finished for every page of ``batch``."""
+        return self.pages_have(
+            batch.document_id, [page for page, _ in _batch_pages(batch)], stage
+        )
+
+    def mark_batch(self, batch, stage: int) -> None:
+        """Record that ``stage`` finished for every page of ``batch``."""
+        self.mark_pages(batch.document_id, _batch_pages(batch), stage)
+
+    def reset(self) -> None:
+        """Forget all progress (collection or storage was cleared).
+
+        Documents still being ingested by jobs in this process keep their
+        lease rows so a re-upload cannot start a second ingestion of them.
+        """
+        with self._lock, self._conn:
+            active = sorted(self._active)
+            placeholders = ",".join("?" * len(active))
+            self._conn.execute("DELETE FROM pages")
+            self._conn.execute(
+                f"DELETE FROM documents WHERE document_id NOT IN ({placeholders})",
+                active,
+            )
+
+    def _forget(self, document_id: str) -> None:
+        self._conn.execute("DELETE FROM pages WHERE document_id = ?", (document_id,))
+        self._conn.execute(
+            "DELETE FROM documents WHERE document_id = ?", (document_id,)
+        )
+
+
+_journal: Optional[IngestionJournal] = None
+_journal_lock = threading.Lock()
+
+
+def get_ingestion_journal() -> Optional[IngestionJournal]:
+    """Return the shared journal, or None when it is disabled/unavailable.
+
+    The database is opened when either resumable ingestion or upload
+    deduplication is enabled; both share the documents table.
+    """
+    if not (
+        bool(config.PIPELINE_JOURNAL_ENABLED)
+        or bool(config.UPLOAD_DEDUPLICATION_ENABLED)
+    ):
+        return None
+
+    global _journal
+    with _journal_lock:
+        if _journal is None:
+            path = str(Path(config.LOCAL_STORAGE_PATH) / JOURNAL_FILENAME)
+            try:
+                _journal = IngestionJournal(path)
+            except Exception as exc:
+                # Resumability is an optimization; never block ingestion on it
+                logger.warning("Ingestion journal unavailable at %s: %s", path, exc)
+                return None
+        return _journal
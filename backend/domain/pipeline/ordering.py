@@ -0,0 +1,57 @@
+"""Re-sequencing of batches produced by parallel stage workers."""
+
+import threading
+from collections import defaultdict
+from typing import Any, Callable, Dict
+
+
+class BatchReorderBuffer:
+    """Emits batches of each document in ``batch_id`` order.
+
+    Parallel workers finish batches out of order. Each finished batch is
+    handed to :meth:`push`; it is emitted immediately if it is the next one
+    expected for its document, otherwise it is held until the gap is filled.
+    Documents are sequenced independently, so concurrently rasterized
+    documents never wait on each other. A batch that failed upstream must be
+    reported with :meth:`skip`, or every later batch of its document would
+    wait for it forever.
+    """
+
+    def __init__(self, emit: Callable[[Any], None]):
+        """Initialize buffer.
+
+        Args:
+            emit: Called with each batch in order (may block, e.g. ``queue.put``)
+        """
+        self._emit = emit
+        self._next_batch: Dict[str, int] = defaultdict(int)
+        self._pending: Dict[str, Dict[int, Any]] = defaultdict(dict)
+        self._lock = threading.Lock()
+
+    def push(self, batch: Any) -> None:
+        """Accept a finished batch (needs ``document_id`` and ``batch_id``)."""
+        self._accept(batch.document_id, batch.batch_id, batch)
+
+    def skip(self, document_id: str, batch_id: int) -> None:
+        """Give up on a batch that will never arrive (it failed upstream).
+
+        Later batches of the document are released as if it had been emitted.
+        """
+        self._accept(document_id, batch_id, None)
+
+    def _accept(self, document_id: str, batch_id: int, batch: Any) -> None:
+        # Emitting under the lock keeps per-document order across workers;
+        # downstream consumers never take this lock, so a blocking emit
+        # cannot deadlock.
+        with self._lock:
+            next_id = self._next_batch[document_id]
+            if batch_id < next_id:
+                return  # Already emitted or skipped
+            pending = self._pending[document_id]
+            pending[batch_id] = batch
+            while next_id in pending:
+                ready = pending.pop(next_id)
+                if ready is not None:
+                    self._emit(ready)
+                next_id += 1
+            self._next_batch[document_id] = next_id
@@ -1,6 +1,7 @@
 """Pipeline stage implementations for streaming processing."""
 
 from .embedding import EmbeddingStage
+from .encoding import EncodingStage
 from .ocr import OCRStage
 from .rasterizer import PDFRasterizer
 from .storage import StorageStage
@@ -8,6 +9,7 @@ from .upsert import UpsertStage
 
 __all__ = [
     "EmbeddingStage",
+    "EncodingStage",
     "OCRStage",
     "PDFRasterizer",
     "StorageStage",
@@ -3,7 +3,11 @@
 import logging
 import queue
 import threading
+from typing import Callable, Optional
 
+from ..acknowledgements import UpsertAcknowledgements
+from ..journal import EMBEDDED, UPSERTED
+from ..ordering import BatchReorderBuffer
 from ..streaming_types import EmbeddedBatch, PageBatch
 from ..utils import log_stage_timing
 
@@ -13,15 +17,42 @@ logger = logging.getLogger(__name__)
 class EmbeddingStage:
     """Consumes rasterized pages, generates embeddings, produces embedded batches."""
 
-    def __init__(self, embedding_processor):
+    def __init__(
+        self,
+        embedding_processor,
+        journal=None,
+        acknowledgements: Optional[UpsertAcknowledgements] = None,
+    ):
         self.embedding_processor = embedding_processor
+        self.journal = journal
+        # Told about batches that fail here and so never reach the upsert
+        self.acknowledgements = acknowledgements
+        # Optional callback(stage_key, elapsed_s, num_pages) for auto-tuning
+        self.stage_observer: Optional[Callable[..., None]] = None
+
+    def _resumed_batch(self, batch: PageBatch) -> EmbeddedBatch:
+        """Pass-through for pages whose points an earlier run already upserted."""
+        return EmbeddedBatch(
+            document_id=batch.document_id,
+            filename=batch.filename,
+            batch_id=batch.batch_id,
+            page_start=batch.page_start,
+            original_embeddings=[],
+            pooled_by_rows=None,
+            pooled_by_columns=None,
+            image_ids=batch.image_ids,
+            metadata=batch.metadata,
+            already_upserted=True,
+        )
 
     @log_stage_timing("Embedding")
     def process_batch(self, batch: PageBatch) -> EmbeddedBatch:
         """Generate embeddings for a batch."""
         # Generate embeddings
         original, pooled_rows, pooled_cols = (
-            self.embedding_processor.embed_and_mean_pool_batch(batch.images)
+            self.embedding_processor.embed_and_mean_pool_batch(
+                batch.images, encoded_images=batch.embedding_images
+            )
         )
 
         # Use shared image IDs from PageBatch (generated during rasterization)
@@ -45,8 +76,14 @@ class EmbeddingStage:
         input_queue: queue.Queue,
         output_queue: queue.Queue,
         stop_event: threading.Event,
+        reorder_buffer: Optional[BatchReorderBuffer] = None,
     ):
-        """Consumer loop: take from input, embed, push to output."""
+        """Consumer loop: take from input, embed, push to output.
+
+        Several workers may run this loop on the same queues. When a
+        ``reorder_buffer`` is given, embedded batches are released to the
+        output in batch order per document instead of completion order.
+        """
         logger.debug("Embedding stage started")
 
         while not stop_event.is_set():
@@ -57,11 +94,24 @@ class EmbeddingStage:
                 continue
 
             try:
-                embedded_batch = self.process_batch(batch)
-                output_queue.put(embedded_batch, block=True)
+                if self.journal and self.journal.batch_has(batch, UPSERTED):
+                    embedded_batch = self._resumed_batch(batch)
+                else:
+                    embedded_batch = self.process_batch(batch)
+                    if self.journal:
+                        self.journal.mark_batch(batch, EMBEDDED)
+                if reorder_buffer is not None:
+                    reorder_buffer.push(embedded_batch)
+                else:
+                    output_queue.put(embedded_batch, block=True)
                 logger.debug("Embedded batch %d pushed to queue", batch.batch_id)
             except Exception as exc:
                 logger.error("Embedding failed for batch %d: %s", batch.batch_id, exc)
+                if self.acknowledgements:
+                    self.acknowledgements.fail(batch.document_id, batch.batch_id)
+                if reorder_buffer is not None:
+                    # Don't hold back the document's later batches forever
+                    reorder_buffer.skip(batch.document_id, batch.batch_id)
                 raise
             finally:
                 input_queue.task_done()
@@ -0,0 +1,104 @@
+"""Image encoding stage for streaming pipeline."""
+
+import dataclasses
+import logging
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, List, Optional
+
+from PIL import Image
+
+from ..image_processor import ImageProcessor, ProcessedImage
+from ..streaming_types import PageBatch
+from ..utils import log_stage_timing
+
+logger = logging.getLogger(__name__)
+
+
+class EncodingStage:
+    """Encodes each page once and fans the encoded batch out to all consumers.
+
+    Storage and OCR share the storage-format encoding; the embedding stage
+    uploads a lossless PNG variant, optionally downscaled to the model's
+    working resolution.
+    """
+
+    EMBEDDING_FORMAT = "PNG"
+
+    def __init__(self, image_processor: ImageProcessor, embedding_max_edge: int = 0):
+        """Initialize encoding stage.
+
+        Args:
+            image_processor: Processor used for the storage/OCR encoding
+            embedding_max_edge: Longest edge of the embedding variant in pixels
+                (0 keeps the rasterized resolution)
+        """
+        self.image_processor = image_processor
+        self.embedding_max_edge = max(0, int(embedding_max_edge))
+        # Optional callback(stage_key, elapsed_s, num_pages) for auto-tuning
+        self.stage_observer: Optional[Callable[..., None]] = None
+
+    def _encode_for_embedding(self, image: Image.Image) -> ProcessedImage:
+        """Encode the PNG variant sent to ColPali."""
+        edge = self.embedding_max_edge
+        if edge and max(image.size) > edge:
+            scale = edge / float(max(image.size))
+            size = (
+                max(1, round(image.width * scale)),
+                max(1, round(image.height * scale)),
+            )
+            # resize() returns a new image, the shared page stays untouched
+            image = image.resize(size, Image.Resampling.LANCZOS)
+        return self.image_processor.process(image, format=self.EMBEDDING_FORMAT)
+
+    @log_stage_timing("Encoding")
+    def process_batch(self, batch: PageBatch) -> PageBatch:
+        """Encode every page of the batch (storage + embedding variants)."""
+        images = list(batch.images)
+        with ThreadPoolExecutor(max_workers=max(1, len(images) * 2)) as executor:
+            stored = executor.map(self.image_processor.process, images)
+            embedded = executor.map(self._encode_for_embedding, images)
+            processed_images: List[ProcessedImage] = list(stored)
+            embedding_images: List[ProcessedImage] = list(embedded)
+
+        return dataclasses.replace(
+            batch,
+            processed_images=processed_images,
+            embedding_images=embedding_images,
+        )
+
+    def run(
+        self,
+        input_queue: queue.Queue,
+        output_queues: List[queue.Queue],
+        stop_event: threading.Event,
+    ):
+        """Consumer loop: take rasterized batches, encode, broadcast."""
+        logger.debug("Encoding stage started")
+
+        while not stop_event.is_set():
+            try:
+                batch = input_queue.get(timeout=0.5)
+            except queue.Empty:
+                continue
+
+            try:
+                encoded_batch = self.process_batch(batch)
+                for q in output_queues:
+                    q.put(
+                        dataclasses.replace(
+                            encoded_batch,
+                            image_ids=encoded_batch.image_ids.copy(),
+                            metadata=encoded_batch.metadata.copy(),
+                        ),
+                        block=True,
+                    )
+                logger.debug("Encoded batch %d broadcast", batch.batch_id)
+            except Exception as exc:
+                logger.error("Encoding failed for batch %d: %s", batch.batch_id, exc)
+                raise
+            finally:
+                input_queue.task_done()
+
+        logger.info("Encoding stage stopped")
@@ -4,10 +4,14 @@ import logging
 import queue
 import threading
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import Dict
+from functools import partial
+from typing import Callable, Dict, List, Optional, Tuple
 
 import config
+from utils.search_cache import bump_collection_version
 
+from ..acknowledgements import UpsertAcknowledgements
+from ..journal import OCR, UPSERTED
 from ..streaming_types import PageBatch
 from ..utils import log_stage_timing
 
@@ -18,32 +22,56 @@ class OCRStage:
     """Processes OCR independently and stores results."""
 
     def __init__(
-        self, ocr_service, image_processor, qdrant_service=None, collection_name=None
+        self,
+        ocr_service,
+        image_processor,
+        qdrant_service=None,
+        collection_name=None,
+        journal=None,
+        acknowledgements: Optional[UpsertAcknowledgements] = None,
     ):
         self.ocr_service = ocr_service
+        self.journal = journal
+        # Upserts are coalesced and flushed in the background; OCR waits for a
+        # batch's points to be in Qdrant before writing its payload onto them
+        self.acknowledgements = acknowledgements
         self.image_processor = image_processor
         self.qdrant_service = qdrant_service
         self.collection_name = collection_name
         # Track completion status (OCR data stored in local storage, not cached here)
         self.completed_batches: set[str] = set()  # batch_key
         self._lock = threading.Lock()
+        # Optional callback(stage_key, elapsed_s, num_pages) for auto-tuning
+        self.stage_observer: Optional[Callable[..., None]] = None
 
     @log_stage_timing("OCR")
-    def process_batch(self, batch: PageBatch):
+    def process_batch(self, batch: PageBatch) -> List[Tuple[int, str]]:
         """Process OCR for batch.
 
         Parallelism is controlled by batch size - all pages in batch are processed concurrently.
+
+        Returns:
+            (page_number, page_id) of the pages whose OCR payload was written
+            to existing Qdrant points
         """
         if not self.ocr_service or not config.DEEPSEEK_OCR_ENABLED:
             logger.debug("OCR skipped for batch %d (OCR disabled)", batch.batch_id)
-            return
+            return []
 
-        # Process images (format conversion)
-        processed_images = self.image_processor.process_batch(batch.images)
+        # Reuse the encoding stage output; encode here only if it is missing
+        processed_images = batch.processed_images or (
+            self.image_processor.process_batch(batch.images)
+        )
 
         # Process all pages in batch in parallel (batch size controls parallelism)
         num_workers = len(processed_images)
-        ocr_results = [None] * num_workers
+        wait_for_upsert: Optional[Callable[[], bool]] = None
+        if self.acknowledgements:
+            wait_for_upsert = partial(
+                self.acknowledgements.wait, batch.document_id, batch.batch_id
+            )
+
+        ocr_results: List[Optional[Dict]] = [None] * num_workers
 
         with ThreadPoolExecutor(max_workers=num_workers) as executor:
             futures = {
@@ -51,6 +79,7 @@ class OCRStage:
                     self._process_single_ocr,
                     processed_images[idx],
                     batch.metadata[idx],
+                    wait_for_upsert,
                 ): idx
                 for idx in range(len(processed_images))
             }
@@ -60,9 +89,24 @@ class OCRStage:
                 result = future.result()  # Will raise if OCR/storage failed
                 ocr_results[idx] = result
 
-    def _process_single_ocr(self, processed_image, meta: Dict) -> Dict:
+        return [
+            (meta["page_number"], meta["page_id"])
+            for meta, result in zip(batch.metadata, ocr_results)
+            if result and result["payload_applied"]
+        ]
+
+    def _process_single_ocr(
+        self,
+        processed_image,
+        meta: Dict,
+        wait_for_upsert: Optional[Callable[[], bool]] = None,
+    ) -> Dict:
         """Process single page OCR.
 
+        Args:
+            wait_for_upsert: Blocks until the page's points are in Qdrant;
+                returns False if they never will be
+
         Raises on failure - no silent fallbacks.
         """
         # Extract required fields - will raise KeyError if missing
@@ -107,7 +151,12 @@ class OCRStage:
         )
 
         # Update Qdrant with OCR data (text, markdown, regions with image URLs)
-        if self.qdrant_service and self.collection_name:
+        payload_applied = False
+        if wait_for_upsert is not None and not wait_for_upsert():
+            logger.warning(
+                f"Points for page_id={page_id} were not upserted, skipping OCR payload"
+            )
+        elif self.qdrant_service and self.collection_name:
             try:
                 from qdrant_client import models
 
@@ -152,6 +201,8 @@ class OCRStage:
                         payload=ocr_payload,
                         points=point_ids,
                     )
+                    bump_collection_version(self.collection_name)
+                    payload_applied = True
                     logger.debug(
                         f"Updated {len(point_ids)} points with OCR data for page {page_id}"
                     )
@@ -167,6 +218,7 @@ class OCRStage:
         return {
             "text_preview": ocr_result.get("text", "")[:200],
             "region_count": len(ocr_result.get("regions", [])),
+            "payload_applied": payload_applied,
         }
 
     def run(
@@ -193,8 +245,23 @@ class OCRStage:
                 continue
 
             try:
-                self.process_batch(batch)
-                logger.debug("Processed OCR for batch %d", batch.batch_id)
+                # Pages that lack UPSERTED are written again by this run without
+                # the OCR payload, so OCR is only skipped when both are done
+                if self.journal and self.journal.batch_has(batch, OCR | UPSERTED):
+                    logger.debug("Batch %d already OCR'd, skipping", batch.batch_id)
+                else:
+                    applied = self.process_batch(batch)
+                    if self.journal:
+                        # Only pages whose upsert is journaled; a payload that
+                        # never reached its points is OCR'd again on resume
+                        states = self.journal.page_states(batch.document_id)
+                        upserted = [
+                            (page, page_id)
+                            for page, page_id in applied
+                            if page in states and states[page][1] & UPSERTED
+                        ]
+                        self.journal.mark_pages(batch.document_id, upserted, OCR)
+                    logger.debug("Processed OCR for batch %d", batch.batch_id)
 
                 # Notify completion tracker that OCR is done for this batch
                 if completion_tracker:
@@ -206,6 +273,8 @@ class OCRStage:
                 logger.error("OCR failed for batch %d: %s", batch.batch_id, exc)
                 raise  # OCR failures are critical - stop the pipeline
             finally:
+                if self.acknowledgements:
+                    self.acknowledgements.forget(batch.document_id, batch.batch_id)
                 input_queue.task_done()
 
         logger.info("OCR stage stopped")
@@ -2,15 +2,25 @@
 
 import logging
 import queue
+import time
 import uuid
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import Callable, List, Optional
+from typing import Callable, Collection, Dict, List, Optional
 
 import config
 from pdf2image import convert_from_path, pdfinfo_from_path
-
+from PIL import Image
+from utils.metrics import (
+    observe_semaphore_wait,
+    observe_stage,
+    record_stage_error,
+)
+
+from ..autotune import ResizableSemaphore
 from ..console import get_pipeline_console
 from ..streaming_types import PageBatch
+from . import render_pool
 
 logger = logging.getLogger(__name__)
 
@@ -25,6 +35,45 @@ class PDFRasterizer:
     ):
         self.batch_size = batch_size
         self.worker_threads = worker_threads or config.get_ingestion_worker_threads()
+        self.backend = self._resolve_backend()
+        # Optional callback(stage_key, elapsed_s, num_pages) for auto-tuning
+        self.stage_observer: Optional[Callable[..., None]] = None
+
+    @staticmethod
+    def _resolve_backend() -> str:
+        """Pick the rendering backend from config and installed packages."""
+        requested = str(config.PDF_RASTERIZER_BACKEND).lower()
+        if requested not in ("auto", "pymupdf"):
+            return "pdf2image"
+        if render_pool.is_available():
+            return "pymupdf"
+        if requested == "pymupdf":
+            logger.warning(
+                "PDF_RASTERIZER_BACKEND=pymupdf but PyMuPDF is not installed; "
+                "falling back to pdf2image"
+            )
+        return "pdf2image"
+
+    def _render_pages(
+        self, pdf_path: str, first_page: int, last_page: int
+    ) -> List[Image.Image]:
+        """Render an inclusive page range with the configured backend."""
+        if self.backend == "pymupdf":
+            pool = render_pool.get_render_pool(self.worker_threads)
+            try:
+                return pool.render(pdf_path, first_page, last_page, config.RASTER_DPI)
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM); start fresh on the next batch
+                render_pool.reset_render_pool()
+                raise
+
+        return convert_from_path(
+            pdf_path,
+            dpi=config.RASTER_DPI,
+            thread_count=self.worker_threads,
+            first_page=first_page,
+            last_page=last_page,
+        )
 
     def rasterize_streaming(
         self,
@@ -33,7 +82,10 @@ class PDFRasterizer:
         document_id: str,
         output_queues: List[queue.Queue],
         cancellation_check: Optional[Callable] = None,
-        batch_semaphore: Optional = None,
+        batch_semaphore: Optional[ResizableSemaphore] = None,
+        completion_tracker=None,
+        known_page_ids: Optional[Dict[int, str]] = None,
+        skip_pages: Optional[Collection[int]] = None,
     ) -> int:
         """
         Rasterize PDF and broadcast batches to all output queues.
@@ -45,6 +97,11 @@ class PDFRasterizer:
             output_queues: List of queues to broadcast batches to
             cancellation_check: Optional function to check for cancellation
             batch_semaphore: Optional semaphore to limit in-flight batches
+            completion_tracker: Optional tracker that releases shared pages
+                once all stages complete a batch
+            known_page_ids: page_number -> page_id from an earlier, interrupted
+                run; reused so stored objects and points are overwritten
+            skip_pages: Pages already fully ingested (not rasterized again)
 
         Returns:
             Total number of pages processed
@@ -69,10 +126,17 @@ class PDFRasterizer:
                 file_size_mb,
             )
 
+            known_page_ids = known_page_ids or {}
+            skip_pages = set(skip_pages or ())
+
             batch_id = 0
             page = 1
 
             while page <= total_pages:
+                if page in skip_pages:
+                    page += 1
+                    continue
+
                 # Check cancellation before expensive operation
                 if cancellation_check:
                     cancellation_check()
@@ -81,34 +145,44 @@ class PDFRasterizer:
                 # Use timeout to allow periodic cancellation checks
                 semaphore_acquired = False
                 if batch_semaphore:
+                    wait_start = time.time()
                     while not semaphore_acquired:
                         semaphore_acquired = batch_semaphore.acquire(timeout=0.5)
                         if not semaphore_acquired and cancellation_check:
                             # Check cancellation while waiting for semaphore
                             cancellation_check()
+                    observe_semaphore_wait(time.time() - wait_start)
 
                 try:
-                    # Rasterize next batch
+                    # Rasterize next batch (a contiguous run of pages to process)
                     last_page = min(page + self.batch_size - 1, total_pages)
+                    for candidate in range(page + 1, last_page + 1):
+                        if candidate in skip_pages:
+                            last_page = candidate - 1
+                            break
 
                     logger.debug(
                         "Rasterizing pages %d-%d of %d", page, last_page, total_pages
                     )
 
-                    images = convert_from_path(
-                        pdf_path,
-                        thread_count=self.worker_threads,
-                        first_page=page,
-                        last_page=last_page,
-                    )
+                    render_start = time.time()
+                    images = self._render_pages(pdf_path, page, last_page)
+                    render_elapsed = time.time() - render_start
+                    observe_stage("rasterize", render_elapsed)
+                    if self.stage_observer is not None:
+                        self.stage_observer("rasterize", render_elapsed, len(images))
 
-                    # Force load all images to avoid lazy-loading issues when copying
+                    # Force load all images before sharing them across stage threads
                     # PIL Images are lazy-loaded by default, calling load() forces data into memory
                     for img in images:
                         img.load()
 
-                    # Generate unique image IDs for this batch (shared across all stages)
-                    image_ids = [str(uuid.uuid4()) for _ in images]
+                    # Generate unique image IDs for this batch (shared across all stages),
+                    # reusing the IDs of pages an interrupted run already touched
+                    image_ids = [
+                        known_page_ids.get(page + offset) or str(uuid.uuid4())
+                        for offset in range(len(images))
+                    ]
 
                     # Build metadata for each page
                     metadata = []
@@ -134,8 +208,6 @@ class PDFRasterizer:
                             }
                         )
 
-                    # Broadcast to all output queues with independent copies
-                    # Each consumer gets its own copy of the images to avoid PIL threading issues
                     batch_size = len(images)
 
                     # Announce batch start with Rich console
@@ -143,19 +215,23 @@ class PDFRasterizer:
                         batch_id, page, last_page, batch_size, document_id, filename
                     )
 
-                    for i, q in enumerate(output_queues):
-                        # Create deep copy of images for thread safety
-                        # PIL Image objects are not thread-safe when shared
-                        images_copy = (
-                            [img.copy() for img in images] if i > 0 else images
+                    # Broadcast one shared, fully loaded set of pages to every
+                    # queue. Stages only read (encode/convert into new objects),
+                    # so no per-queue deep copy is needed; the tracker closes the
+                    # pages once every stage has finished with the batch.
+                    shared_images = tuple(images)
+                    if completion_tracker:
+                        completion_tracker.register_batch(
+                            document_id, batch_id, shared_images
                         )
 
+                    for q in output_queues:
                         batch = PageBatch(
                             document_id=document_id,
                             filename=filename,
                             batch_id=batch_id,
                             page_start=page,
-                            images=images_copy,
+                            images=shared_images,
                             image_ids=image_ids.copy(),  # Share same IDs across all stages
                             metadata=metadata.copy(),
                             total_pages=total_pages,
@@ -167,7 +243,7 @@ class PDFRasterizer:
                     page = last_page + 1
                 except Exception:
                     # Release semaphore on error (including cancellation)
-                    if semaphore_acquired:
+                    if batch_semaphore and semaphore_acquired:
                         batch_semaphore.release()
                     raise
 
@@ -188,6 +264,7 @@ class PDFRasterizer:
             if isinstance(exc, CancellationError):
                 logger.info("Rasterization cancelled for %s: %s", filename, exc)
             else:
+                record_stage_error("rasterize")
                 logger.error(
                     "Rasterization failed for %s: %s", filename, exc, exc_info=True
                 )
@@ -0,0 +1,176 @@
+"""Process-pool page renderer backed by PyMuPDF.
+
+Each worker process keeps recently used documents open, so rendering a batch
+only costs the page render itself instead of spawning ``pdftoppm`` and
+re-parsing the PDF for every batch (which is what ``pdf2image`` does).
+
+Rendered pixels are handed back through shared memory; only the segment
+name and page size cross the process pipe, so a 200 DPI page (~11 MB of RGB)
+is not pickled and copied through it.
+
+PyMuPDF is AGPL-licensed and therefore an optional install
+(``requirements-pymupdf.txt``); without it the rasterizer uses pdf2image.
+"""
+
+import logging
+import multiprocessing
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import TYPE_CHECKING, List, Optional, Tuple
+
+from PIL import Image
+
+logger = logging.getLogger(__name__)
+
+try:  # Optional dependency - falls back to pdf2image when missing
+    import fitz  # type: ignore  # PyMuPDF
+except ImportError:  # pragma: no cover - depends on deployment
+    fitz = None
+
+if TYPE_CHECKING:
+    from fitz import Document  # type: ignore  # PyMuPDF
+
+# Documents kept open per worker process (LRU)
+_MAX_OPEN_DOCUMENTS = 4
+
+# Per-process cache of open documents: (path, mtime_ns) -> fitz.Document
+_open_documents: "OrderedDict[Tuple[str, int], Document]" = OrderedDict()
+
+
+def is_available() -> bool:
+    """Return True if PyMuPDF is installed."""
+    return fitz is not None
+
+
+def _get_document(pdf_path: str) -> "Document":
+    """Return an open document for ``pdf_path``, reusing the worker cache."""
+    assert fitz is not None  # Pools are only created when PyMuPDF is installed
+    key = (pdf_path, os.stat(pdf_path).st_mtime_ns)
+    document = _open_documents.get(key)
+    if document is not None:
+        _open_documents.move_to_end(key)
+        return document
+
+    document = fitz.open(pdf_path)
+    _open_documents[key] = document
+    while len(_open_documents) > _MAX_OPEN_DOCUMENTS:
+        _, evicted = _open_documents.popitem(last=False)
+        try:
+            evicted.close()
+        except Exception:
+            pass
+    return document
+
+
+def _render_page(pdf_path: str, page_number: int, dpi: int) -> Tuple[int, int, str]:
+    """Render a single 1-indexed page into shared memory (runs in a worker).
+
+    Returns:
+        (width, height, shared memory name) - the caller owns the segment
+        and must unlink it
+    """
+    assert fitz is not None
+    document = _get_document(pdf_path)
+    page = document.load_page(page_number - 1)
+    zoom = dpi / 72.0
+    pixmap = page.get_pixmap(matrix=fitz.Matrix(zoom, zoom), alpha=False)
+    samples = getattr(pixmap, "samples_mv", None) or pixmap.samples
+    segment = shared_memory.SharedMemory(create=True, size=len(samples))
+    try:
+        assert segment.buf is not None
+        segment.buf[: len(samples)] = samples
+    except BaseException:
+        segment.close()
+        segment.unlink()
+        raise
+    segment.close()
+    return pixmap.width, pixmap.height, segment.name
+
+
+def _take_shared_image(name: str, width: int, height: int) -> Image.Image:
+    """Copy a rendered page out of shared memory and free the segment."""
+    segment = shared_memory.SharedMemory(name=name)
+    try:
+        assert segment.buf is not None
+        view = segment.buf[: width * height * 3]
+        try:
+            return Image.frombytes("RGB", (width, height), view)
+        finally:
+            view.release()
+    finally:
+        segment.close()
+        segment.unlink()
+
+
+class PageRenderPool:
+    """Renders PDF pages in parallel across worker processes.
+
+    Pages are returned in request order, so callers can keep the existing
+    batch ordering contract.
+    """
+
+    def __init__(self, max_workers: int):
+        if fitz is None:
+            raise RuntimeError("PyMuPDF is not installed; cannot use render pool")
+        self.max_workers = max(1, int(max_workers))
+        # Spawn avoids forking a process that already runs many threads
+        self._executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+
+    def render(self, pdf_path: str, first_page: int, last_page: int, dpi: int):
+        """Render pages ``first_page..last_page`` (inclusive) as PIL images."""
+        futures = [
+            self._executor.submit(_render_page, pdf_path, page, dpi)
+            for page in range(first_page, last_page + 1)
+        ]
+        images: List[Image.Image] = []
+        error: Optional[BaseException] = None
+        # Collect every page even after a failure so no segment is left behind
+        for future in futures:
+            try:
+                width, height, name = future.result()
+            except BaseException as exc:
+                error = error or exc
+                continue
+            image = _take_shared_image(name, width, height)
+            if error is None:
+                images.append(image)
+        if error is not None:
+            raise error
+        return images
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+_render_pool: Optional[PageRenderPool] = None
+_render_pool_lock = threading.Lock()
+
+
+def get_render_pool(max_workers: int) -> PageRenderPool:
+    """Get or create the shared render pool.
+
+    The pool is process-wide so worker start-up is paid once, not per job.
+    """
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is None or _render_pool.max_workers != max_workers:
+            if _render_pool is not None:
+                _render_pool.shutdown()
+            logger.info("Starting PDF render pool with %d workers", max_workers)
+            _render_pool = PageRenderPool(max_workers)
+        return _render_pool
+
+
+def reset_render_pool() -> None:
+    """Discard the shared pool (e.g. after a worker crashed)."""
+    global _render_pool
+    with _render_pool_lock:
+        if _render_pool is not None:
+            _render_pool.shutdown()
+            _render_pool = None
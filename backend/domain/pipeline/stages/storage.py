@@ -3,7 +3,9 @@
 import logging
 import queue
 import threading
+from typing import Callable, Optional
 
+from ..journal import STORED
 from ..streaming_types import PageBatch
 from ..utils import log_stage_timing
 
@@ -13,8 +15,11 @@ logger = logging.getLogger(__name__)
 class StorageStage:
     """Stores images in local storage independently of embedding."""
 
-    def __init__(self, image_store):
+    def __init__(self, image_store, journal=None):
         self.image_store = image_store
+        self.journal = journal
+        # Optional callback(stage_key, elapsed_s, num_pages) for auto-tuning
+        self.stage_observer: Optional[Callable[..., None]] = None
 
     @log_stage_timing("Storage")
     def process_batch(self, batch: PageBatch) -> None:
@@ -26,6 +31,7 @@ class StorageStage:
             image_batch=batch.images,
             meta_batch=batch.metadata,
             image_ids=batch.image_ids,  # Use pre-generated IDs
+            processed_images=batch.processed_images,  # Encoded once upstream
         )
 
     def run(
@@ -52,8 +58,13 @@ class StorageStage:
                 continue
 
             try:
-                self.process_batch(batch)
-                logger.debug("Stored batch %d", batch.batch_id)
+                if self.journal and self.journal.batch_has(batch, STORED):
+                    logger.debug("Batch %d already stored, skipping", batch.batch_id)
+                else:
+                    self.process_batch(batch)
+                    if self.journal:
+                        self.journal.mark_batch(batch, STORED)
+                    logger.debug("Stored batch %d", batch.batch_id)
 
                 # Notify completion tracker that storage is done for this batch
                 if completion_tracker:
@@ -3,9 +3,17 @@
 import logging
 import queue
 import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, List, Optional, Tuple
 
 import config
+from utils.metrics import observe_stage, record_stage_error
+from utils.search_cache import bump_collection_version
 
+from ..acknowledgements import UpsertAcknowledgements
+from ..console import get_pipeline_console
+from ..journal import UPSERTED
 from ..streaming_types import EmbeddedBatch
 from ..utils import log_stage_timing
 
@@ -18,6 +26,17 @@ class UpsertStage:
 
     Storage and OCR run independently - UpsertStage only waits for embeddings.
     URLs are generated on-the-fly from metadata (no coordination needed).
+
+    With coalescing enabled, several embedded batches are merged into one
+    upsert request, flushed when enough points are pending, when every batch
+    the in-flight budget allows is waiting on upsert (no further batch can
+    arrive before one completes), or when the oldest pending batch has
+    waited long enough. A single collector serves all upsert workers;
+    flushes run on a small thread pool so it keeps collecting the next group
+    while Qdrant writes the previous one. Each flush waits for Qdrant to
+    apply its write; batches are only reported complete (and their queue
+    items released) once it has, and OCR waits for the same acknowledgement
+    before adding its payload.
     """
 
     def __init__(
@@ -28,13 +47,42 @@ class UpsertStage:
         storage_base_url: str,
         storage_bucket: str,
         completion_tracker=None,
+        coalesce_max_points: int = 0,
+        coalesce_max_delay_s: float = 0.5,
+        flush_workers: int = 2,
+        in_flight_limit: Optional[Callable[[], int]] = None,
+        journal=None,
+        acknowledgements: Optional[UpsertAcknowledgements] = None,
     ):
+        """Initialize upsert stage.
+
+        Args:
+            coalesce_max_points: Flush once this many points are pending
+                (0 disables coalescing: one synchronous upsert per batch)
+            coalesce_max_delay_s: Flush once the oldest pending batch is this old
+            flush_workers: Concurrent upsert requests
+            in_flight_limit: Current in-flight batch budget of the pipeline;
+                a group holding that many batches is flushed immediately
+            journal: Optional ingestion journal recording upserted pages
+            acknowledgements: Optional tracker told when each batch's points
+                are in Qdrant (or will never be)
+        """
         self.point_factory = point_factory
         self.qdrant_service = qdrant_service
         self.collection_name = collection_name
         self.storage_base_url = storage_base_url
         self.storage_bucket = storage_bucket
         self.completion_tracker = completion_tracker
+        self.coalesce_max_points = max(0, int(coalesce_max_points))
+        self.coalesce_max_delay_s = max(0.0, float(coalesce_max_delay_s))
+        self.flush_workers = max(1, int(flush_workers))
+        self.in_flight_limit = in_flight_limit
+        self.journal = journal
+        self.acknowledgements = acknowledgements
+        self._collector_lock = threading.Lock()
+        self._collector_running = False
+        # Optional callback(stage_key, elapsed_s, num_pages) for auto-tuning
+        self.stage_observer: Optional[Callable[..., None]] = None
 
     def _generate_image_url(
         self, document_id: str, page_number: int, page_id: str
@@ -51,9 +99,8 @@ class UpsertStage:
         bucket_suffix = f"/{self.storage_bucket}" if self.storage_bucket else ""
         return f"{base}{bucket_suffix}/{object_name}"
 
-    @log_stage_timing("Upsert")
-    def process_batch(self, embedded_batch: EmbeddedBatch):
-        """Build points from embeddings and upsert to Qdrant.
+    def _build_points(self, embedded_batch: EmbeddedBatch) -> list:
+        """Build Qdrant points for a batch.
 
         Storage/OCR run independently - we just generate URL references.
         """
@@ -92,6 +139,30 @@ class UpsertStage:
             image_records=image_records,
             meta_batch=embedded_batch.metadata,
         )
+        return points
+
+    def _acknowledge(self, embedded_batch: EmbeddedBatch):
+        """Let stages waiting for the batch's points know they are in Qdrant."""
+        if self.acknowledgements:
+            self.acknowledgements.acknowledge(
+                embedded_batch.document_id, embedded_batch.batch_id
+            )
+
+    def _complete_resumed(self, embedded_batch: EmbeddedBatch):
+        """Report a batch whose points an interrupted run already upserted."""
+        logger.debug("Batch %d already upserted, skipping", embedded_batch.batch_id)
+        self._acknowledge(embedded_batch)
+        if self.completion_tracker:
+            self.completion_tracker.mark_stage_complete(
+                embedded_batch.document_id,
+                embedded_batch.batch_id,
+                len(embedded_batch.image_ids),
+            )
+
+    @log_stage_timing("Upsert")
+    def process_batch(self, embedded_batch: EmbeddedBatch):
+        """Build points from embeddings and upsert to Qdrant."""
+        points = self._build_points(embedded_batch)
 
         # Upsert to Qdrant
         num_points = len(points)
@@ -101,6 +172,10 @@ class UpsertStage:
             collection_name=self.collection_name,
             points=points,
         )
+        bump_collection_version(self.collection_name)
+        if self.journal:
+            self.journal.mark_batch(embedded_batch, UPSERTED)
+        self._acknowledge(embedded_batch)
 
         # Notify completion tracker that upsert is done for this batch
         if self.completion_tracker:
@@ -108,14 +183,187 @@ class UpsertStage:
                 embedded_batch.document_id, embedded_batch.batch_id, num_points
             )
 
+    def _record_failure(self, batches: List[EmbeddedBatch], exc: Exception):
+        """Report an upsert failure for every batch it affects."""
+        record_stage_error("upsert")
+        console = get_pipeline_console()
+        for batch in batches:
+            if self.acknowledgements:
+                self.acknowledgements.fail(batch.document_id, batch.batch_id)
+            console.stage_failed(batch.batch_id, "upsert", str(exc), batch.document_id)
+            logger.error(
+                "Upsert failed for batch %d: %s", batch.batch_id, exc, exc_info=True
+            )
+
+    def _flush(
+        self,
+        group: List[Tuple[EmbeddedBatch, list, float]],
+        input_queue: queue.Queue,
+    ):
+        """Upsert a coalesced group in one request, then complete its batches.
+
+        Args:
+            group: (batch, points, received_at) for every pending batch
+            input_queue: Queue the batches came from (task_done after ack)
+        """
+        console = get_pipeline_console()
+        try:
+            points = [point for _, batch_points, _ in group for point in batch_points]
+            logger.debug(
+                "Upserting %d points from %d batches to Qdrant",
+                len(points),
+                len(group),
+            )
+            self.qdrant_service.upsert(
+                collection_name=self.collection_name,
+                points=points,
+                wait=True,
+            )
+            bump_collection_version(self.collection_name)
+
+            finished = time.time()
+            observer = self.stage_observer
+            for batch, batch_points, received_at in group:
+                elapsed = finished - received_at
+                observe_stage("upsert", elapsed)
+                console.stage_completed(
+                    batch.batch_id,
+                    "upsert",
+                    elapsed,
+                    f"{len(batch_points)} pages",
+                    batch.document_id,
+                )
+                if observer is not None:
+                    observer("upsert", elapsed, len(batch_points))
+                if self.journal:
+                    self.journal.mark_batch(batch, UPSERTED)
+                self._acknowledge(batch)
+                if self.completion_tracker:
+                    self.completion_tracker.mark_stage_complete(
+                        batch.document_id, batch.batch_id, len(batch_points)
+                    )
+        except Exception as exc:
+            self._record_failure([batch for batch, _, _ in group], exc)
+            raise
+        finally:
+            for _ in group:
+                input_queue.task_done()
+
+    def _budget_exhausted(self, batches: int) -> bool:
+        """True if ``batches`` waiting on upsert use the whole in-flight budget."""
+        if self.in_flight_limit is None:
+            return False
+        return batches >= max(1, int(self.in_flight_limit()))
+
+    def _run_coalescing(self, input_queue: queue.Queue, stop_event: threading.Event):
+        """Consumer loop that merges batches into larger, overlapping upserts."""
+        console = get_pipeline_console()
+        pending: List[Tuple[EmbeddedBatch, list, float]] = []
+        pending_points = 0
+        # (flush, batches in it) until the flush is collected
+        flushes: List[Tuple[Future, int]] = []
+        # Bound outstanding flushes so pending points cannot pile up in memory
+        flush_slots = threading.Semaphore(self.flush_workers)
+
+        def submit(executor: ThreadPoolExecutor):
+            nonlocal pending, pending_points
+            group, pending, pending_points = pending, [], 0
+            flush_slots.acquire()
+            future = executor.submit(self._flush, group, input_queue)
+            future.add_done_callback(lambda _: flush_slots.release())
+            flushes.append((future, len(group)))
+
+        def raise_failed_flushes():
+            for entry in [entry for entry in flushes if entry[0].done()]:
+                flushes.remove(entry)
+                entry[0].result()  # Re-raises upsert errors in the stage thread
+
+        def unacknowledged_batches() -> int:
+            return len(pending) + sum(
+                count for future, count in flushes if not future.done()
+            )
+
+        with ThreadPoolExecutor(
+            max_workers=self.flush_workers, thread_name_prefix="upsert-flush"
+        ) as executor:
+            while not stop_event.is_set():
+                raise_failed_flushes()
+
+                timeout = 0.5
+                if pending:
+                    age = time.time() - pending[0][2]
+                    timeout = self.coalesce_max_delay_s - age
+                    if timeout <= 0:
+                        submit(executor)
+                        continue
+
+                try:
+                    embedded_batch = input_queue.get(timeout=timeout)
+                except queue.Empty:
+                    if pending:
+                        submit(executor)
+                    continue
+
+                if embedded_batch.already_upserted:
+                    try:
+                        self._complete_resumed(embedded_batch)
+                    finally:
+                        input_queue.task_done()
+                    continue
+
+                try:
+                    console.stage_started(
+                        embedded_batch.batch_id, "upsert", embedded_batch.document_id
+                    )
+                    points = self._build_points(embedded_batch)
+                except Exception as exc:
+                    input_queue.task_done()
+                    self._record_failure([embedded_batch], exc)
+                    raise
+
+                pending.append((embedded_batch, points, time.time()))
+                pending_points += len(points)
+                # Flushing early when the budget is used up avoids holding the
+                # rasterizer for the full delay at small in-flight settings
+                if pending_points >= self.coalesce_max_points or (
+                    self._budget_exhausted(unacknowledged_batches())
+                ):
+                    submit(executor)
+
+            if pending:
+                submit(executor)
+            for future, _ in flushes:
+                future.result()
+
     def run(
         self,
         input_queue: queue.Queue,
         stop_event: threading.Event,
     ):
-        """Consumer loop: wait for embeddings and upsert."""
+        """Consumer loop: wait for embeddings and upsert.
+
+        Safe to run from several worker threads on the same queue; the
+        completion tracker is order-agnostic. With coalescing, only the first
+        worker collects (so groups are not split between workers); extra
+        workers return immediately and concurrency comes from
+        ``flush_workers``.
+        """
         logger.debug("Upsert stage started")
 
+        if self.coalesce_max_points > 0:
+            with self._collector_lock:
+                if self._collector_running:
+                    logger.debug("Upsert collector already running")
+                    return
+                self._collector_running = True
+            try:
+                self._run_coalescing(input_queue, stop_event)
+            finally:
+                with self._collector_lock:
+                    self._collector_running = False
+            logger.info("Upsert stage stopped")
+            return
+
         while not stop_event.is_set():
             try:
                 embedded_batch = input_queue.get(timeout=0.5)
@@ -123,9 +371,16 @@ class UpsertStage:
                 continue
 
             try:
+                if embedded_batch.already_upserted:
+                    self._complete_resumed(embedded_batch)
+                    continue
                 self.process_batch(embedded_batch)
                 logger.debug("Upserted batch %d", embedded_batch.batch_id)
             except Exception as exc:
+                if self.acknowledgements:
+                    self.acknowledgements.fail(
+                        embedded_batch.document_id, embedded_batch.batch_id
+                    )
                 logger.error(
                     "Upsert failed for batch %d: %s",
                     embedded_batch.batch_id,
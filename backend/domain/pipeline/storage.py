@@ -1,7 +1,7 @@
 """Image storage helpers for pipeline processing."""
 
 import logging
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Sequence, Tuple
 
 from PIL import Image
 
@@ -29,9 +29,10 @@ class ImageStorageHandler:
     def store(
         self,
         batch_start: int,
-        image_batch: List[Image.Image],
+        image_batch: Sequence[Image.Image],
         meta_batch: List[dict],
         image_ids: List[str],
+        processed_images: Optional[List[ProcessedImage]] = None,
     ) -> Tuple[List[str], List[Dict[str, object]], List[ProcessedImage]]:
         """
         Store images in storage using hierarchical structure.
@@ -46,6 +47,8 @@ class ImageStorageHandler:
             Metadata for each image, must contain 'document_id' and 'page_number'
         image_ids : List[str]
             Pre-generated image IDs (must be provided - generated during rasterization)
+        processed_images : List[ProcessedImage], optional
+            Already encoded images (from the encoding stage); encoded here if omitted
 
         Returns
         -------
@@ -72,8 +75,9 @@ class ImageStorageHandler:
             document_ids.append(document_id)
             page_numbers.append(page_num)
 
-        # Process images once using centralized processor
-        processed_images = self._image_processor.process_batch(image_batch)
+        # Process images once using centralized processor (unless done upstream)
+        if processed_images is None:
+            processed_images = self._image_processor.process_batch(list(image_batch))
 
         try:
             # Store pre-processed images in storage with batch-size parallelism
@@ -7,6 +7,7 @@ the stages/ subpackage.
 
 Architecture:
 - PDF rasterization produces pages as soon as they're ready
+- Each page is encoded once and the encoded batch is broadcast to consumers
 - Embedding, storage, and OCR run independently in parallel
 - All stages coordinate via document_id:batch_id keys
 - Backpressure prevents memory overflow via bounded queues
@@ -23,11 +24,25 @@ import queue
 import threading
 import time
 from collections import defaultdict
-from typing import Callable, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+import config
+from utils.metrics import (
+    record_pages_completed,
+    register_pipeline,
+    unregister_pipeline,
+)
 
+from .acknowledgements import UpsertAcknowledgements
+from .autotune import PipelineAutoTuner, ResizableSemaphore
 from .console import get_pipeline_console
+from .errors import CancellationError
+from .journal import OCR, STORED, UPSERTED, IngestionJournal
+from .ordering import BatchReorderBuffer
 from .stages import (
     EmbeddingStage,
+    EncodingStage,
     OCRStage,
     PDFRasterizer,
     StorageStage,
@@ -44,7 +59,7 @@ class BatchCompletionTracker:
         self,
         num_stages: int,
         progress_callback: Optional[Callable] = None,
-        batch_semaphore: Optional[threading.Semaphore] = None,
+        batch_semaphore: Optional[ResizableSemaphore] = None,
     ):
         """Initialize tracker.
 
@@ -58,8 +73,15 @@ class BatchCompletionTracker:
         self.batch_semaphore = batch_semaphore
         self.batch_completions = defaultdict(int)  # batch_key -> completion_count
         self.completed_pages = 0
+        self.document_pages: Dict[str, int] = defaultdict(int)  # document_id -> pages
+        self._batch_images: Dict[str, Sequence] = {}  # batch_key -> shared pages
         self._lock = threading.Lock()
 
+    def register_batch(self, document_id: str, batch_id: int, images: Sequence):
+        """Register the shared page images of a batch for release on completion."""
+        with self._lock:
+            self._batch_images[f"{document_id}:{batch_id}"] = images
+
     def mark_stage_complete(self, document_id: str, batch_id: int, num_pages: int):
         """Mark a stage as complete for a batch.
 
@@ -78,6 +100,8 @@ class BatchCompletionTracker:
             if self.batch_completions[batch_key] == self.num_stages:
                 # All stages complete for this batch
                 self.completed_pages += num_pages
+                self.document_pages[document_id] += num_pages
+                record_pages_completed(num_pages)
 
                 # Log batch completion with Rich console (pass batch page count)
                 console = get_pipeline_console()
@@ -86,6 +110,14 @@ class BatchCompletionTracker:
                 # Clean up tracking for this batch
                 del self.batch_completions[batch_key]
 
+                # Every stage is done with the shared pages - free pixel memory
+                # now instead of waiting for the last reference to go away
+                for image in self._batch_images.pop(batch_key, ()):
+                    try:
+                        image.close()
+                    except Exception:
+                        pass
+
                 # Release semaphore to allow next batch to enter pipeline
                 if self.batch_semaphore:
                     self.batch_semaphore.release()
@@ -97,6 +129,24 @@ class BatchCompletionTracker:
                     except Exception as exc:
                         logger.warning("Progress callback failed: %s", exc)
 
+    def add_completed_pages(self, document_id: str, num_pages: int):
+        """Count pages finished by an earlier run (resumed jobs) as complete."""
+        if num_pages <= 0:
+            return
+        with self._lock:
+            self.completed_pages += num_pages
+            self.document_pages[document_id] += num_pages
+            if self.progress_callback:
+                try:
+                    self.progress_callback(self.completed_pages)
+                except Exception as exc:
+                    logger.warning("Progress callback failed: %s", exc)
+
+    def get_document_pages(self, document_id: str) -> int:
+        """Return the number of fully completed pages for a document."""
+        with self._lock:
+            return self.document_pages.get(document_id, 0)
+
 
 class StreamingPipeline:
     """
@@ -124,6 +174,16 @@ class StreamingPipeline:
         storage_bucket: str,
         batch_size: int = 4,
         max_in_flight_batches: int = 1,
+        embedding_image_max_edge: int = 0,
+        autotune: bool = False,
+        max_batch_size: int = 16,
+        max_in_flight_limit: int = 16,
+        embedding_workers: int = 1,
+        upsert_workers: int = 1,
+        preserve_batch_order: bool = False,
+        upsert_coalesce_points: int = 0,
+        upsert_coalesce_delay_s: float = 0.25,
+        journal: Optional[IngestionJournal] = None,
     ):
         """Initialize streaming pipeline with all dependencies injected.
 
@@ -139,20 +199,80 @@ class StreamingPipeline:
             storage_bucket: Storage bucket name
             batch_size: Number of pages per batch
             max_in_flight_batches: Maximum batches processing simultaneously
+            embedding_image_max_edge: Longest edge of the image variant uploaded
+                to ColPali (0 keeps the rasterized resolution)
+            autotune: Adjust batch size and in-flight batches while running
+            max_batch_size: Upper bound for auto-tuned batch size
+            max_in_flight_limit: Upper bound for auto-tuned in-flight batches
+            embedding_workers: Threads consuming the embedding queue
+                (outstanding ColPali requests)
+            upsert_workers: Threads upserting embedded batches to Qdrant
+            preserve_batch_order: Hand embedded batches to upsert in page order
+                per document even when embedding workers finish out of order
+            upsert_coalesce_points: Merge batches into upserts of about this
+                many points (0 upserts every batch on its own)
+            upsert_coalesce_delay_s: Longest a batch waits for others to merge
+            journal: Optional ingestion journal; pages and stages it records as
+                done are skipped, and stages record their progress in it
         """
         self.batch_size = batch_size
         self.max_in_flight_batches = max_in_flight_batches
+        self.autotune = autotune
+        self.embedding_workers = max(1, int(embedding_workers))
+        self.upsert_workers = max(1, int(upsert_workers))
+        self.preserve_batch_order = preserve_batch_order
+        self.upsert_coalesce_points = upsert_coalesce_points
+        self.upsert_coalesce_delay_s = upsert_coalesce_delay_s
+        self.journal = journal
+
+        # Auto-tuning searches up to twice the configured values
+        self.batch_size_bounds = (
+            1,
+            max(batch_size, min(max_batch_size, batch_size * 2)),
+        )
+        self.in_flight_bounds = (
+            max_in_flight_batches,
+            max(
+                max_in_flight_batches,
+                min(max_in_flight_limit, max_in_flight_batches * 2),
+            ),
+        )
 
-        # Derive queue size from in-flight batches (allow some buffering)
-        self.max_queue_size = max(2, max_in_flight_batches * 2)
+        # Derive queue size from in-flight batches (allow some buffering);
+        # size for the largest budget the tuner may pick
+        peak_in_flight = self.in_flight_bounds[1] if autotune else max_in_flight_batches
+        self.max_queue_size = max(2, peak_in_flight * 2)
 
         # Create stages with injected dependencies
+        # Thread control
+        self.stop_event = threading.Event()
+        self.threads = []
+
+        # OCR waits for each batch's upsert before writing onto its points
+        self.upsert_acknowledgements = (
+            UpsertAcknowledgements(self.stop_event)
+            if ocr_service and config.DEEPSEEK_OCR_ENABLED
+            else None
+        )
+
         self.rasterizer = PDFRasterizer(batch_size=batch_size)
-        self.embedding_stage = EmbeddingStage(embedding_processor)
-        self.storage_stage = StorageStage(image_store)
+        self.encoding_stage = EncodingStage(image_processor, embedding_image_max_edge)
+        self.embedding_stage = EmbeddingStage(
+            embedding_processor,
+            journal=journal,
+            acknowledgements=self.upsert_acknowledgements,
+        )
+        self.storage_stage = StorageStage(image_store, journal=journal)
         # Pass qdrant_service to OCR stage so it can update OCR URLs
         self.ocr_stage = (
-            OCRStage(ocr_service, image_processor, qdrant_service, collection_name)
+            OCRStage(
+                ocr_service,
+                image_processor,
+                qdrant_service,
+                collection_name,
+                journal=journal,
+                acknowledgements=self.upsert_acknowledgements,
+            )
             if ocr_service
             else None
         )
@@ -166,17 +286,16 @@ class StreamingPipeline:
         self.storage_bucket = storage_bucket
 
         # Create bounded queues for backpressure control
+        self.encoding_input_queue = queue.Queue(maxsize=self.max_queue_size)
         self.embedding_input_queue = queue.Queue(maxsize=self.max_queue_size)
         self.storage_input_queue = queue.Queue(maxsize=self.max_queue_size)
         self.ocr_input_queue = queue.Queue(maxsize=self.max_queue_size)
         self.embedding_queue = queue.Queue(maxsize=self.max_queue_size)
 
-        # Thread control
-        self.stop_event = threading.Event()
-        self.threads = []
-
-        # Batch completion tracker (created in start())
+        # Batch completion tracker and optional tuner (created in start())
         self.completion_tracker = None
+        self.autotuner: Optional[PipelineAutoTuner] = None
+        self._start_time: Optional[float] = None
 
     def start(self, progress_callback: Optional[Callable] = None):
         """Start all consumer stage threads.
@@ -185,6 +304,7 @@ class StreamingPipeline:
             progress_callback: Optional callback(current_pages) for progress updates
         """
         logger.info("Starting streaming pipeline stages")
+        self._start_time = time.time()
 
         # Count active stages (embedding + storage + optional OCR)
         # Embedding stage doesn't count because it only produces, doesn't complete
@@ -193,8 +313,8 @@ class StreamingPipeline:
         if self.ocr_stage:
             num_stages += 1  # + ocr
 
-        # Create semaphore to limit in-flight batches
-        batch_semaphore = threading.Semaphore(self.max_in_flight_batches)
+        # Create semaphore to limit in-flight batches (resized when tuning)
+        batch_semaphore = ResizableSemaphore(self.max_in_flight_batches)
 
         # Create batch completion tracker with semaphore
         self.completion_tracker = BatchCompletionTracker(
@@ -214,17 +334,49 @@ class StreamingPipeline:
             self.storage_base_url,
             self.storage_bucket,
             completion_tracker=self.completion_tracker,
+            coalesce_max_points=self.upsert_coalesce_points,
+            coalesce_max_delay_s=self.upsert_coalesce_delay_s,
+            flush_workers=max(2, self.upsert_workers),
+            in_flight_limit=lambda: batch_semaphore.limit,
+            journal=self.journal,
+            acknowledgements=self.upsert_acknowledgements,
         )
 
-        # Start embedding consumer
-        embedding_thread = threading.Thread(
-            target=self.embedding_stage.run,
-            args=(self.embedding_input_queue, self.embedding_queue, self.stop_event),
-            name="embedding-stage",
+        # Start encoding stage (fans encoded batches out to the consumers)
+        consumer_queues = [self.embedding_input_queue, self.storage_input_queue]
+        if self.ocr_stage:
+            consumer_queues.append(self.ocr_input_queue)
+
+        encoding_thread = threading.Thread(
+            target=self.encoding_stage.run,
+            args=(self.encoding_input_queue, consumer_queues, self.stop_event),
+            name="encoding-stage",
             daemon=True,
         )
-        embedding_thread.start()
-        self.threads.append(embedding_thread)
+        encoding_thread.start()
+        self.threads.append(encoding_thread)
+
+        # Start embedding consumers (re-sequenced only with several workers)
+        reorder_buffer = None
+        if self.preserve_batch_order and self.embedding_workers > 1:
+            reorder_buffer = BatchReorderBuffer(
+                lambda batch: self.embedding_queue.put(batch, block=True)
+            )
+
+        for worker in range(self.embedding_workers):
+            embedding_thread = threading.Thread(
+                target=self.embedding_stage.run,
+                args=(
+                    self.embedding_input_queue,
+                    self.embedding_queue,
+                    self.stop_event,
+                    reorder_buffer,
+                ),
+                name=f"embedding-stage-{worker}",
+                daemon=True,
+            )
+            embedding_thread.start()
+            self.threads.append(embedding_thread)
 
         # Start storage consumer
         storage_thread = threading.Thread(
@@ -247,18 +399,74 @@ class StreamingPipeline:
             ocr_thread.start()
             self.threads.append(ocr_thread)
 
-        # Start upsert consumer
-        upsert_thread = threading.Thread(
-            target=self.upsert_stage.run,
-            args=(self.embedding_queue, self.stop_event),
-            name="upsert-stage",
-            daemon=True,
-        )
-        upsert_thread.start()
-        self.threads.append(upsert_thread)
+        # Start upsert consumers (one shared collector when coalescing; its
+        # flush pool provides the upsert concurrency)
+        upsert_threads = 1 if self.upsert_coalesce_points > 0 else self.upsert_workers
+        for worker in range(upsert_threads):
+            upsert_thread = threading.Thread(
+                target=self.upsert_stage.run,
+                args=(self.embedding_queue, self.stop_event),
+                name=f"upsert-stage-{worker}",
+                daemon=True,
+            )
+            upsert_thread.start()
+            self.threads.append(upsert_thread)
+
+        if self.autotune:
+            self._start_autotuner(batch_semaphore)
+
+        register_pipeline(self)
 
         logger.debug("Started %d pipeline stage threads", len(self.threads))
 
+    def stage_queues(self) -> Dict[str, queue.Queue]:
+        """Input queue of every active stage, keyed by stage name."""
+        queues = {
+            "encoding": self.encoding_input_queue,
+            "embedding": self.embedding_input_queue,
+            "storage": self.storage_input_queue,
+            "upsert": self.embedding_queue,
+        }
+        if self.ocr_stage:
+            queues["ocr"] = self.ocr_input_queue
+        return queues
+
+    def _start_autotuner(self, batch_semaphore: ResizableSemaphore):
+        """Attach the auto-tuner to every stage and start its control loop."""
+
+        def set_batch_size(size: int) -> None:
+            self.batch_size = size
+            self.rasterizer.batch_size = size
+
+        tracker = self.completion_tracker
+        assert tracker is not None  # Created in start() before tuning begins
+
+        self.autotuner = PipelineAutoTuner(
+            set_batch_size=set_batch_size,
+            semaphore=batch_semaphore,
+            queues=self.stage_queues(),
+            completed_pages=lambda: tracker.completed_pages,
+            batch_size=self.batch_size,
+            batch_size_bounds=self.batch_size_bounds,
+            in_flight_bounds=self.in_flight_bounds,
+        )
+        for stage in (
+            self.rasterizer,
+            self.encoding_stage,
+            self.embedding_stage,
+            self.storage_stage,
+            self.ocr_stage,
+            self.upsert_stage,
+        ):
+            if stage is not None:
+                stage.stage_observer = self.autotuner.observe
+        self.autotuner.start()
+        logger.info(
+            "Pipeline auto-tune enabled (batch size %d-%d, in-flight %d-%d)",
+            *self.batch_size_bounds,
+            *self.in_flight_bounds,
+        )
+
     def process_pdf(
         self,
         pdf_path: str,
@@ -278,23 +486,31 @@ class StreamingPipeline:
         Returns:
             Total pages processed
         """
-        self._start_time = time.time()
-        self._current_filename = filename
+        if self._start_time is None:
+            self._start_time = time.time()
         logger.debug("Processing PDF: %s (document_id: %s)", filename, document_id)
 
-        # Build list of output queues for broadcasting
-        output_queues = [self.embedding_input_queue, self.storage_input_queue]
-        if self.ocr_stage:
-            output_queues.append(self.ocr_input_queue)
+        known_page_ids, skip_pages = self._resume_state(document_id)
+        if skip_pages:
+            logger.info(
+                "Resuming %s: %d pages already ingested", filename, len(skip_pages)
+            )
+            if self.completion_tracker:
+                self.completion_tracker.add_completed_pages(
+                    document_id, len(skip_pages)
+                )
 
-        # Rasterize and broadcast to all queues
+        # Rasterize into the encoding stage, which broadcasts to all consumers
         total_pages = self.rasterizer.rasterize_streaming(
             pdf_path=pdf_path,
             filename=filename,
             document_id=document_id,
-            output_queues=output_queues,
+            output_queues=[self.encoding_input_queue],
             cancellation_check=cancellation_check,
             batch_semaphore=self.batch_semaphore,
+            completion_tracker=self.completion_tracker,
+            known_page_ids=known_page_ids,
+            skip_pages=skip_pages,
         )
 
         logger.debug(
@@ -305,6 +521,109 @@ class StreamingPipeline:
 
         return total_pages
 
+    def _resume_state(self, document_id: str):
+        """Page IDs and fully finished pages recorded by an interrupted run."""
+        if not self.journal:
+            return {}, set()
+
+        required = STORED | UPSERTED
+        if self.ocr_stage and config.DEEPSEEK_OCR_ENABLED:
+            required |= OCR
+
+        states = self.journal.page_states(document_id)
+        known_page_ids = {page: page_id for page, (page_id, _) in states.items()}
+        skip_pages = {
+            page
+            for page, (_, stages) in states.items()
+            if stages & required == required
+        }
+        return known_page_ids, skip_pages
+
+    def process_documents(
+        self,
+        documents: List[Tuple[str, str, str]],
+        max_concurrent_documents: int = 1,
+        cancellation_check: Optional[Callable] = None,
+    ) -> Dict[str, int]:
+        """
+        Rasterize several documents concurrently into the shared stage queues.
+
+        Every document draws batches from the same in-flight semaphore, so the
+        global batch budget is respected no matter how many documents are
+        active. If any document fails, the remaining rasterizers are stopped at
+        their next batch boundary and the original error is re-raised.
+
+        Args:
+            documents: List of (pdf_path, filename, document_id) tuples
+            max_concurrent_documents: Maximum documents rasterized at once
+            cancellation_check: Optional function to check for cancellation
+
+        Returns:
+            Mapping of document_id to pages rasterized
+        """
+        workers = max(1, min(int(max_concurrent_documents), len(documents)))
+        if workers <= 1:
+            return {
+                document_id: self.process_pdf(
+                    pdf_path=pdf_path,
+                    filename=filename,
+                    document_id=document_id,
+                    cancellation_check=cancellation_check,
+                )
+                for pdf_path, filename, document_id in documents
+            }
+
+        abort_event = threading.Event()
+
+        def check() -> None:
+            if abort_event.is_set():
+                raise CancellationError("Sibling document failed")
+            if cancellation_check:
+                cancellation_check()
+
+        def run_one(pdf_path: str, filename: str, document_id: str) -> int:
+            try:
+                return self.process_pdf(
+                    pdf_path=pdf_path,
+                    filename=filename,
+                    document_id=document_id,
+                    cancellation_check=check,
+                )
+            except Exception:
+                abort_event.set()
+                raise
+
+        logger.debug(
+            "Rasterizing %d documents with up to %d in parallel",
+            len(documents),
+            workers,
+        )
+
+        pages: Dict[str, int] = {}
+        first_error: Optional[BaseException] = None
+        with ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="rasterizer"
+        ) as executor:
+            futures = [
+                (document_id, executor.submit(run_one, pdf_path, filename, document_id))
+                for pdf_path, filename, document_id in documents
+            ]
+            for document_id, future in futures:
+                try:
+                    pages[document_id] = future.result()
+                except BaseException as exc:
+                    # Prefer the root cause over sibling cancellations
+                    if first_error is None or (
+                        isinstance(first_error, CancellationError)
+                        and not isinstance(exc, CancellationError)
+                    ):
+                        first_error = exc
+
+        if first_error is not None:
+            raise first_error
+
+        return pages
+
     def wait_for_completion(self):
         """
         Wait for all pipeline stages to complete processing.
@@ -313,7 +632,8 @@ class StreamingPipeline:
         """
         logger.debug("Waiting for pipeline to drain...")
 
-        # Wait for all input queues
+        # Wait for all input queues (encoding first, it feeds the others)
+        self.encoding_input_queue.join()
         self.embedding_input_queue.join()
         self.storage_input_queue.join()
 
@@ -324,7 +644,7 @@ class StreamingPipeline:
         self.embedding_queue.join()
 
         # Print completion summary with Rich console
-        if hasattr(self, "_start_time") and self.completion_tracker:
+        if self._start_time is not None and self.completion_tracker:
             total_time = time.time() - self._start_time
             total_pages = self.completion_tracker.completed_pages
             console = get_pipeline_console()
@@ -337,6 +657,15 @@ class StreamingPipeline:
         logger.info("Stopping streaming pipeline")
 
         self.stop_event.set()
+        unregister_pipeline(self)
+
+        if self.autotuner is not None:
+            self.autotuner.stop()
+            logger.info(
+                "Auto-tune final settings: batch size %d, in-flight batches %d",
+                self.autotuner.batch_size,
+                self.autotuner.semaphore.limit,
+            )
 
         # Wait for threads to finish
         for thread in self.threads:
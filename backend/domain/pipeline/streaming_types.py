@@ -1,8 +1,9 @@
 """Data structures for streaming pipeline."""
 
 from dataclasses import dataclass
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence
 
+import numpy as np
 from PIL import Image
 
 
@@ -14,11 +15,14 @@ class PageBatch:
     filename: str
     batch_id: int  # Batch sequence number within document
     page_start: int  # Starting page number (1-indexed)
-    images: List[Image.Image]
+    images: Sequence[Image.Image]  # Shared read-only across all stage queues
     image_ids: List[str]  # Unique ID for each page (shared across all stages)
     metadata: List[Dict[str, Any]]  # Per-page metadata
     total_pages: int  # Total pages in document
     file_size_bytes: Optional[int] = None
+    # Set by the encoding stage: storage/OCR encoding and the ColPali upload variant
+    processed_images: Optional[List[Any]] = None
+    embedding_images: Optional[List[Any]] = None
 
 
 @dataclass
@@ -29,8 +33,11 @@ class EmbeddedBatch:
     filename: str
     batch_id: int
     page_start: int
-    original_embeddings: List
-    pooled_by_rows: Optional[List]
-    pooled_by_columns: Optional[List]
+    # Per-page float32 [tokens, dim] arrays; converted only when points are built
+    original_embeddings: List[np.ndarray]
+    pooled_by_rows: Optional[List[np.ndarray]]
+    pooled_by_columns: Optional[List[np.ndarray]]
     image_ids: List[str]
     metadata: List[Dict[str, Any]]
+    # Points already upserted by an interrupted run (resume); nothing to write
+    already_upserted: bool = False
@@ -3,10 +3,13 @@
 import time
 from typing import Callable
 
+from utils.metrics import observe_stage, record_stage_error
+
 from .console import get_pipeline_console
 
 # Map stage names to console stage keys
 _STAGE_KEY_MAP = {
+    "Encoding": "encoding",
     "Embedding": "embedding",
     "Storage": "storage",
     "OCR": "ocr",
@@ -18,7 +21,7 @@ def log_stage_timing(stage_name: str) -> Callable:
     """Decorator to log execution time for pipeline stages with Rich output.
 
     Args:
-        stage_name: Name of the stage (Embedding, Storage, OCR, or Upsert)
+        stage_name: Name of the stage (Encoding, Embedding, Storage, OCR, or Upsert)
 
     Returns:
         Decorator function
@@ -42,8 +45,13 @@ def log_stage_timing(stage_name: str) -> Callable:
             console.stage_started(batch_id, stage_key, document_id)
 
             start_time = time.time()
-            result = func(*args, **kwargs)
+            try:
+                result = func(*args, **kwargs)
+            except Exception:
+                record_stage_error(stage_key)
+                raise
             elapsed = time.time() - start_time
+            observe_stage(stage_key, elapsed)
 
             # Log completion with Rich console
             # Handle both PageBatch (has images) and EmbeddedBatch (has image_ids)
@@ -54,6 +62,11 @@ def log_stage_timing(stage_name: str) -> Callable:
                 batch_id, stage_key, elapsed, f"{num_pages} pages", document_id
             )
 
+            # Feed the pipeline auto-tuner when one is attached to the stage
+            observer = getattr(args[0], "stage_observer", None)
+            if observer is not None:
+                observer(stage_key, elapsed, num_pages)
+
             return result
 
         return wrapper
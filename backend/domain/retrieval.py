@@ -1,6 +1,7 @@
 import asyncio
 import logging
-from typing import List, Optional
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 import config
 from api.dependencies import (
@@ -8,14 +9,100 @@ from api.dependencies import (
     get_qdrant_service,
     qdrant_init_error,
 )
-from api.models import SearchItem
+from api.models import SearchBatchResult, SearchItem
 from clients.local_storage_utils import parse_files_url, resolve_storage_path
-from domain.errors import SearchError, ServiceUnavailableError
+from clients.qdrant import RetrievalPlan, list_plans, resolve_plan
+from domain.errors import (
+    InvalidSearchRequestError,
+    SearchError,
+    ServiceUnavailableError,
+)
 from domain.region_relevance import filter_regions_by_relevance
 
 logger = logging.getLogger(__name__)
 
 
+# (query, k, plan, caller's future)
+_PendingSearch = Tuple[str, int, RetrievalPlan, asyncio.Future]
+
+
+class SearchCoalescer:
+    """Merges concurrent searches into batched ColPali/Qdrant calls.
+
+    Searches arriving within SEARCH_COALESCE_WINDOW_MS of the first pending
+    one are embedded with a single /embed/queries request and retrieved with
+    a single ``query_batch_points`` call per retrieval plan; each caller gets
+    its own results (or the batch's exception). A full batch
+    (SEARCH_COALESCE_MAX_BATCH) is dispatched without waiting for the window.
+    A window of 0 disables coalescing.
+    """
+
+    def __init__(self):
+        self._pending: List[_PendingSearch] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        # Strong references keep in-flight batches from being garbage collected
+        self._tasks: Set[asyncio.Task] = set()
+
+    async def search(
+        self, svc: Any, q: str, top_k: int, plan: RetrievalPlan
+    ) -> List[dict]:
+        window_ms = float(getattr(config, "SEARCH_COALESCE_WINDOW_MS", 5))
+        max_batch = int(getattr(config, "SEARCH_COALESCE_MAX_BATCH", 32))
+        if window_ms <= 0 or max_batch <= 1:
+            return await asyncio.to_thread(
+                svc.search_with_metadata, q, top_k, None, plan
+            )
+
+        loop = asyncio.get_running_loop()
+        future: asyncio.Future = loop.create_future()
+        self._pending.append((q, top_k, plan, future))
+        if len(self._pending) >= max_batch:
+            self._flush(svc)
+        elif self._timer is None:
+            self._timer = loop.call_later(window_ms / 1000, self._flush, svc)
+        return await future
+
+    def _flush(self, svc: Any) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        pending, self._pending = self._pending, []
+        # One Qdrant batch per plan (most traffic uses the default plan)
+        by_plan: Dict[str, List[_PendingSearch]] = {}
+        for entry in pending:
+            by_plan.setdefault(entry[2].name, []).append(entry)
+        for batch in by_plan.values():
+            task = asyncio.ensure_future(self._run(svc, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    @staticmethod
+    async def _run(svc: Any, batch: List[_PendingSearch]) -> None:
+        try:
+            results = await asyncio.to_thread(
+                svc.search_batch_with_metadata,
+                [q for q, _, _, _ in batch],
+                [top_k for _, top_k, _, _ in batch],
+                None,
+                batch[0][2],
+            )
+        except Exception as exc:
+            for _, _, _, future in batch:
+                if not future.done():
+                    future.set_exception(exc)
+            return
+
+        if len(batch) > 1:
+            logger.debug(f"Coalesced {len(batch)} concurrent searches")
+        for (_, _, _, future), result in zip(batch, results):
+            # The caller may have gone away (client disconnect)
+            if not future.done():
+                future.set_result(result["items"])
+
+
+_search_coalescer = SearchCoalescer()
+
+
 async def _filter_regions_by_interpretability(
     regions: List,
     query: str,
@@ -125,35 +212,124 @@ async def _filter_regions_by_interpretability(
     return filtered_regions
 
 
-async def search_documents(
-    q: str,
-    top_k: int,
-    include_ocr: bool,
-) -> List[SearchItem]:
+async def _to_search_items(
+    items: List[dict], q: str, include_ocr: bool
+) -> Tuple[List[SearchItem], int, int]:
+    """Build response items, applying region filtering to OCR data if enabled.
+
+    Returns:
+        (search items, OCR fetch attempts, OCR successes)
     """
-    Search for documents using Qdrant and optionally include OCR data from payloads.
+    results: List[SearchItem] = []
 
-    OCR data (text, markdown, regions) is stored directly in Qdrant payloads,
-    eliminating the need for secondary database queries.
+    ocr_fetch_count = 0
+    ocr_success_count = 0
+
+    for it in items:
+        payload = it.get("payload", {})
+        label = it["label"]
+        image_url = payload.get("image_url")
+
+        if include_ocr:
+            # OCR data is stored inline in Qdrant payload
+            ocr_data = payload.get("ocr")
+
+            if ocr_data:
+                ocr_fetch_count += 1
+
+                # Check if region-level retrieval is enabled
+                enable_region_filtering = getattr(
+                    config, "ENABLE_REGION_LEVEL_RETRIEVAL", False
+                )
+
+                if enable_region_filtering and ocr_data.get("regions"):
+                    # Apply interpretability-based region filtering
+                    try:
+                        filtered_regions = await _filter_regions_by_interpretability(
+                            regions=ocr_data["regions"],
+                            query=q,
+                            image_url=image_url,
+                            payload=payload,
+                        )
+                        # Update payload with filtered regions
+                        payload["ocr"] = {
+                            "text": ocr_data.get("text", ""),
+                            "markdown": ocr_data.get("markdown", ""),
+                            "regions": filtered_regions,
+                        }
+                    except Exception as e:
+                        logger.warning(
+                            f"Region filtering failed for page {payload.get('page_id')}: {e}"
+                        )
+                        # Keep original OCR data if filtering fails
+
+                ocr_success_count += 1
+
+        results.append(
+            SearchItem(
+                image_url=image_url,
+                label=label,
+                payload=payload,
+                score=it.get("score"),
+            )
+        )
+
+    return results, ocr_fetch_count, ocr_success_count
+
+
+def get_retrieval_plan(name: Optional[str] = None) -> RetrievalPlan:
+    """Resolve a retrieval plan by name (RETRIEVAL_PLAN when None).
+
+    Raises:
+        InvalidSearchRequestError: If the plan is unknown or unusable with
+            the current collection layout
     """
+    try:
+        return resolve_plan(name)
+    except ValueError as exc:
+        raise InvalidSearchRequestError(str(exc)) from exc
+
+
+def get_retrieval_plans() -> List[Dict[str, Any]]:
+    """Plans usable with the current collection, with their stages."""
+    return [plan.describe() for plan in list_plans()]
+
+
+def _require_qdrant_service(operation: str):
     svc = get_qdrant_service()
     if not svc:
         error_msg = qdrant_init_error.get() or "Dependency services are down"
         logger.error(
             "Qdrant service unavailable",
             extra={
-                "operation": "search",
+                "operation": operation,
                 "error": error_msg,
             },
         )
         raise ServiceUnavailableError(f"Service unavailable: {error_msg}")
+    return svc
+
+
+async def search_documents(
+    q: str,
+    top_k: int,
+    include_ocr: bool,
+    plan: Optional[RetrievalPlan] = None,
+) -> List[SearchItem]:
+    """
+    Search for documents using Qdrant and optionally include OCR data from payloads.
+
+    OCR data (text, markdown, regions) is stored directly in Qdrant payloads,
+    eliminating the need for secondary database queries. ``plan`` selects the
+    retrieval plan (RETRIEVAL_PLAN when None).
+    """
+    svc = _require_qdrant_service("search")
+    plan = plan or get_retrieval_plan()
 
     try:
         # Use simple timing to avoid blocking event loop with PerformanceTimer
-        import time
-
         start_time = time.perf_counter()
-        items = await asyncio.to_thread(svc.search_with_metadata, q, top_k)
+        items = await _search_coalescer.search(svc, q, top_k, plan)
         duration_ms = (time.perf_counter() - start_time) * 1000
 
         logger.info(
@@ -162,64 +338,13 @@ async def search_documents(
                 "operation": "search",
                 "result_count": len(items),
                 "duration_ms": duration_ms,
+                "retrieval_plan": plan.name,
             },
         )
 
-        results: List[SearchItem] = []
-
-        ocr_fetch_count = 0
-        ocr_success_count = 0
-
-        for it in items:
-            payload = it.get("payload", {})
-            label = it["label"]
-            image_url = payload.get("image_url")
-
-            if include_ocr:
-                # OCR data is stored inline in Qdrant payload
-                ocr_data = payload.get("ocr")
-
-                if ocr_data:
-                    ocr_fetch_count += 1
-
-                    # Check if region-level retrieval is enabled
-                    enable_region_filtering = getattr(
-                        config, "ENABLE_REGION_LEVEL_RETRIEVAL", False
-                    )
-
-                    if enable_region_filtering and ocr_data.get("regions"):
-                        # Apply interpretability-based region filtering
-                        try:
-                            filtered_regions = (
-                                await _filter_regions_by_interpretability(
-                                    regions=ocr_data["regions"],
-                                    query=q,
-                                    image_url=image_url,
-                                    payload=payload,
-                                )
-                            )
-                            # Update payload with filtered regions
-                            payload["ocr"] = {
-                                "text": ocr_data.get("text", ""),
-                                "markdown": ocr_data.get("markdown", ""),
-                                "regions": filtered_regions,
-                            }
-                        except Exception as e:
-                            logger.warning(
-                                f"Region filtering failed for page {payload.get('page_id')}: {e}"
-                            )
-                            # Keep original OCR data if filtering fails
-
-                    ocr_success_count += 1
-
-            results.append(
-                SearchItem(
-                    image_url=image_url,
-                    label=label,
-                    payload=payload,
-                    score=it.get("score"),
-                )
-            )
+        results, ocr_fetch_count, ocr_success_count = await _to_search_items(
+            items, q, include_ocr
+        )
 
         logger.info(
             "Search completed successfully",
@@ -249,3 +374,72 @@ async def search_documents(
             },
         )
         raise SearchError(str(exc))
+
+
+async def search_documents_batch(
+    queries: List[str],
+    top_k: int,
+    include_ocr: bool,
+    plan: Optional[RetrievalPlan] = None,
+) -> List[SearchBatchResult]:
+    """
+    Search several queries at once.
+
+    All uncached queries are embedded in one ColPali request and retrieved
+    with one Qdrant batch query; OCR handling matches search_documents().
+    Each result carries its own timing (shared embedding/search time plus
+    its own post-processing) and the name of the retrieval plan used.
+    """
+    svc = _require_qdrant_service("search_batch")
+    plan = plan or get_retrieval_plan()
+
+    try:
+        start_time = time.perf_counter()
+        batch = await asyncio.to_thread(
+            svc.search_batch_with_metadata, queries, top_k, None, plan
+        )
+        duration_ms = (time.perf_counter() - start_time) * 1000
+
+        logger.info(
+            "Qdrant batch search completed",
+            extra={
+                "operation": "search_batch",
+                "query_count": len(queries),
+                "cached_count": sum(1 for entry in batch if entry["cached"]),
+                "duration_ms": duration_ms,
+                "retrieval_plan": plan.name,
+            },
+        )
+
+        results: List[SearchBatchResult] = []
+        for q, entry in zip(queries, batch):
+            post_start = time.perf_counter()
+            items, _, _ = await _to_search_items(entry["items"], q, include_ocr)
+            post_ms = (time.perf_counter() - post_start) * 1000
+            results.append(
+                SearchBatchResult(
+                    query=q,
+                    results=items,
+                    cached=entry["cached"],
+                    plan=plan.name,
+                    embedding_ms=round(entry["embedding_ms"], 2),
+                    search_ms=round(entry["search_ms"], 2),
+                    duration_ms=round(entry["duration_ms"] + post_ms, 2),
+                )
+            )
+        return results
+
+    except (ServiceUnavailableError, SearchError):
+        raise
+    except Exception as exc:
+        logger.error(
+            "Batch search failed",
+            exc_info=exc,
+            extra={
+                "operation": "search_batch",
+                "query_count": len(queries),
+                "top_k": top_k,
+                "include_ocr": include_ocr,
+            },
+        )
+        raise SearchError(str(exc))
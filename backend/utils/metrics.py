@@ -0,0 +1,176 @@
+"""Prometheus metrics for the backend.
+
+Metric objects live here so that domain code can record observations
+without depending on the API layer; ``api/routers/metrics.py`` exposes them
+at ``/metrics``. Queue depths and throughput are read from the running
+pipelines (and search cache statistics from the cache) at scrape time by
+custom collectors, so nothing has to poll.
+"""
+
+import threading
+import time
+import weakref
+from typing import Any
+
+from prometheus_client import REGISTRY, Counter, Histogram
+from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily
+
+# Stage latencies span ~10ms (storage of small pages) to minutes (CPU OCR)
+_STAGE_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120, 300)
+
+STAGE_DURATION = Histogram(
+    "snappy_pipeline_stage_duration_seconds",
+    "Time spent by a pipeline stage on one batch",
+    ["stage"],
+    buckets=_STAGE_BUCKETS,
+)
+STAGE_ERRORS = Counter(
+    "snappy_pipeline_stage_errors_total",
+    "Batches that failed in a pipeline stage",
+    ["stage"],
+)
+SEMAPHORE_WAIT = Histogram(
+    "snappy_pipeline_semaphore_wait_seconds",
+    "Time the rasterizer waited for an in-flight batch slot",
+    buckets=(0.001, 0.01, 0.05, 0.1, 0.5, 1, 2.5, 5, 10, 30, 60),
+)
+PAGES_COMPLETED = Counter(
+    "snappy_pipeline_pages_completed_total",
+    "Pages that finished every pipeline stage",
+)
+
+
+def observe_stage(stage: str, seconds: float) -> None:
+    STAGE_DURATION.labels(stage=stage).observe(seconds)
+
+
+def record_stage_error(stage: str) -> None:
+    STAGE_ERRORS.labels(stage=stage).inc()
+
+
+def observe_semaphore_wait(seconds: float) -> None:
+    SEMAPHORE_WAIT.observe(seconds)
+
+
+def record_pages_completed(num_pages: int) -> None:
+    PAGES_COMPLETED.inc(num_pages)
+
+
+class _PipelineCollector:
+    """Reports queue depths and throughput of the running pipelines."""
+
+    def __init__(self):
+        self._pipelines: "weakref.WeakSet[Any]" = weakref.WeakSet()
+        self._lock = threading.Lock()
+
+    def register(self, pipeline: Any) -> None:
+        with self._lock:
+            self._pipelines.add(pipeline)
+
+    def unregister(self, pipeline: Any) -> None:
+        with self._lock:
+            self._pipelines.discard(pipeline)
+
+    def collect(self):
+        depth = GaugeMetricFamily(
+            "snappy_pipeline_queue_depth",
+            "Batches waiting in a pipeline stage queue",
+            labels=["queue"],
+        )
+        throughput = GaugeMetricFamily(
+            "snappy_pipeline_pages_per_second",
+            "Average page throughput of the running ingestion jobs",
+        )
+        active = GaugeMetricFamily(
+            "snappy_pipeline_active_jobs",
+            "Ingestion pipelines currently running",
+        )
+
+        with self._lock:
+            pipelines = list(self._pipelines)
+
+        depths = {}
+        pages_per_second = 0.0
+        for pipeline in pipelines:
+            for name, stage_queue in pipeline.stage_queues().items():
+                depths[name] = depths.get(name, 0) + stage_queue.qsize()
+            tracker = pipeline.completion_tracker
+            started = getattr(pipeline, "_start_time", None)
+            if tracker is not None and started:
+                elapsed = time.time() - started
+                if elapsed > 0:
+                    pages_per_second += tracker.completed_pages / elapsed
+
+        for name, value in sorted(depths.items()):
+            depth.add_metric([name], value)
+        throughput.add_metric([], pages_per_second)
+        active.add_metric([], len(pipelines))
+
+        yield depth
+        yield throughput
+        yield active
+
+
+_collector = _PipelineCollector()
+REGISTRY.register(_collector)
+
+
+def register_pipeline(pipeline: Any) -> None:
+    """Include a running pipeline in queue depth / throughput metrics."""
+    _collector.register(pipeline)
+
+
+def unregister_pipeline(pipeline: Any) -> None:
+    _collector.unregister(pipeline)
+
+
+class _SearchCacheCollector:
+    """Reports size and hit statistics of the search result cache."""
+
+    def __init__(self):
+        self.cache: Any = None
+
+    def collect(self):
+        if self.cache is None:
+            return
+        stats = self.cache.stats()
+
+        lookups = CounterMetricFamily(
+            "snappy_search_cache_lookups",
+            "Search cache lookups by result",
+            labels=["result"],
+        )
+        lookups.add_metric(["hit"], stats["hits"])
+        lookups.add_metric(["miss"], stats["misses"])
+        evictions = CounterMetricFamily(
+            "snappy_search_cache_evictions",
+            "Search cache entries evicted to respect the size limits",
+        )
+        evictions.add_metric([], stats["evictions"])
+
+        yield lookups
+        yield evictions
+        yield GaugeMetricFamily(
+            "snappy_search_cache_hit_ratio",
+            "Fraction of search cache lookups served from the cache",
+            value=stats["hit_rate"],
+        )
+        yield GaugeMetricFamily(
+            "snappy_search_cache_entries",
+            "Searches currently cached",
+            value=stats["entries"],
+        )
+        yield GaugeMetricFamily(
+            "snappy_search_cache_bytes",
+            "Estimated memory used by cached search results",
+            value=stats["bytes"],
+        )
+
+
+_search_cache_collector = _SearchCacheCollector()
+REGISTRY.register(_search_cache_collector)
+
+
+def register_search_cache(cache: Any) -> None:
+    """Expose a search cache's ``stats()`` as metrics."""
+    _search_cache_collector.cache = cache
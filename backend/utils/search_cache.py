@@ -0,0 +1,183 @@
+"""In-process cache of search results.
+
+Entries are keyed by the normalized query, ``k``, the payload filter and the
+settings that change what a search returns, and remember the version of the
+collection they were computed against. Everything that writes to a
+collection (upserts, OCR payload updates, deletes) calls
+:func:`bump_collection_version`, so an entry from before the write is never
+served again. A TTL bounds staleness from writes this process cannot see
+(other backend replicas, direct Qdrant edits).
+"""
+
+import copy
+import json
+import sys
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+import config
+from utils.metrics import register_search_cache
+
+# (collection, normalized query, k, filter JSON, search settings)
+CacheKey = Tuple[str, str, int, str, Tuple[Any, ...]]
+
+_versions: Dict[str, int] = {}
+_versions_lock = threading.Lock()
+
+
+def collection_version(collection_name: str) -> int:
+    """Current write version of a collection."""
+    with _versions_lock:
+        return _versions.get(collection_name, 0)
+
+
+def bump_collection_version(collection_name: str) -> None:
+    """Invalidate cached searches of a collection after a write."""
+    with _versions_lock:
+        _versions[collection_name] = _versions.get(collection_name, 0) + 1
+
+
+def normalize_query(query: str) -> str:
+    """Canonical form of a query for cache keys.
+
+    Unicode is NFC-normalized and runs of whitespace are collapsed; case is
+    kept because the embedding model's tokenizer is case-sensitive.
+    """
+    return " ".join(unicodedata.normalize("NFC", query).split())
+
+
+def _estimate_bytes(value: Any) -> int:
+    """Rough deep size of JSON-like search results."""
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(_estimate_bytes(k) + _estimate_bytes(v) for k, v in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(_estimate_bytes(item) for item in value)
+    return size
+
+
+class _Entry:
+    __slots__ = ("items", "version", "expires_at", "size")
+
+    def __init__(self, items: List[dict], version: int, expires_at: float, size: int):
+        self.items = items
+        self.version = version
+        self.expires_at = expires_at
+        self.size = size
+
+
+class SearchCache:
+    """Thread-safe LRU cache with TTL and collection-version invalidation.
+
+    Limits are read from config on every call (``SEARCH_CACHE_ENABLED``,
+    ``SEARCH_CACHE_MAX_ENTRIES``, ``SEARCH_CACHE_MAX_MB``,
+    ``SEARCH_CACHE_TTL_SECONDS``), so runtime config updates apply
+    immediately. Results are copied in and out because callers mutate
+    payloads (e.g. region filtering rewrites ``payload["ocr"]``).
+    """
+
+    def __init__(self):
+        self._entries: "OrderedDict[CacheKey, _Entry]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @staticmethod
+    def enabled() -> bool:
+        return bool(getattr(config, "SEARCH_CACHE_ENABLED", True))
+
+    @staticmethod
+    def make_key(
+        collection_name: str,
+        query: str,
+        k: int,
+        payload_filter: Optional[dict] = None,
+        settings: Tuple[Any, ...] = (),
+    ) -> CacheKey:
+        filter_key = (
+            json.dumps(payload_filter, sort_keys=True, default=str)
+            if payload_filter
+            else ""
+        )
+        return (collection_name, normalize_query(query), int(k), filter_key, settings)
+
+    def get(self, key: CacheKey) -> Optional[List[dict]]:
+        """Cached results for ``key``, or None on a miss or stale entry."""
+        if not self.enabled():
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (
+                entry.version != collection_version(key[0])
+                or entry.expires_at <= time.monotonic()
+            ):
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            items = entry.items
+        return copy.deepcopy(items)
+
+    def put(self, key: CacheKey, items: List[dict], version: int) -> None:
+        """Store results computed against collection ``version``.
+
+        Callers read the version *before* searching, so results that raced
+        with a write are tagged with the older version and never served.
+        """
+        if not self.enabled():
+            return
+        max_entries = int(getattr(config, "SEARCH_CACHE_MAX_ENTRIES", 1024))
+        max_bytes = int(float(getattr(config, "SEARCH_CACHE_MAX_MB", 64)) * 1024**2)
+        ttl_s = float(getattr(config, "SEARCH_CACHE_TTL_SECONDS", 300))
+        if max_entries <= 0 or ttl_s <= 0 or version != collection_version(key[0]):
+            return
+
+        stored = copy.deepcopy(items)
+        size = _estimate_bytes(stored)
+        if size > max_bytes:
+            return
+        entry = _Entry(stored, version, time.monotonic() + ttl_s, size)
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = entry
+            self._bytes += size
+            while self._entries and (
+                len(self._entries) > max_entries or self._bytes > max_bytes
+            ):
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _remove(self, key: CacheKey) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+
+# Global search result cache
+search_cache = SearchCache()
+register_search_cache(search_cache)
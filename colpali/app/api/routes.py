@@ -1,12 +1,11 @@
 """API route handlers for ColPali service."""
 
 import asyncio
-import inspect
 import logging
 import os
 import threading
-from concurrent.futures import ThreadPoolExecutor
-from typing import Any, List, Optional
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
 
 from app.core.config import settings
 from app.models.schemas import (
@@ -18,10 +17,29 @@ from app.models.schemas import (
     QueryEmbeddingResponse,
     QueryRequest,
 )
+from app.services.batching import MicroBatcher
 from app.services.embedding_processor import embedding_processor
 from app.services.model_service import model_service
+from app.services.patch_grid import get_patch_grid, try_get_patch_grid
+from app.services.scheduler import (
+    IMAGE_LANE,
+    INTERPRET_LANE,
+    QUERY_LANE,
+    scheduler,
+)
+from app.utils import wire_format
 from app.utils.image_processing import load_image_from_bytes
-from fastapi import APIRouter, Body, File, Form, HTTPException, UploadFile
+from fastapi import (
+    APIRouter,
+    Body,
+    File,
+    Form,
+    Header,
+    HTTPException,
+    Query,
+    Response,
+    UploadFile,
+)
 from PIL import Image
 
 logger = logging.getLogger(__name__)
@@ -29,25 +47,61 @@ logger = logging.getLogger(__name__)
 # Create router
 router = APIRouter()
 
-# Thread pool executors for CPU-bound operations
-_query_executor: Optional[ThreadPoolExecutor] = None
-_image_executor: Optional[ThreadPoolExecutor] = None
+# Model work runs on the priority scheduler's MODEL_WORKERS workers (one
+# unless CPU multiprocessing is enabled): queries first, then
+# interpretability, then bulk image embedding
+
+
+def get_query_executor() -> Executor:
+    """Get the executor for query embedding (highest priority)."""
+    return scheduler.executor(QUERY_LANE)
+
+
+def get_interpret_executor() -> Executor:
+    """Get the executor for interpretability maps."""
+    return scheduler.executor(INTERPRET_LANE)
 
 
-def get_query_executor() -> ThreadPoolExecutor:
-    """Get or create the query executor."""
-    global _query_executor
-    if _query_executor is None:
-        _query_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="query")
-    return _query_executor
+def get_image_executor() -> Executor:
+    """Get the executor for image embedding (lowest priority)."""
+    return scheduler.executor(IMAGE_LANE)
 
 
-def get_image_executor() -> ThreadPoolExecutor:
-    """Get or create the image executor."""
-    global _image_executor
-    if _image_executor is None:
-        _image_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="embed")
-    return _image_executor
+# Uploaded pages are decoded here (PIL releases the GIL while decoding)
+_decode_executor = ThreadPoolExecutor(
+    max_workers=settings.IMAGE_DECODE_WORKERS, thread_name_prefix="image-decode"
+)
+
+
+def _decode_page(image_bytes: bytes, max_edge: Optional[int]) -> Image.Image:
+    """Decode an uploaded page, keeping a reduced decode only if it is safe.
+
+    The processor's aspect-preserving resize rounds differently for the
+    reduced and the full-size page, which can move a tile boundary; the
+    reduced page is only used when both give the same patch grid.
+    """
+    image = load_image_from_bytes(image_bytes, max_edge)
+    original_size = image.info.get("original_size")
+    if original_size and try_get_patch_grid(*image.size) != try_get_patch_grid(
+        *original_size
+    ):
+        logger.debug(
+            f"Reduced decode changes the patch grid of a {original_size} page; "
+            "decoding at full size"
+        )
+        image.close()
+        return load_image_from_bytes(image_bytes)
+    return image
+
+
+_query_batcher = MicroBatcher(
+    "query",
+    embedding_processor.embed_query_groups,
+    get_query_executor,
+    max_wait_ms=settings.QUERY_BATCH_WINDOW_MS,
+    max_batch_items=settings.QUERY_BATCH_MAX_SIZE,
+    max_batch_tokens=settings.QUERY_BATCH_MAX_TOKENS,
+)
 
 
 @router.get("/")
@@ -62,6 +116,15 @@ async def health_check():
     return {"status": "healthy", "device": str(model_service.model.device)}
 
 
+@router.get("/queues")
+async def queue_status():
+    """Pending model work per scheduler lane."""
+    stats = scheduler.stats()
+    # Queries waiting to join a micro-batch are not on the scheduler yet
+    stats["query_batcher"] = _query_batcher.queue_depth()
+    return stats
+
+
 @router.post("/restart")
 async def restart_service():
     """Restart the service by exiting the process.
@@ -109,48 +172,14 @@ async def get_n_patches(
     """
     try:
         # get_n_patches is now mandatory for the model
-        get_n_patches_fn = model_service.processor.get_n_patches
-        call_kwargs: dict[str, Any] = {}
-
-        # Inspect signature to gather required parameters
-        try:
-            signature = inspect.signature(get_n_patches_fn)
-
-            for name, param in signature.parameters.items():
-                # Skip image_size (provided directly) and variadic parameters (*args, **kwargs)
-                if name == "image_size" or param.kind in (
-                    inspect.Parameter.VAR_POSITIONAL,
-                    inspect.Parameter.VAR_KEYWORD,
-                ):
-                    continue
-
-                value: Any = None
-                if name in {"patch_size", "spatial_merge_size"}:
-                    value = getattr(model_service.model, "spatial_merge_size", None)
-                elif hasattr(model_service.processor, name):
-                    value = getattr(model_service.processor, name)
-                elif hasattr(model_service.model, name):
-                    value = getattr(model_service.model, name)
-
-                if value is None:
-                    if param.default is inspect._empty:
-                        raise ValueError(
-                            f"Required parameter '{name}' is not available on the model"
-                        )
-                    continue
-
-                call_kwargs[name] = value
-        except (TypeError, ValueError) as e:
-            # If signature inspection fails, proceed without extra kwargs
-            logger.warning(f"Could not inspect get_n_patches signature: {e}")
-            call_kwargs = {}
+        if not hasattr(model_service.processor, "get_n_patches"):
+            raise AttributeError("get_n_patches")
 
         # Calculate patches for all dimensions
         results = []
         for dim in request.dimensions:
             try:
-                image_size = (dim.width, dim.height)
-                n_patches_x, n_patches_y = get_n_patches_fn(image_size, **call_kwargs)
+                n_patches_x, n_patches_y = get_patch_grid(dim.width, dim.height)
 
                 results.append(
                     PatchResult(
@@ -181,8 +210,12 @@ async def get_n_patches(
 
 
 @router.post("/embed/queries", response_model=QueryEmbeddingResponse)
-async def embed_queries(request: QueryRequest):
-    """Generate embeddings for text queries."""
+async def embed_queries(request: QueryRequest, accept: Optional[str] = Header(None)):
+    """Generate embeddings for text queries.
+
+    Clients that accept ``application/x-colpali-embeddings`` get the compact
+    binary encoding (see ``app.utils.wire_format``) instead of JSON.
+    """
     try:
         queries = (
             [request.queries] if isinstance(request.queries, str) else request.queries
@@ -190,44 +223,151 @@ async def embed_queries(request: QueryRequest):
         if not queries:
             raise HTTPException(status_code=400, detail="No queries provided")
 
-        # Run embedding generation in thread pool to avoid blocking event loop
-        embeddings_tensors = await asyncio.get_event_loop().run_in_executor(
-            get_query_executor(),
-            embedding_processor.generate_query_embeddings,
-            queries,
-        )
+        if settings.QUERY_BATCHING_ENABLED:
+            # Shares a forward pass with concurrent requests
+            embeddings_tensors = await _query_batcher.submit(
+                queries,
+                items=len(queries),
+                tokens=embedding_processor.count_query_tokens(queries),
+            )
+        else:
+            # Run embedding generation in thread pool to avoid blocking event loop
+            embeddings_tensors = await asyncio.get_event_loop().run_in_executor(
+                get_query_executor(),
+                embedding_processor.generate_query_embeddings,
+                queries,
+            )
+        dtype = wire_format.negotiate_dtype(accept)
+        if dtype is not None:
+            return Response(
+                content=wire_format.encode_embeddings(embeddings_tensors, dtype=dtype),
+                media_type=wire_format.MEDIA_TYPE,
+            )
         embeddings_list = [embedding.tolist() for embedding in embeddings_tensors]
         return QueryEmbeddingResponse(embeddings=embeddings_list)
 
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=500, detail=f"Error generating query embeddings: {str(e)}"
         )
 
 
-@router.post("/embed/images", response_model=ImageEmbeddingBatchResponse)
-async def embed_images(files: List[UploadFile] = File(...)):
-    """Generate embeddings for uploaded images + image-token boundaries."""
+POOLING_MODES = ("none", "include", "only")
+
+
+@router.post(
+    "/embed/images",
+    response_model=ImageEmbeddingBatchResponse,
+    response_model_exclude_none=True,
+)
+async def embed_images(
+    files: List[UploadFile] = File(...),
+    accept: Optional[str] = Header(None),
+    pooling: str = Query("none"),
+):
+    """Generate embeddings for uploaded images + image-token boundaries.
+
+    Clients that accept ``application/x-colpali-embeddings`` get the compact
+    binary encoding, with the token boundaries carried as per-item metadata.
+
+    ``pooling=include`` adds row/column mean-pooled variants computed on the
+    model device; ``pooling=only`` returns them instead of the full token
+    matrix, except for pages whose patch grid cannot be pooled, which keep
+    their full embedding.
+    """
     try:
         if not files:
             raise HTTPException(status_code=400, detail="No images provided")
+        if pooling not in POOLING_MODES:
+            raise HTTPException(
+                status_code=400,
+                detail=f"pooling must be one of {', '.join(POOLING_MODES)}",
+            )
+        with_pooling = pooling != "none"
+        include_embedding = pooling != "only"
 
-        images: List[Image.Image] = []
         for file in files:
             content_type = file.content_type or ""
             if not content_type.startswith("image/"):
                 raise HTTPException(
                     status_code=400, detail=f"File {file.filename} is not an image"
                 )
-            image_bytes = await file.read()
-            images.append(load_image_from_bytes(image_bytes))
-
-        # Run embedding generation in thread pool to avoid blocking event loop
-        # This allows /restart endpoint to be processed immediately during cancellation
-        items = await asyncio.get_event_loop().run_in_executor(
-            get_image_executor(),
-            embedding_processor.generate_image_embeddings_with_boundaries,
-            images,
+        payloads = [await file.read() for file in files]
+
+        loop = asyncio.get_event_loop()
+        max_edge = (
+            model_service.image_target_edge() if settings.IMAGE_DECODE_REDUCE else None
+        )
+
+        async def embed_chunk(
+            chunk: List[bytes],
+        ) -> Tuple[List[Any], List[Dict[str, Any]], List[Any]]:
+            # Decode on the decode pool, then queue the forward pass; while
+            # one chunk is on the model, the next ones are being decoded
+            images: List[Image.Image] = await asyncio.gather(
+                *(
+                    loop.run_in_executor(_decode_executor, _decode_page, data, max_edge)
+                    for data in chunk
+                )
+            )
+            return await loop.run_in_executor(
+                get_image_executor(),
+                embedding_processor.generate_image_embeddings,
+                images,
+                with_pooling,
+            )
+
+        # Run embedding generation off the event loop; this allows /restart
+        # to be processed immediately during cancellation. Chunks are
+        # scheduled separately so queries can run between them.
+        chunk_size = max(1, settings.IMAGE_SCHEDULER_CHUNK_SIZE)
+        chunk_results: List[Tuple[List[Any], List[Dict[str, Any]], List[Any]]] = (
+            await asyncio.gather(
+                *(
+                    embed_chunk(payloads[start : start + chunk_size])
+                    for start in range(0, len(payloads), chunk_size)
+                )
+            )
+        )
+        embeddings = [emb for chunk, _, _ in chunk_results for emb in chunk]
+        boundaries = [meta for _, chunk, _ in chunk_results for meta in chunk]
+        pooled = [item for _, _, chunk in chunk_results for item in chunk]
+
+        # With pooling=only, pages whose patch grid cannot be pooled still
+        # need their full embedding, or the client would get nothing for them
+        if not include_embedding:
+            embeddings = [
+                emb if pooled_item is None else None
+                for emb, pooled_item in zip(embeddings, pooled)
+            ]
+
+        # Serialization is CPU work that does not need the model worker
+        dtype = wire_format.negotiate_dtype(accept)
+        if dtype is not None:
+            extras = None
+            if with_pooling:
+                extras = {
+                    "pooled_by_rows": [p[0] if p else None for p in pooled],
+                    "pooled_by_columns": [p[1] if p else None for p in pooled],
+                }
+            content = await loop.run_in_executor(
+                None,
+                wire_format.encode_embeddings,
+                embeddings,
+                boundaries,
+                dtype,
+                extras,
+            )
+            return Response(content=content, media_type=wire_format.MEDIA_TYPE)
+
+        items = await loop.run_in_executor(
+            None,
+            embedding_processor.build_image_items,
+            embeddings,
+            boundaries,
+            pooled if with_pooling else None,
         )
         return ImageEmbeddingBatchResponse(embeddings=items)
 
@@ -269,7 +409,7 @@ async def generate_interpretability_maps(
 
         # Run interpretability generation in thread pool
         result = await asyncio.get_event_loop().run_in_executor(
-            get_query_executor(),
+            get_interpret_executor(),
             embedding_processor.generate_interpretability_maps,
             query,
             image,
@@ -21,6 +21,51 @@ class Settings:
         self.ENABLE_CPU_MULTIPROCESSING: bool = (
             os.getenv("ENABLE_CPU_MULTIPROCESSING", "false").lower() == "true"
         )
+        # Concurrent model workers on CPU (when ENABLE_CPU_MULTIPROCESSING);
+        # they share one copy of the weights and split CPU_THREADS
+        self.CPU_MODEL_WORKERS: int = max(1, int(os.getenv("CPU_MODEL_WORKERS", "2")))
+
+        # CPU performance mode: int8 dynamic quantization of linear layers,
+        # channels-last weights and optionally bf16 autocast
+        self.CPU_PERFORMANCE_MODE: bool = (
+            os.getenv("CPU_PERFORMANCE_MODE", "false").lower() == "true"
+        )
+        self.CPU_INT8_QUANTIZATION: bool = (
+            os.getenv("CPU_INT8_QUANTIZATION", "true").lower() == "true"
+        )
+        # Only used without int8 quantization, on CPUs with native bf16
+        self.CPU_BF16: bool = os.getenv("CPU_BF16", "false").lower() == "true"
+
+        # Query micro-batching: concurrent /embed/queries requests arriving
+        # within the window share one forward pass
+        self.QUERY_BATCHING_ENABLED: bool = (
+            os.getenv("QUERY_BATCHING_ENABLED", "true").lower() == "true"
+        )
+        self.QUERY_BATCH_WINDOW_MS: float = float(
+            os.getenv("QUERY_BATCH_WINDOW_MS", "5")
+        )
+        self.QUERY_BATCH_MAX_SIZE: int = int(os.getenv("QUERY_BATCH_MAX_SIZE", "32"))
+        self.QUERY_BATCH_MAX_TOKENS: int = int(
+            os.getenv("QUERY_BATCH_MAX_TOKENS", "4096")
+        )
+
+        # Image requests are split into chunks of this many pages so that
+        # queries can be scheduled between them
+        self.IMAGE_SCHEDULER_CHUNK_SIZE: int = int(
+            os.getenv("IMAGE_SCHEDULER_CHUNK_SIZE", "4")
+        )
+
+        # Uploaded pages are decoded on this many threads, overlapping with
+        # the forward pass of earlier chunks
+        self.IMAGE_DECODE_WORKERS: int = max(
+            1, int(os.getenv("IMAGE_DECODE_WORKERS", "4"))
+        )
+        # Decode pages at reduced resolution (JPEG draft mode, integer box
+        # reduction otherwise) when they exceed the processor's target size;
+        # pages whose patch grid would change are decoded at full size
+        self.IMAGE_DECODE_REDUCE: bool = (
+            os.getenv("IMAGE_DECODE_REDUCE", "true").lower() == "true"
+        )
 
         # Device detection
         self.device: Literal["cuda:0", "mps", "cpu"] = (
@@ -29,10 +74,19 @@ class Settings:
             else "mps" if torch.backends.mps.is_available() else "cpu"
         )
 
-        # Configure CPU threading for better performance
+        # Model workers running forward passes concurrently
+        self.MODEL_WORKERS: int = (
+            self.CPU_MODEL_WORKERS
+            if self.device == "cpu" and self.ENABLE_CPU_MULTIPROCESSING
+            else 1
+        )
+
+        # Configure CPU threading for better performance; each concurrent
+        # worker gets an equal share of CPU_THREADS
+        self.THREADS_PER_WORKER: int = max(1, self.CPU_THREADS // self.MODEL_WORKERS)
         if self.device == "cpu":
-            torch.set_num_threads(self.CPU_THREADS)
-            torch.set_num_interop_threads(self.CPU_THREADS)
+            torch.set_num_threads(self.THREADS_PER_WORKER)
+            torch.set_num_interop_threads(self.THREADS_PER_WORKER)
 
         # Torch dtype based on device
         self.TORCH_DTYPE = torch.bfloat16 if self.device != "cpu" else torch.float32
@@ -49,10 +49,16 @@ class PatchBatchResponse(BaseModel):
 class ImageEmbeddingItem(BaseModel):
     """Single image's embeddings and image-token boundaries."""
 
-    embedding: List[List[float]]  # [sequence_length, hidden_dim]
+    # [sequence_length, hidden_dim]; omitted when only pooled variants were requested
+    embedding: Optional[List[List[float]]] = None
     image_patch_start: int  # index where image tokens begin
     image_patch_len: int  # number of image tokens (should equal x_patches * y_patches)
     image_patch_indices: List[int]  # explicit positions of every image token
+    n_patches_x: Optional[int] = None  # patch grid of the image (None if unknown)
+    n_patches_y: Optional[int] = None
+    # Row/column mean-pooled variants (only when pooling was requested)
+    pooled_by_rows: Optional[List[List[float]]] = None
+    pooled_by_columns: Optional[List[List[float]]] = None
 
 
 class ImageEmbeddingBatchResponse(BaseModel):
@@ -0,0 +1,142 @@
+"""Dynamic micro-batching of concurrent embedding requests."""
+
+import asyncio
+import logging
+from concurrent.futures import Executor
+from dataclasses import dataclass
+from typing import Any, Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _PendingRequest:
+    payload: Any
+    items: int  # Sequences contributed to the forward pass
+    tokens: int  # Longest sequence of the request (sets the padded length)
+    future: asyncio.Future
+
+
+class MicroBatcher:
+    """Merges requests that arrive close together into one forward pass.
+
+    The first waiting request opens a batch; requests arriving within
+    ``max_wait_ms`` join it until the item limit or the padded token budget
+    (``items x longest sequence``) would be exceeded. The merged batch runs
+    on ``get_executor()`` and each caller receives its own slice of the
+    result. While a batch is running, new requests queue up and form the
+    next batch, so batches grow with load without adding latency when idle.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        run_batch: Callable[[List[Any]], List[Any]],
+        get_executor: Callable[[], Executor],
+        max_wait_ms: float,
+        max_batch_items: int,
+        max_batch_tokens: int,
+    ):
+        """Initialize batcher.
+
+        Args:
+            name: Label used in logs
+            run_batch: Takes the payloads of a batch and returns one result
+                per payload, in order (runs on the executor)
+            get_executor: Returns the executor that owns the model
+            max_wait_ms: How long the first request waits for company
+            max_batch_items: Maximum sequences per forward pass
+            max_batch_tokens: Maximum padded tokens per forward pass
+        """
+        self.name = name
+        self._run_batch = run_batch
+        self._get_executor = get_executor
+        self.max_wait_s = max(0.0, max_wait_ms) / 1000.0
+        self.max_batch_items = max(1, max_batch_items)
+        self.max_batch_tokens = max(1, max_batch_tokens)
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+        self._carry: Optional[_PendingRequest] = None
+
+    def queue_depth(self) -> int:
+        """Requests waiting for a batch slot."""
+        waiting = self._queue.qsize() if self._queue is not None else 0
+        return waiting + (1 if self._carry is not None else 0)
+
+    async def submit(self, payload: Any, items: int, tokens: int) -> Any:
+        """Queue a request and wait for its share of a batched forward pass."""
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+
+        future = loop.create_future()
+        assert self._queue is not None
+        self._queue.put_nowait(_PendingRequest(payload, items, tokens, future))
+        return await future
+
+    def _fits(self, batch: List[_PendingRequest], request: _PendingRequest) -> bool:
+        items = sum(pending.items for pending in batch) + request.items
+        longest = max(max(pending.tokens for pending in batch), request.tokens)
+        return items <= self.max_batch_items and items * longest <= (
+            self.max_batch_tokens
+        )
+
+    async def _collect(self) -> List[_PendingRequest]:
+        """Wait for a request, then gather companions until the window closes."""
+        assert self._queue is not None
+        if self._carry is not None:
+            first, self._carry = self._carry, None
+        else:
+            first = await self._queue.get()
+
+        loop = asyncio.get_running_loop()
+        batch = [first]
+        deadline = loop.time() + self.max_wait_s
+        while sum(pending.items for pending in batch) < self.max_batch_items:
+            remaining = deadline - loop.time()
+            try:
+                if remaining > 0:
+                    request = await asyncio.wait_for(self._queue.get(), remaining)
+                else:
+                    request = self._queue.get_nowait()
+            except (asyncio.TimeoutError, asyncio.QueueEmpty):
+                break
+            if not self._fits(batch, request):
+                # Opens the next batch instead
+                self._carry = request
+                break
+            batch.append(request)
+        return batch
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self._collect()
+            live = [pending for pending in batch if not pending.future.done()]
+            if not live:
+                continue
+
+            try:
+                results = await loop.run_in_executor(
+                    self._get_executor(),
+                    self._run_batch,
+                    [pending.payload for pending in live],
+                )
+            except Exception as exc:
+                for pending in live:
+                    if not pending.future.done():
+                        pending.future.set_exception(exc)
+                continue
+
+            if len(live) > 1:
+                logger.debug(
+                    "%s micro-batch: %d requests, %d items",
+                    self.name,
+                    len(live),
+                    sum(pending.items for pending in live),
+                )
+            for pending, result in zip(live, results):
+                if not pending.future.done():
+                    pending.future.set_result(result)
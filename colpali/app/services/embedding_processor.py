@@ -1,7 +1,7 @@
 """Embedding generation processor service."""
 
 import logging
-from typing import Any, List, cast
+from typing import Any, Dict, List, Optional, Tuple, cast
 
 import torch
 from app.models.schemas import (
@@ -10,13 +10,31 @@ from app.models.schemas import (
     TokenSimilarityMap,
 )
 from app.services.model_service import model_service
+from app.services.patch_grid import try_get_patch_grid
+from app.services.pooling import mean_pool_image_tokens
 from PIL import Image
 
 logger = logging.getLogger(__name__)
 
+# (pooled_by_rows, pooled_by_columns) of one image, or None if not pooled
+PooledEmbedding = Optional[Tuple[torch.Tensor, torch.Tensor]]
+
+
+def _token_mask(batch: Any, embeddings: torch.Tensor) -> torch.Tensor:
+    """Boolean [batch, seq] mask of real (non-padding) tokens on CPU."""
+    attention_mask = batch.get("attention_mask") if hasattr(batch, "get") else None
+    if attention_mask is None:
+        return torch.ones(embeddings.shape[:2], dtype=torch.bool)
+    return attention_mask.to("cpu").bool()
+
 
 class EmbeddingProcessor:
-    """Service for processing embeddings for queries and images."""
+    """Service for processing embeddings for queries and images.
+
+    Outputs are trimmed with the processor's attention mask: a batch is
+    padded to its longest sequence, and padding-token vectors must not be
+    stored or take part in MaxSim scoring.
+    """
 
     def generate_query_embeddings(self, queries: List[str]) -> List[torch.Tensor]:
         """Generate embeddings for text queries.
@@ -25,30 +43,70 @@ class EmbeddingProcessor:
             queries: List of query strings to embed
 
         Returns:
-            List of embedding tensors (one per query)
+            List of embedding tensors (one per query, padding removed)
+        """
+        return self.embed_query_groups([queries])[0]
+
+    def count_query_tokens(self, queries: List[str]) -> int:
+        """Return the token length of the longest query (before padding)."""
+        tokenizer = getattr(model_service.processor, "tokenizer", None)
+        if tokenizer is None:
+            return max((len(query.split()) for query in queries), default=0)
+        encoded = tokenizer(queries, add_special_tokens=True)["input_ids"]
+        return max((len(ids) for ids in encoded), default=0)
+
+    def embed_query_groups(self, groups: List[List[str]]) -> List[List[torch.Tensor]]:
+        """Embed several independent query requests in one forward pass.
+
+        Every query is trimmed to its own tokens, so each group gets exactly
+        the tensors it would have received on its own.
+
+        Args:
+            groups: Queries of each request
+
+        Returns:
+            Per-group lists of embedding tensors
         """
+        queries = [query for group in groups for query in group]
         device = model_service.model.device
-        with torch.no_grad():
+        with model_service.inference_context():
             batch_query = model_service.processor.process_queries(queries).to(device)
             query_embeddings = cast(
                 torch.Tensor, model_service.model(**batch_query)
             )  # [batch, seq, dim]
-            # Unbind into per-sample tensors on CPU
-            return list(torch.unbind(query_embeddings.to("cpu")))
-
-    def generate_image_embeddings_with_boundaries(
-        self, images: List[Image.Image]
-    ) -> List[ImageEmbeddingItem]:
-        """Generate embeddings for images and expose image-token boundaries.
+            query_embeddings = query_embeddings.to("cpu")
+            token_mask = _token_mask(batch_query, query_embeddings)
+
+        trimmed = [
+            query_embeddings[i][token_mask[i]] for i in range(len(queries))
+        ]  # [tokens_i, dim]
+        results: List[List[torch.Tensor]] = []
+        offset = 0
+        for group in groups:
+            results.append(trimmed[offset : offset + len(group)])
+            offset += len(group)
+        return results
+
+    def generate_image_embeddings(
+        self, images: List[Image.Image], pooling: bool = False
+    ) -> Tuple[List[torch.Tensor], List[Dict[str, Any]], List[PooledEmbedding]]:
+        """Generate image embeddings as tensors plus image-token boundaries.
 
         Args:
             images: List of PIL Images to embed
+            pooling: Also mean-pool image tokens by rows/columns on the model
+                device, while the batch is still resident there
 
         Returns:
-            List of ImageEmbeddingItem objects containing embeddings and token boundaries
+            Tuple of (per-image [tokens, dim] CPU tensors without padding,
+            per-image boundary dicts with ``image_patch_start``,
+            ``image_patch_len`` and ``image_patch_indices`` indexing into the
+            trimmed tensors, plus the ``n_patches_x``/``n_patches_y`` grid of
+            the image as the model saw it, or None if it cannot be computed,
+            per-image float32 CPU (rows, columns) pooled tensors or None)
         """
         device = model_service.model.device
-        with torch.no_grad():
+        with model_service.inference_context():
             # Tokenize / encode images
             batch_images = model_service.processor.process_images(images).to(device)
 
@@ -56,7 +114,7 @@ class EmbeddingProcessor:
             image_embeddings = cast(
                 torch.Tensor, model_service.model(**batch_images)
             )  # [batch, seq, dim]
-            image_embeddings = image_embeddings.to("cpu")
+            cpu_embeddings = image_embeddings.to("cpu")
 
             # Expect token ids to be present, so we can find image-token spans
             if "input_ids" not in batch_images:
@@ -65,14 +123,19 @@ class EmbeddingProcessor:
                 )
 
             input_ids = batch_images["input_ids"].to("cpu")  # [batch, seq]
+            token_mask = _token_mask(batch_images, cpu_embeddings)
             image_token_id = model_service.image_token_id
+            image_seq_len = getattr(model_service.processor, "image_seq_len", None)
 
-            batch_items: List[ImageEmbeddingItem] = []
+            embeddings: List[torch.Tensor] = []
+            boundaries: List[Dict[str, Any]] = []
+            pooled: List[PooledEmbedding] = []
             batch_size = input_ids.shape[0]
 
             for i in range(batch_size):
-                ids = input_ids[i]  # [seq]
-                emb = image_embeddings[i]  # [seq, dim]
+                # Drop padding first so boundaries index the trimmed sequence
+                keep = token_mask[i]
+                ids = input_ids[i][keep]  # [tokens]
 
                 mask = ids.eq(image_token_id)  # bool mask for image tokens
                 indices = torch.nonzero(mask, as_tuple=True)[
@@ -88,16 +151,72 @@ class EmbeddingProcessor:
                     start = int(indices_list[0])
                     length = len(indices_list)
 
-                batch_items.append(
-                    ImageEmbeddingItem(
-                        embedding=emb.tolist(),
-                        image_patch_start=start,
-                        image_patch_len=length,
-                        image_patch_indices=[int(idx) for idx in indices_list],
+                grid = try_get_patch_grid(*images[i].size)
+
+                pooled_item: PooledEmbedding = None
+                if pooling and grid:
+                    device_embedding = image_embeddings[i][keep.to(device)]
+                    pooled_item = mean_pool_image_tokens(
+                        device_embedding, indices_list, grid[0], grid[1], image_seq_len
                     )
+                    if pooled_item is not None:
+                        pooled_item = (
+                            pooled_item[0].to("cpu"),
+                            pooled_item[1].to("cpu"),
+                        )
+                pooled.append(pooled_item)
+
+                embeddings.append(cpu_embeddings[i][keep])  # [tokens, dim]
+                boundaries.append(
+                    {
+                        "image_patch_start": start,
+                        "image_patch_len": length,
+                        "image_patch_indices": [int(idx) for idx in indices_list],
+                        "n_patches_x": grid[0] if grid else None,
+                        "n_patches_y": grid[1] if grid else None,
+                    }
                 )
 
-            return batch_items
+            return embeddings, boundaries, pooled
+
+    def generate_image_embeddings_with_boundaries(
+        self, images: List[Image.Image]
+    ) -> List[ImageEmbeddingItem]:
+        """Generate embeddings for images and expose image-token boundaries.
+
+        Args:
+            images: List of PIL Images to embed
+
+        Returns:
+            List of ImageEmbeddingItem objects containing embeddings and token boundaries
+        """
+        embeddings, boundaries, _ = self.generate_image_embeddings(images)
+        return self.build_image_items(embeddings, boundaries)
+
+    @staticmethod
+    def build_image_items(
+        embeddings: List[Optional[torch.Tensor]],
+        boundaries: List[Dict[str, Any]],
+        pooled: Optional[List[PooledEmbedding]] = None,
+    ) -> List[ImageEmbeddingItem]:
+        """Convert embeddings, boundaries and pooled variants to response items.
+
+        An embedding of None is left out of its item (pooled-only responses).
+        """
+        items: List[ImageEmbeddingItem] = []
+        for idx, (emb, boundary) in enumerate(zip(embeddings, boundaries)):
+            pooled_item = pooled[idx] if pooled else None
+            items.append(
+                ImageEmbeddingItem(
+                    embedding=emb.tolist() if emb is not None else None,
+                    pooled_by_rows=pooled_item[0].tolist() if pooled_item else None,
+                    pooled_by_columns=(
+                        pooled_item[1].tolist() if pooled_item else None
+                    ),
+                    **boundary,
+                )
+            )
+        return items
 
     def generate_interpretability_maps(
         self, query: str, image: Image.Image
@@ -113,7 +232,7 @@ class EmbeddingProcessor:
         """
         device = model_service.model.device
 
-        with torch.no_grad():
+        with model_service.inference_context():
             # Process query and image
             batch_query = model_service.processor.process_queries([query]).to(device)
             batch_images = model_service.processor.process_images([image]).to(device)
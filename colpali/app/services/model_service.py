@@ -1,9 +1,14 @@
 """Model loading and management service."""
 
 import logging
-from typing import Any, Tuple, Union, cast
+from typing import Any, ContextManager, Optional, Tuple, Union, cast
 
 from app.core.config import settings
+from app.services.cpu_optimizations import (
+    apply_cpu_optimizations,
+    cpu_supports_bf16,
+    inference_context,
+)
 from colpali_engine.models import ColModernVBert, ColModernVBertProcessor
 from transformers.utils.import_utils import is_flash_attn_2_available
 
@@ -18,6 +23,7 @@ class ModelService:
         self.model: Any = None
         self.processor: Any = None
         self.image_token_id: int = 0
+        self.bf16_autocast: bool = False
 
     def load_model(self):
         """Load the ColModernVBert model and processor."""
@@ -39,6 +45,9 @@ class ModelService:
             ).eval(),
         )
 
+        if settings.device == "cpu" and settings.CPU_PERFORMANCE_MODE:
+            self._apply_cpu_performance_mode()
+
         # Load processor
         _processor_loaded: Union[
             ColModernVBertProcessor, Tuple[ColModernVBertProcessor, dict[str, Any]]
@@ -63,7 +72,45 @@ class ModelService:
 
         # Log CPU threading configuration if applicable
         if settings.device == "cpu":
-            logger.info(f"CPU mode: Set torch threads to {settings.CPU_THREADS}")
+            logger.info(
+                f"CPU mode: Set torch threads to {settings.THREADS_PER_WORKER} "
+                f"per model worker ({settings.MODEL_WORKERS} workers)"
+            )
+
+    def _apply_cpu_performance_mode(self) -> None:
+        """Prepare the fp32 CPU model for faster inference."""
+        quantize = settings.CPU_INT8_QUANTIZATION
+        self.model = apply_cpu_optimizations(self.model, quantize_int8=quantize)
+        if settings.CPU_BF16 and not quantize:
+            # Dynamically quantized layers expect fp32 activations
+            self.bf16_autocast = cpu_supports_bf16()
+            if not self.bf16_autocast:
+                logger.info("CPU_BF16 requested but the CPU lacks native bf16")
+        logger.info(
+            f"CPU performance mode: int8={quantize}, bf16={self.bf16_autocast}, "
+            f"model workers={settings.MODEL_WORKERS}"
+        )
+
+    def inference_context(self) -> ContextManager:
+        """Context for forward passes (inference mode, bf16 autocast if enabled)."""
+        return inference_context(self.bf16_autocast)
+
+    def image_target_edge(self) -> Optional[int]:
+        """Longest image edge the processor resizes pages to, if known."""
+        image_processor = getattr(self.processor, "image_processor", None)
+        size = getattr(image_processor, "size", None)
+        if size is None:
+            return None
+        # Plain dict on slow image processors, SizeDict on fast ones
+        if not isinstance(size, dict):
+            size = {
+                key: getattr(size, key, None)
+                for key in ("longest_edge", "height", "width")
+            }
+        edge = size.get("longest_edge") or max(
+            size.get("height") or 0, size.get("width") or 0
+        )
+        return int(edge) if edge else None
 
     def _resolve_image_token_id(self) -> int:
         """Best-effort resolution of the image token id for the current processor."""
@@ -93,6 +140,9 @@ class ModelService:
             "dim": getattr(self.model, "dim", None),
             "image_token_id": self.image_token_id,
             "image_seq_len": image_seq_len,
+            "cpu_performance_mode": settings.device == "cpu"
+            and settings.CPU_PERFORMANCE_MODE,
+            "model_workers": settings.MODEL_WORKERS,
         }
 
 
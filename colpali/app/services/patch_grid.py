@@ -0,0 +1,77 @@
+"""Memoized patch-grid computation for the loaded model."""
+
+import inspect
+import logging
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+from app.services.model_service import model_service
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache(maxsize=1)
+def _get_n_patches_kwargs() -> Dict[str, Any]:
+    """Extra arguments ``processor.get_n_patches`` needs from the model.
+
+    The signature only depends on the loaded model, so it is inspected once.
+    """
+    get_n_patches_fn = model_service.processor.get_n_patches
+    call_kwargs: Dict[str, Any] = {}
+
+    try:
+        signature = inspect.signature(get_n_patches_fn)
+
+        for name, param in signature.parameters.items():
+            # Skip image_size (provided directly) and variadic parameters (*args, **kwargs)
+            if name == "image_size" or param.kind in (
+                inspect.Parameter.VAR_POSITIONAL,
+                inspect.Parameter.VAR_KEYWORD,
+            ):
+                continue
+
+            value: Any = None
+            if name in {"patch_size", "spatial_merge_size"}:
+                value = getattr(model_service.model, "spatial_merge_size", None)
+            elif hasattr(model_service.processor, name):
+                value = getattr(model_service.processor, name)
+            elif hasattr(model_service.model, name):
+                value = getattr(model_service.model, name)
+
+            if value is None:
+                if param.default is inspect._empty:
+                    raise ValueError(
+                        f"Required parameter '{name}' is not available on the model"
+                    )
+                continue
+
+            call_kwargs[name] = value
+    except (TypeError, ValueError) as e:
+        # If signature inspection fails, proceed without extra kwargs
+        logger.warning(f"Could not inspect get_n_patches signature: {e}")
+        call_kwargs = {}
+
+    return call_kwargs
+
+
+@lru_cache(maxsize=4096)
+def get_patch_grid(width: int, height: int) -> Tuple[int, int]:
+    """Return ``(n_patches_x, n_patches_y)`` for an image size.
+
+    Raises:
+        AttributeError: If the processor has no ``get_n_patches``
+    """
+    get_n_patches_fn = model_service.processor.get_n_patches
+    n_patches_x, n_patches_y = get_n_patches_fn(
+        (width, height), **_get_n_patches_kwargs()
+    )
+    return int(n_patches_x), int(n_patches_y)
+
+
+def try_get_patch_grid(width: int, height: int) -> Optional[Tuple[int, int]]:
+    """Like :func:`get_patch_grid`, but None when it cannot be computed."""
+    try:
+        return get_patch_grid(width, height)
+    except Exception as e:
+        logger.debug(f"Patch grid unavailable for {width}x{height}: {e}")
+        return None
@@ -0,0 +1,78 @@
+"""Row/column mean pooling of image-token embeddings on the model device.
+
+Mirrors the backend's ``EmbeddingProcessor.pool_single_image``
+(``clients/qdrant/embedding.py``) so either side can produce the
+``mean_pooling_rows``/``mean_pooling_columns`` vectors: the local patch
+tokens are reshaped to the ``[n_patches_x, n_patches_y]`` grid and averaged
+along each axis, the pooled block replaces the first image token, and all
+other tokens (text, global patch) are kept in order.
+"""
+
+import logging
+from typing import List, Optional, Tuple
+
+import torch
+
+logger = logging.getLogger(__name__)
+
+# Global patch length for Idefics3-style processors that do not expose it
+DEFAULT_IMAGE_SEQ_LEN = 64
+
+
+def mean_pool_image_tokens(
+    embedding: torch.Tensor,
+    patch_indices: List[int],
+    n_patches_x: int,
+    n_patches_y: int,
+    image_seq_len: Optional[int] = None,
+) -> Optional[Tuple[torch.Tensor, torch.Tensor]]:
+    """Pool one image's tokens by rows and columns.
+
+    Args:
+        embedding: [tokens, dim] embedding (any device/dtype)
+        patch_indices: Positions of every image token in ``embedding``
+        n_patches_x: Local patch grid width
+        n_patches_y: Local patch grid height
+        image_seq_len: Tokens of the trailing global patch, if any
+
+    Returns:
+        (pooled_by_rows, pooled_by_columns) float32 tensors on the input's
+        device, or None if the boundaries do not match the grid
+    """
+    expected = n_patches_x * n_patches_y
+    if expected <= 0 or not patch_indices:
+        return None
+
+    local_indices = patch_indices
+    if len(patch_indices) > expected:
+        # Drop the global patch: it has no spatial correspondence
+        local_indices = patch_indices[: -(image_seq_len or DEFAULT_IMAGE_SEQ_LEN)]
+    if len(local_indices) != expected:
+        logger.warning(
+            "Skipping mean pooling: %d image tokens do not match a %dx%d grid",
+            len(local_indices),
+            n_patches_x,
+            n_patches_y,
+        )
+        return None
+
+    device = embedding.device
+    total_tokens = embedding.shape[0]
+    indices = torch.tensor(local_indices, dtype=torch.long, device=device)
+    # Average in float32; bf16 sums over hundreds of tokens lose precision
+    image_tokens = embedding.index_select(0, indices).float()
+    grid = image_tokens.reshape(n_patches_x, n_patches_y, -1)
+    pooled_rows = grid.mean(dim=0)  # [y_patches, dim]
+    pooled_cols = grid.mean(dim=1)  # [x_patches, dim]
+
+    keep = torch.ones(total_tokens, dtype=torch.bool, device=device)
+    keep[indices] = False
+    positions = torch.arange(total_tokens, device=device)
+    first = local_indices[0]
+    prefix = embedding[keep & (positions < first)].float()
+    postfix = embedding[keep & (positions > first)].float()
+
+    return (
+        torch.cat([prefix, pooled_rows, postfix], dim=0),
+        torch.cat([prefix, pooled_cols, postfix], dim=0),
+    )
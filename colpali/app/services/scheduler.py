@@ -0,0 +1,116 @@
+"""Priority scheduling of model work across request types."""
+
+import heapq
+import itertools
+import logging
+import threading
+from concurrent.futures import Executor, Future
+from typing import Any, Callable, Dict, List, Tuple
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# Lanes in priority order (lower value runs first)
+QUERY_LANE = "query"
+INTERPRET_LANE = "interpret"
+IMAGE_LANE = "images"
+LANE_PRIORITIES: Dict[str, int] = {QUERY_LANE: 0, INTERPRET_LANE: 1, IMAGE_LANE: 2}
+
+
+class _LaneExecutor(Executor):
+    """``Executor`` facade that submits into one scheduler lane."""
+
+    def __init__(self, scheduler: "PriorityScheduler", lane: str):
+        self._scheduler = scheduler
+        self._lane = lane
+
+    def submit(self, fn, /, *args, **kwargs) -> Future:
+        return self._scheduler.submit(self._lane, fn, *args, **kwargs)
+
+
+class PriorityScheduler:
+    """Runs model jobs on worker threads, highest-priority lane first.
+
+    All forward passes go through the workers (one by default, so a job never
+    competes with another for the device); whenever a worker becomes free it
+    picks the oldest job of the most urgent non-empty lane. On CPU, several
+    workers can share the model's weights and split the cores. Jobs are not
+    interrupted, so preemption happens at job boundaries - callers split bulk
+    work (e.g. large image uploads) into chunks to bound how long a query can
+    wait.
+    """
+
+    def __init__(self, num_workers: int = 1):
+        self.num_workers = max(1, num_workers)
+        self._heap: List[Tuple[int, int, str, Future, Callable, tuple, dict]] = []
+        self._sequence = itertools.count()
+        self._depths: Dict[str, int] = {lane: 0 for lane in LANE_PRIORITIES}
+        self._running: List[str] = []
+        self._cond = threading.Condition()
+        self._threads: List[threading.Thread] = []
+
+    def executor(self, lane: str) -> Executor:
+        """Executor whose jobs are queued in ``lane``."""
+        if lane not in LANE_PRIORITIES:
+            raise ValueError(f"Unknown scheduler lane: {lane}")
+        return _LaneExecutor(self, lane)
+
+    def submit(self, lane: str, fn: Callable, *args: Any, **kwargs: Any) -> Future:
+        future: Future = Future()
+        with self._cond:
+            self._ensure_worker()
+            heapq.heappush(
+                self._heap,
+                (
+                    LANE_PRIORITIES[lane],
+                    next(self._sequence),
+                    lane,
+                    future,
+                    fn,
+                    args,
+                    kwargs,
+                ),
+            )
+            self._depths[lane] += 1
+            self._cond.notify()
+        return future
+
+    def stats(self) -> Dict[str, Any]:
+        """Queued jobs per lane and the lanes of the jobs currently running."""
+        with self._cond:
+            return {"queued": dict(self._depths), "running": list(self._running)}
+
+    def _ensure_worker(self) -> None:
+        self._threads = [thread for thread in self._threads if thread.is_alive()]
+        while len(self._threads) < self.num_workers:
+            thread = threading.Thread(
+                target=self._work,
+                name=f"model-worker-{len(self._threads)}",
+                daemon=True,
+            )
+            thread.start()
+            self._threads.append(thread)
+
+    def _work(self) -> None:
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                _, _, lane, future, fn, args, kwargs = heapq.heappop(self._heap)
+                self._depths[lane] -= 1
+                self._running.append(lane)
+
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        future.set_result(fn(*args, **kwargs))
+                    except BaseException as exc:
+                        future.set_exception(exc)
+            finally:
+                with self._cond:
+                    self._running.remove(lane)
+
+
+# Global scheduler instance
+scheduler = PriorityScheduler(num_workers=settings.MODEL_WORKERS)
@@ -1,17 +1,45 @@
 """Image processing utilities."""
 
+import math
 from io import BytesIO
+from typing import Optional
 
 from PIL import Image
 
 
-def load_image_from_bytes(image_bytes: bytes) -> Image.Image:
+def load_image_from_bytes(
+    image_bytes: bytes, max_edge: Optional[int] = None
+) -> Image.Image:
     """Load PIL Image from bytes.
 
     Args:
         image_bytes: Raw image bytes
+        max_edge: Longest edge the consumer will resize to. Larger images are
+            decoded at reduced resolution - JPEG draft mode scales by 1/2,
+            1/4 or 1/8 during decoding, other formats get an integer box
+            reduction - while staying at least this large, so the final
+            resize still sees enough pixels.
 
     Returns:
-        PIL Image in RGB mode
+        PIL Image in RGB mode; a reduced image records its full size in
+        ``info["original_size"]``
     """
-    return Image.open(BytesIO(image_bytes)).convert("RGB")
+    image = Image.open(BytesIO(image_bytes))
+    original_size = image.size
+    if max_edge:
+        width, height = original_size
+        scale = max_edge / max(width, height)
+        if scale < 1:
+            if image.format == "JPEG":
+                # Picks the largest reduction that keeps both sides >= requested
+                image.draft(
+                    "RGB", (math.ceil(width * scale), math.ceil(height * scale))
+                )
+            else:
+                factor = int(1 / scale)
+                if factor >= 2:
+                    image = image.convert("RGB").reduce(factor)
+    image = image.convert("RGB")
+    if image.size != original_size:
+        image.info["original_size"] = original_size
+    return image
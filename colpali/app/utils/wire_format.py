@@ -0,0 +1,101 @@
+"""Compact binary wire format for embedding responses.
+
+JSON float lists cost several bytes per value plus a Python object per float
+on both ends. Clients that send ``Accept: application/x-colpali-embeddings``
+get raw little-endian buffers instead:
+
+    b"CPE1" | uint32 LE header length | UTF-8 JSON header | payload
+
+The header is ``{"dtype": "float16"|"float32", "dim": D, "items": [...]}``;
+every item carries ``rows`` and the byte ``offset`` of its ``[rows, D]``
+matrix within the payload, plus any per-item metadata (e.g. image-token
+boundaries). Additional matrices of an item (e.g. pooled variants) are
+listed under ``tensors`` as ``{name: {"rows", "offset"}}``. An optional
+``dtype`` media-type parameter selects float16 (half the bytes) or float32
+(default).
+"""
+
+import json
+import struct
+from typing import Any, Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+import torch
+
+MEDIA_TYPE = "application/x-colpali-embeddings"
+MAGIC = b"CPE1"
+SUPPORTED_DTYPES = {"float16": "<f2", "float32": "<f4"}
+
+
+def negotiate_dtype(accept: Optional[str]) -> Optional[str]:
+    """Return the requested binary dtype, or None if the client wants JSON."""
+    if not accept:
+        return None
+    for media_range in accept.split(","):
+        parts = [part.strip() for part in media_range.split(";")]
+        if parts[0].lower() != MEDIA_TYPE:
+            continue
+        dtype = "float32"
+        for param in parts[1:]:
+            key, _, value = param.partition("=")
+            if key.strip().lower() == "dtype":
+                dtype = value.strip().strip('"').lower()
+        return dtype if dtype in SUPPORTED_DTYPES else "float32"
+    return None
+
+
+def encode_embeddings(
+    embeddings: Sequence[Optional[torch.Tensor]],
+    metadata: Optional[Sequence[Dict[str, Any]]] = None,
+    dtype: str = "float32",
+    extras: Optional[Mapping[str, Sequence[Optional[torch.Tensor]]]] = None,
+) -> bytes:
+    """Serialize ``[rows, dim]`` embeddings (plus per-item metadata) to bytes.
+
+    Args:
+        embeddings: Primary matrix of each item; None omits it (the item then
+            has no ``rows``/``offset``)
+        metadata: JSON-serializable fields merged into each item
+        dtype: Wire dtype (``float16`` or ``float32``)
+        extras: Additional named matrices per item (e.g. pooled variants),
+            described under the item's ``tensors`` as ``{name: {rows, offset}}``
+    """
+    wire_dtype = np.dtype(SUPPORTED_DTYPES[dtype])
+    items: List[Dict[str, Any]] = []
+    chunks: List[bytes] = []
+    offset = 0
+    dim = 0
+
+    def append(tensor: torch.Tensor, label: str) -> Dict[str, int]:
+        nonlocal offset, dim
+        # numpy has no bfloat16; widen on the torch side first
+        array = tensor.detach().to("cpu", torch.float32).numpy()
+        if array.ndim != 2:
+            raise ValueError(f"{label} must be 2-D, got shape {array.shape}")
+        if dim and array.shape[1] != dim:
+            raise ValueError("All embeddings must share the same dimension")
+        dim = array.shape[1]
+
+        data = np.ascontiguousarray(array, dtype=wire_dtype).tobytes()
+        location = {"rows": int(array.shape[0]), "offset": offset}
+        chunks.append(data)
+        offset += len(data)
+        return location
+
+    for idx, embedding in enumerate(embeddings):
+        item = dict(metadata[idx]) if metadata else {}
+        if embedding is not None:
+            item.update(append(embedding, f"Embedding {idx}"))
+        tensors = {
+            name: append(values[idx], f"{name} {idx}")
+            for name, values in (extras or {}).items()
+            if values[idx] is not None
+        }
+        if tensors:
+            item["tensors"] = tensors
+        items.append(item)
+
+    header = json.dumps(
+        {"dtype": dtype, "dim": dim, "items": items}, separators=(",", ":")
+    ).encode("utf-8")
+    return b"".join([MAGIC, struct.pack("<I", len(header)), header, *chunks])
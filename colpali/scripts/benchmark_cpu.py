@@ -0,0 +1,206 @@
+"""Benchmark the CPU performance mode against the fp32 baseline.
+
+Loads the model twice on CPU - plain fp32 and with the optimizations from
+``app.services.cpu_optimizations`` - embeds the same pages and queries with
+both, and reports throughput plus how far the optimized embeddings drift
+from the baseline (per-token cosine similarity and MaxSim score agreement).
+
+Usage (from the ``colpali`` directory):
+
+    python -m scripts.benchmark_cpu --images ./pages --batch-size 4
+    python -m scripts.benchmark_cpu --num-images 16 --no-int8 --bf16
+"""
+
+import argparse
+import statistics
+import time
+from pathlib import Path
+from typing import Any, Callable, List, Tuple
+
+import torch
+from app.core.config import settings
+from app.services.cpu_optimizations import (
+    apply_cpu_optimizations,
+    cpu_supports_bf16,
+    inference_context,
+)
+from colpali_engine.models import ColModernVBert, ColModernVBertProcessor
+from PIL import Image, ImageDraw
+
+DEFAULT_QUERIES = [
+    "quarterly revenue by region",
+    "table of contents",
+    "signature of the contracting parties",
+    "architecture diagram of the system",
+    "total amount due including tax",
+    "list of abbreviations",
+    "safety instructions before installation",
+    "chart comparing yearly growth",
+]
+
+
+def load_images(directory: str, limit: int) -> List[Image.Image]:
+    """Load page images from a directory, or synthesize text-like pages."""
+    if directory:
+        paths = sorted(
+            p
+            for p in Path(directory).iterdir()
+            if p.suffix.lower() in {".png", ".jpg", ".jpeg", ".webp"}
+        )[:limit]
+        return [Image.open(p).convert("RGB") for p in paths]
+
+    images = []
+    for idx in range(limit):
+        page = Image.new("RGB", (1240, 1754), "white")
+        draw = ImageDraw.Draw(page)
+        for line in range(40):
+            y = 80 + line * 40
+            draw.text((80, y), f"Page {idx} line {line}: lorem ipsum dolor", "black")
+        draw.rectangle((600, 900, 1100, 1300), outline="black", width=4)
+        images.append(page)
+    return images
+
+
+def load_model(optimized: bool, int8: bool) -> Any:
+    model = ColModernVBert.from_pretrained(
+        settings.MODEL_ID,
+        torch_dtype=torch.float32,
+        device_map="cpu",
+        trust_remote_code=True,
+    ).eval()
+    if optimized:
+        model = apply_cpu_optimizations(model, quantize_int8=int8)
+    return model
+
+
+def embed(
+    model: Any,
+    processor: Any,
+    inputs: List[Any],
+    batch_size: int,
+    process: Callable[[List[Any]], Any],
+    bf16: bool,
+) -> Tuple[List[torch.Tensor], float]:
+    """Embed inputs in batches; returns trimmed per-item float32 tensors and seconds."""
+    outputs: List[torch.Tensor] = []
+    start = time.perf_counter()
+    for offset in range(0, len(inputs), batch_size):
+        batch = process(inputs[offset : offset + batch_size])
+        with inference_context(bf16):
+            embeddings = model(**batch).float()
+        mask = batch["attention_mask"].bool()
+        outputs.extend(embeddings[i][mask[i]] for i in range(embeddings.shape[0]))
+    return outputs, time.perf_counter() - start
+
+
+def token_cosines(
+    baseline: List[torch.Tensor], optimized: List[torch.Tensor]
+) -> List[float]:
+    cosines: List[float] = []
+    for ref, opt in zip(baseline, optimized):
+        sims = torch.nn.functional.cosine_similarity(ref, opt, dim=-1)
+        cosines.extend(sims.tolist())
+    return cosines
+
+
+def maxsim_scores(
+    queries: List[torch.Tensor], pages: List[torch.Tensor]
+) -> torch.Tensor:
+    """[num_queries, num_pages] late-interaction scores."""
+    return torch.stack(
+        [
+            torch.stack([(q @ p.T).max(dim=1).values.sum() for p in pages])
+            for q in queries
+        ]
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark the CPU performance mode against the fp32 baseline"
+    )
+    parser.add_argument("--images", default="", help="Directory of page images")
+    parser.add_argument("--num-images", type=int, default=16)
+    parser.add_argument("--batch-size", type=int, default=4)
+    parser.add_argument("--threads", type=int, default=settings.CPU_THREADS)
+    parser.add_argument(
+        "--no-int8", action="store_true", help="Skip int8 dynamic quantization"
+    )
+    parser.add_argument(
+        "--bf16", action="store_true", help="bf16 autocast (only without int8)"
+    )
+    args = parser.parse_args()
+
+    torch.set_num_threads(args.threads)
+    int8 = not args.no_int8
+    bf16 = args.bf16 and not int8 and cpu_supports_bf16()
+    if args.bf16 and not bf16:
+        print("bf16 autocast unavailable (int8 enabled or no native CPU bf16)")
+
+    processor = ColModernVBertProcessor.from_pretrained(
+        settings.MODEL_ID, trust_remote_code=True
+    )
+    if isinstance(processor, tuple):
+        processor = processor[0]
+    images = load_images(args.images, args.num_images)
+    queries = DEFAULT_QUERIES
+
+    results = {}
+    for name, optimized in (("baseline fp32", False), ("optimized", True)):
+        model = load_model(optimized, int8)
+        # Warm-up (oneDNN primitive creation, allocator)
+        embed(model, processor, images[:1], 1, processor.process_images, False)
+        pages, page_s = embed(
+            model,
+            processor,
+            images,
+            args.batch_size,
+            processor.process_images,
+            bf16 and optimized,
+        )
+        query_vecs, query_s = embed(
+            model,
+            processor,
+            queries,
+            len(queries),
+            processor.process_queries,
+            bf16 and optimized,
+        )
+        results[name] = (pages, page_s, query_vecs, query_s)
+        print(
+            f"{name:>14}: {len(images) / page_s:6.2f} pages/s, "
+            f"{len(queries) / query_s:7.2f} queries/s"
+        )
+        del model
+
+    base_pages, base_page_s, base_queries, base_query_s = results["baseline fp32"]
+    opt_pages, opt_page_s, opt_queries, opt_query_s = results["optimized"]
+
+    page_cos = token_cosines(base_pages, opt_pages)
+    query_cos = token_cosines(base_queries, opt_queries)
+    base_scores = maxsim_scores(base_queries, base_pages)
+    opt_scores = maxsim_scores(opt_queries, opt_pages)
+    relative = ((opt_scores - base_scores).abs() / base_scores.abs()).max().item()
+    top1 = (base_scores.argmax(dim=1) == opt_scores.argmax(dim=1)).float().mean().item()
+
+    print()
+    print(
+        f"speed-up: pages x{base_page_s / opt_page_s:.2f}, "
+        f"queries x{base_query_s / opt_query_s:.2f}"
+    )
+    print(
+        f"page token cosine: mean {statistics.fmean(page_cos):.4f}, "
+        f"min {min(page_cos):.4f}"
+    )
+    print(
+        f"query token cosine: mean {statistics.fmean(query_cos):.4f}, "
+        f"min {min(query_cos):.4f}"
+    )
+    print(
+        f"MaxSim: max relative score change {relative:.4f}, "
+        f"top-1 agreement {top1:.0%}"
+    )
+
+
+if __name__ == "__main__":
+    main()